@@ -1,4 +1,10 @@
-from efficient_apriori import apriori
+from collections import defaultdict
+from itertools import combinations
+
+from efficient_apriori.itemsets import itemsets_from_transactions
+
+from candidates import generate_candidates
+from itemset_io import collect_levels
 
 
 def apriori_efficient(transactions, min_support=2):
@@ -18,11 +24,12 @@ def apriori_efficient(transactions, min_support=2):
     # Convert integer min_support (count) to fraction for the library
     min_support_fraction = min_support / len(transactions)
 
-    # Run Apriori from library
-    itemsets, _ = apriori(
+    # Run the library's itemset stage only: apriori() would also build
+    # every rule at min_confidence=0.0 just to throw them away (rules come
+    # from rules.generate_rules instead)
+    itemsets, _ = itemsets_from_transactions(
         transactions,
         min_support=min_support_fraction,
-        min_confidence=0.0,  # confidence not needed
     )
 
     # Reform into your desired output format:
@@ -38,3 +45,241 @@ def apriori_efficient(transactions, min_support=2):
         L.append(level_dict)
 
     return L, support_data
+
+
+# reach[] of a node with no candidate below it
+_NO_CANDIDATE = 1 << 30
+
+
+class CandidateTrie:
+    """
+    Prefix trie over candidate itemsets (sorted tuples) for horizontal counting.
+
+    Nodes are indices into parallel lists: children[n] maps an item to the
+    child node (None for leaves), terminal[n] is the candidate index stored
+    at n (-1 if none) and reach[n] is the fewest further items needed below
+    n to complete a candidate, which bounds how far into a transaction a
+    walk can go.
+    Candidates of different lengths may share one trie.
+    """
+
+    __slots__ = ("candidates", "counts", "children", "terminal", "reach")
+
+    def __init__(self, candidates):
+        self.candidates = list(candidates)
+        self.counts = [0] * len(self.candidates)
+        self.children = [{}]
+        self.terminal = [-1]
+        self.reach = [_NO_CANDIDATE]
+
+        children, terminal, reach = self.children, self.terminal, self.reach
+        for idx, cand in enumerate(self.candidates):
+            node = 0
+            need = len(cand)
+            for item in cand:
+                if need < reach[node]:
+                    reach[node] = need
+                kids = children[node]
+                if kids is None:
+                    kids = children[node] = {}
+                child = kids.get(item)
+                if child is None:
+                    child = kids[item] = len(children)
+                    children.append(None)  # leaves get a dict only when needed
+                    terminal.append(-1)
+                    reach.append(_NO_CANDIDATE)
+                node = child
+                need -= 1
+            terminal[node] = idx
+
+    def _walk(self, node, items, start, matched):
+        """Append the index of every candidate under `node` contained in items."""
+        children = self.children[node]
+        n = len(items)
+        # the next item must leave room for the rest of a candidate
+        for i in range(start, n - self.reach[node] + 1):
+            child = children.get(items[i])
+            if child is None:
+                continue
+            idx = self.terminal[child]
+            if idx >= 0:
+                matched.append(idx)
+            if self.children[child]:
+                self._walk(child, items, i + 1, matched)
+
+    def match(self, items):
+        """Indices of all candidates contained in the sorted item list."""
+        matched = []
+        self._walk(0, items, 0, matched)
+        return matched
+
+    def count(self, transactions, trim_k=None, collect_tids=False):
+        """
+        Count every candidate over (tid, sorted_items) pairs.
+
+        With trim_k set (all candidates of length trim_k), returns the
+        transactions trimmed for the next pass: an item can only be part
+        of a contained (trim_k + 1)-candidate if it occurs in at least
+        trim_k contained trim_k-candidates, and transactions left with
+        fewer than trim_k + 1 items are dropped.
+
+        With collect_tids, self.counts holds TID lists instead of counts.
+        """
+        if collect_tids:
+            self.counts = [[] for _ in self.candidates]
+        counts = self.counts
+        candidates = self.candidates
+        trimmed = [] if trim_k is not None else None
+
+        for tid, items in transactions:
+            matched = self.match(items)
+            if not matched:
+                continue
+            for idx in matched:
+                if collect_tids:
+                    counts[idx].append(tid)
+                else:
+                    counts[idx] += 1
+
+            if trim_k is not None and len(matched) >= trim_k + 1:
+                hits = defaultdict(int)
+                for idx in matched:
+                    for item in candidates[idx]:
+                        hits[item] += 1
+                kept = [item for item in items if hits[item] >= trim_k]
+                if len(kept) > trim_k:
+                    trimmed.append((tid, kept))
+
+        return trimmed
+
+    def items(self):
+        return zip(self.candidates, self.counts)
+
+
+def count_candidates(work, Ck, k, trim=True, collect_tids=False):
+    """
+    One horizontal counting pass over (tid, sorted_items) pairs.
+
+    Pass 2 enumerates the pairs of each transaction directly: every item
+    left in `work` is frequent, so every pair is a candidate and a trie
+    would cost more to build than it saves. Later passes use a
+    CandidateTrie.
+
+    Returns (found, work) where found maps candidate -> count (or TID
+    list with collect_tids) and work is trimmed for the next pass when
+    trim is set.
+    """
+    if k > 2:
+        trie = CandidateTrie(Ck)
+        trimmed = trie.count(
+            work, trim_k=k if trim else None, collect_tids=collect_tids
+        )
+        return dict(trie.items()), (trimmed if trim else work)
+
+    Ck = set(Ck)
+    found = defaultdict(list) if collect_tids else defaultdict(int)
+    for tid, items in work:
+        for pair in combinations(items, 2):
+            if pair in Ck:
+                if collect_tids:
+                    found[pair].append(tid)
+                else:
+                    found[pair] += 1
+
+    if trim:
+        # each item of a 3-candidate sits in two of its pairs
+        work = [(tid, items) for tid, items in work if len(items) > 2]
+    return found, work
+
+
+def iter_apriori_native(transactions, min_support=2, max_length=8, observer=None):
+    """
+    apriori_native as a stream: yield (frozenset, support) level by level.
+
+    Only the level the next candidates are joined from is kept.
+    Arguments as for apriori_native.
+    """
+    if observer is not None:
+        observer.level_start(1)
+
+    # Step 1: count items
+    item_counts = defaultdict(int)
+    for txn in transactions:
+        for item in set(txn):
+            item_counts[item] += 1
+
+    prev_L = {
+        (item,): count for item, count in item_counts.items() if count >= min_support
+    }
+    if observer is not None:
+        observer.candidates(1, len(item_counts), 0, 0.0)
+        observer.level_end(1, len(prev_L), 0)
+    del item_counts
+
+    # Keep only frequent items, sorted, paired with their TID
+    frequent_items = {item for (item,) in prev_L}
+    work = []
+    for tid, txn in enumerate(transactions):
+        items = sorted(frequent_items.intersection(txn))
+        if len(items) >= 2:
+            work.append((tid, items))
+    for itemset, count in prev_L.items():
+        yield frozenset(itemset), count
+
+    k = 2
+    while prev_L and k <= max_length:
+        if observer is not None:
+            observer.level_start(k)
+
+        # Join within prefix classes, prune by downward closure
+        Ck = generate_candidates(prev_L.keys(), k, observer=observer)
+        if not Ck:
+            if observer is not None:
+                observer.level_end(k, 0, 0)
+            break
+
+        found, work = count_candidates(work, Ck, k)
+
+        Lk = {cand: count for cand, count in found.items() if count >= min_support}
+        if observer is not None:
+            observer.level_end(k, len(Lk), 0)
+        if not Lk:
+            break
+
+        prev_L = Lk
+        del Ck, found
+        for itemset, count in Lk.items():
+            yield frozenset(itemset), count
+        k += 1
+
+
+def apriori_native(transactions, min_support=2, max_length=8, observer=None):
+    """
+    In-house horizontal Apriori, a drop-in for apriori_efficient.
+
+    Candidates are joined from L(k-1), pruned so that every (k-1)-subset
+    is frequent, and counted against each transaction (pairs directly,
+    longer candidates with a CandidateTrie). After each pass, transactions
+    are trimmed to the items that can still be part of a (k+1)-candidate.
+
+    max_length mirrors the efficient-apriori default (8), so the output is
+    identical to apriori_efficient.
+
+    Input:
+        transactions: list of lists/sets of items
+        min_support: integer support threshold (count, not fraction)
+        observer: optional instrument.MiningObserver for per-level
+            counters (counting is horizontal, so no TID-list columns)
+
+    Output:
+        L: list of dicts ({frozenset: support_count}) by level
+        support_data: dict of all frequent itemsets with support counts
+
+    iter_apriori_native streams the same result level by level.
+    """
+    # Same output format as apriori_efficient
+    return collect_levels(
+        iter_apriori_native(transactions, min_support, max_length, observer),
+        dict,
+        keep_empty=False,
+    )
@@ -0,0 +1,159 @@
+import time
+
+from apriori_tid import create_C1
+from candidates import generate_candidates
+from itemset_io import collect_levels
+from pair_counts import frequent_pairs
+from tidlist import adapt, check_backend, make_tidlist
+
+
+def iter_apriori_diffset(
+    transactions,
+    min_support,
+    density_threshold=0.5,
+    backend="auto",
+    observer=None,
+    vectorized_pairs=True,
+):
+    """
+    dEclat as a stream: yield (itemset, support) level by level.
+
+    Itemsets are sorted tuples. Each level is yielded as soon as it is
+    finished and only the tidsets/diffsets of the level the next one is
+    built from are kept. Arguments as for apriori_diffset.
+    """
+    check_backend(backend)
+    if observer is not None:
+        observer.level_start(1)
+
+    transactions = [set(t) for t in transactions]
+    num_trans = len(transactions)
+
+    # Step 1: L1 as tidsets
+    C1 = create_C1(transactions)
+    prev_L = {
+        itemset: (False, make_tidlist(tids, num_trans, backend))
+        for itemset, tids in C1.items()
+        if len(tids) >= min_support
+    }
+    supports = {itemset: len(tids) for itemset, (_, tids) in prev_L.items()}
+    if observer is not None:
+        observer.candidates(1, len(C1), 0, 0.0)
+        observer.level_end(1, len(prev_L), sum(supports.values()))
+    del C1, transactions
+    yield from supports.items()
+
+    k = 2
+    while prev_L:
+        if observer is not None:
+            observer.level_start(k)
+
+        # level 1 holds tidsets only, so level 2 can be counted in one
+        # sparse product and just the frequent pairs joined below
+        pairs = None
+        if k == 2 and vectorized_pairs:
+            tidsets = {itemset: tids for itemset, (_, tids) in prev_L.items()}
+            pairs = frequent_pairs(tidsets, num_trans, min_support, observer=observer)
+            del tidsets
+
+        # an empty Ck leaves Ck_data empty below
+        if pairs is not None:
+            Ck = list(pairs)
+        else:
+            Ck = generate_candidates(prev_L.keys(), k, observer=observer)
+
+        Ck_data = {}
+        level = {}
+        for cand in Ck:
+            # the two prefix-class siblings this candidate was joined from
+            x, y = cand[:-1], cand[:-2] + cand[-1:]
+            x_is_diff, x_list = prev_L[x]
+            y_is_diff, y_list = prev_L[y]
+            x_support = supports[x]
+            if observer is not None:
+                start = time.perf_counter()
+
+            if x_is_diff:
+                # d(XY) = d(Y) - d(X)
+                diff = y_list.difference(x_list)
+                support = x_support - len(diff)
+                entry = (True, diff)
+            elif x_support >= density_threshold * num_trans:
+                # switch: d(XY) = t(X) - t(Y)
+                diff = x_list.difference(y_list)
+                support = x_support - len(diff)
+                entry = (True, diff)
+            else:
+                tids = x_list.intersect(y_list)
+                support = len(tids)
+                entry = (False, tids)
+
+            if observer is not None:
+                observer.intersected(
+                    x_list.nbytes + y_list.nbytes, time.perf_counter() - start
+                )
+
+            if support >= min_support:
+                is_diff, tids = entry
+                Ck_data[cand] = (is_diff, adapt(tids, num_trans, backend))
+                level[cand] = support
+
+        if observer is not None:
+            kept = sum(len(tids) for _, tids in Ck_data.values())
+            observer.level_end(k, len(Ck_data), kept)
+        if not Ck_data:
+            break
+
+        # diffsets need the parents' supports, nothing older
+        prev_L, supports = Ck_data, level
+        del Ck, Ck_data, pairs
+        yield from level.items()
+        k += 1
+
+
+def apriori_diffset(
+    transactions,
+    min_support,
+    density_threshold=0.5,
+    backend="auto",
+    observer=None,
+    vectorized_pairs=True,
+):
+    """
+    Level-wise Apriori-TID with diffsets (dEclat) for dense data.
+
+    Every itemset X keeps either its tidset t(X) or its diffset
+    d(X) = t(P) - t(X), the TIDs it loses relative to its prefix parent
+    P = X[:-1]; then support(X) = support(P) - |d(X)|.
+
+    Itemsets start out as tidsets. The children of X switch to diffsets
+    once support(X) / |D| >= density_threshold, and stay diffsets from
+    then on. All children of X share X as prefix, so the two parents
+    joined into a candidate always use the same representation.
+
+    Input:
+        transactions: list of lists/sets of items
+        min_support: integer support threshold (count, not fraction)
+        density_threshold: tidset density at which to switch to diffsets
+        backend: TID-list encoding (see tidlist.BACKENDS)
+        observer: optional instrument.MiningObserver for per-level
+            counters; tid_elements counts tidset and diffset entries
+        vectorized_pairs: count level 2 with one sparse product (see
+            pair_counts.py) and join only the frequent pairs
+
+    Output:
+        L: list of lists of tuples (frequent itemsets by level)
+        support_data: dict {tuple: support_count}
+
+    iter_apriori_diffset streams the same result level by level.
+    """
+    return collect_levels(
+        iter_apriori_diffset(
+            transactions,
+            min_support,
+            density_threshold,
+            backend,
+            observer,
+            vectorized_pairs,
+        )
+    )
@@ -1,9 +1,136 @@
-from efficient_apriori import apriori
+from collections import defaultdict
 
+from apriori import count_candidates
+from apriori_tid import iter_tid_levels
+from candidates import generate_candidates
+from itemset_io import collect_levels
+from tidlist import check_backend, make_tidlist
 
-def apriori_hybrid(transactions, min_support, threshold_ratio=0.7):
+
+def iter_apriori_hybrid(
+    transactions,
+    min_support,
+    threshold_ratio=0.7,
+    backend="auto",
+    stats=None,
+    observer=None,
+):
+    """
+    AprioriHybrid as a stream: yield (frozenset, support) level by level.
+
+    Each level is yielded as soon as it is finished; horizontal passes
+    keep only the trimmed transactions, TID-list passes only the lists
+    the next level is built from. Arguments as for apriori_hybrid;
+    stats["switch_level"] is set once the stream is exhausted.
+    """
+    check_backend(backend)
+    if observer is not None:
+        observer.level_start(1)
+
+    transactions = [set(t) for t in transactions]
+    num_trans = len(transactions)
+    budget = threshold_ratio * sum(len(t) for t in transactions)
+    switch_level = None
+
+    # Pass 1: count items horizontally
+    item_counts = defaultdict(int)
+    for txn in transactions:
+        for item in txn:
+            item_counts[item] += 1
+
+    prev_L = {
+        (item,): count for item, count in item_counts.items() if count >= min_support
+    }
+
+    # Horizontal passes work on (tid, sorted frequent items) pairs
+    frequent_items = {item for (item,) in prev_L}
+    work = []
+    for tid, txn in enumerate(transactions):
+        items = sorted(frequent_items.intersection(txn))
+        if len(items) >= 2:
+            work.append((tid, items))
+    del transactions
+    if observer is not None:
+        observer.candidates(1, len(item_counts), 0, 0.0)
+        observer.level_end(1, len(prev_L), 0)
+    for itemset, count in prev_L.items():
+        yield frozenset(itemset), count
+
+    k = 2
+
+    while prev_L:
+        estimate = sum(prev_L.values()) + num_trans
+        switching = estimate < budget
+        if observer is not None:
+            observer.level_start(k)
+
+        # Join within prefix classes, prune by downward closure
+        Ck = generate_candidates(prev_L.keys(), k, observer=observer)
+        if not Ck:
+            if observer is not None:
+                observer.level_end(k, 0, 0)
+            break
+
+        if switching:
+            found, _ = count_candidates(work, Ck, k, trim=False, collect_tids=True)
+            Lk = {
+                cand: tids for cand, tids in found.items() if len(tids) >= min_support
+            }
+        else:
+            found, work = count_candidates(work, Ck, k)
+            Lk = {cand: count for cand, count in found.items() if count >= min_support}
+        if observer is not None:
+            kept = sum(map(len, Lk.values())) if switching else 0
+            observer.level_end(k, len(Lk), kept)
+        if not Lk:
+            break
+
+        if switching:
+            switch_level = k
+            Lk_tid = {
+                cand: make_tidlist(tids, num_trans, backend)
+                for cand, tids in Lk.items()
+            }
+            level = {cand: len(tids) for cand, tids in Lk.items()}
+            del work, found, Lk, prev_L
+            for itemset, count in level.items():
+                yield frozenset(itemset), count
+
+            # The rest of the levels come from TID-list intersections
+            levels = iter_tid_levels(
+                Lk_tid, k + 1, min_support, num_trans, backend, observer
+            )
+            del Lk_tid  # iter_tid_levels owns the TID-lists now
+            for level in levels:
+                for itemset, count in level.items():
+                    yield frozenset(itemset), count
+            break
+
+        for itemset, count in Lk.items():
+            yield frozenset(itemset), count
+        prev_L = Lk
+        k += 1
+
+    if stats is not None:
+        stats["switch_level"] = switch_level
+
+
+def apriori_hybrid(
+    transactions,
+    min_support,
+    threshold_ratio=0.7,
+    backend="auto",
+    stats=None,
+    observer=None,
+):
     """
-    Replacement for your Apriori-Hybrid implementation using efficient-apriori.
+    AprioriHybrid: horizontal Apriori passes early, Apriori-TID later.
+
+    After each horizontal pass k the size of the vertical encoding of the
+    next level is estimated as sum(support(X) for X in Lk) + |D|. Once that
+    drops below threshold_ratio * (total items in D), pass k+1 collects
+    TID-lists instead of counts and every later level is mined by TID-list
+    intersection (see apriori_tid.iter_tid_levels).
 
     Maintains the same return structure:
 
@@ -14,35 +141,20 @@ def apriori_hybrid(transactions, min_support, threshold_ratio=0.7):
            ]
 
         support_data: {frozenset(...): support_count}
-    """
-
-    # efficient-apriori requires list of tuples or lists
-    transactions = [tuple(t) for t in transactions]
-    num_trans = len(transactions)
 
-    # Convert min_support (count) → fraction (library uses percentages)
-    min_support_fraction = min_support / num_trans
-
-    # Run Apriori from the library
-    itemsets, _ = apriori(
-        transactions,
-        min_support=min_support_fraction,
-        min_confidence=0.0,  # we do not need rules
+    If a stats dict is passed, stats["switch_level"] is set to the first
+    level mined from TID-lists (None if the run never switched).
+    observer (optional instrument.MiningObserver) receives per-level
+    counters; horizontal levels keep no TID-list elements.
+    iter_apriori_hybrid streams the same result level by level.
+    """
+    return collect_levels(
+        iter_apriori_hybrid(
+            transactions,
+            min_support,
+            threshold_ratio,
+            backend,
+            stats,
+            observer,
+        )
     )
-
-    # Convert itemsets from library format into your format
-    L = []
-    support_data = {}
-
-    # itemsets is dict: {1: {(item): count}, 2: {(item1,item2):count}, ...}
-    for k in sorted(itemsets.keys()):
-        level_itemsets = []
-
-        for itemset, support in itemsets[k].items():
-            fs = frozenset(itemset)
-            level_itemsets.append(fs)
-            support_data[fs] = support
-
-        L.append(level_itemsets)
-
-    return L, support_data
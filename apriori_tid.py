@@ -1,94 +1,208 @@
 from collections import defaultdict
-from itertools import combinations
+
+from candidates import generate_candidates
+from itemset_io import collect_levels
+from pair_counts import frequent_pairs
+from spill import SpillStore, load
+from tidlist import (
+    adapt,
+    as_weights,
+    check_backend,
+    intersect_all,
+    make_tidlist,
+    weighted_support,
+)
 
 
 def create_C1(transactions):
-    """Create candidate 1-itemsets (C1) with TID-lists."""
-    C1 = defaultdict(set)
+    """
+    Create candidate 1-itemsets (C1) with TID-lists.
+
+    TIDs are appended in transaction order, so every list is sorted.
+    """
+    C1 = defaultdict(list)
     for tid, txn in enumerate(transactions):
         for item in txn:
-            C1[(item,)].add(tid)  # use tuple instead of frozenset
+            C1[(item,)].append(tid)  # use tuple instead of frozenset
     return C1
 
 
-def generate_candidates(prev_freq_itemsets, k):
-    """
-    Generate Ck from L(k−1) more efficiently.
-    """
-    prev_list = sorted(prev_freq_itemsets)  # already tuples, so cheap
-    candidates = set()
-
-    n = len(prev_list)
-    for i in range(n):
-        p = prev_list[i]
-        for j in range(i + 1, n):
-            q = prev_list[j]
-
-            # join step on first k−2 elements
-            if p[:-1] == q[:-1]:
-                # candidate is a tuple, sorted automatically
-                cand = p + (q[-1],)
-                candidates.add(cand)
-            else:
-                break  # because list is sorted, no further matches possible
-
-    return candidates
-
-
-def apriori_tid(transactions, min_support):
+def iter_tid_levels(
+    prev_L,
+    k,
+    min_support,
+    num_trans,
+    backend,
+    observer=None,
+    spill=None,
+    weights=None,
+    vectorized_pairs=True,
+):
     """
-    Optimized Apriori-TID.
+    Run the TID-list passes from level k upwards, one level per yield.
+
+    prev_L maps every frequent (k-1)-itemset (sorted tuple) to its
+    TID-list. Yields {itemset: support} for each new level once it is
+    finished; the TID-lists of a level are dropped as soon as the next
+    level is built from them, so the caller should not hold on to prev_L.
+    With a spill.SpillStore, every kept TID-list goes through its budget
+    (prev_L must have been kept through it too). weights (see
+    tidlist.as_weights) makes supports weighted sums. With
+    vectorized_pairs, level 2 supports come from one sparse product (see
+    pair_counts.py) and only the frequent pairs are intersected.
     """
-    # Convert transactions to sets once
-    transactions = [set(t) for t in transactions]
-
-    # Step 1: C1
-    C1 = create_C1(transactions)
-    L1 = {itemset: tids for itemset, tids in C1.items() if len(tids) >= min_support}
-
-    support_data = {itemset: len(tids) for itemset, tids in L1.items()}
-    L = [list(L1.keys())]
+    while prev_L:
+        if observer is not None:
+            observer.level_start(k)
 
-    prev_L = L1
-    k = 2
+        pairs = None
+        if k == 2 and vectorized_pairs:
+            pairs = frequent_pairs(prev_L, num_trans, min_support, weights, observer)
 
-    while prev_L:
-        # Generate Ck
-        Ck = generate_candidates(prev_L.keys(), k)
-        if not Ck:
-            break
+        # Generate Ck (an empty Ck leaves Ck_tid empty below)
+        if pairs is not None:
+            Ck = list(pairs)
+        else:
+            Ck = generate_candidates(prev_L.keys(), k, observer=observer)
 
         Ck_tid = {}
-        # Now candidate itemsets are tuples, create subsets efficiently
+        level = {}
+        # Candidates are already subset-pruned, so every k−1 subset exists
         for cand in Ck:
             # get k−1 subsets using tuple slicing instead of combinations
-            subsets = (
-                (
-                    cand[1:],  # remove first
-                    cand[:-1],  # remove last
-                )
-                if k == 2
-                else [cand[:i] + cand[i + 1 :] for i in range(k)]
-            )
-
-            try:
-                tid_lists = [prev_L[s] for s in subsets]
-            except KeyError:
-                continue
+            tid_lists = [prev_L[cand[:i] + cand[i + 1 :]] for i in range(k)]
+            if spill is not None:
+                tid_lists = [load(tids) for tids in tid_lists]
 
             # intersect tid lists (smallest first = faster)
-            tid_lists.sort(key=len)
-            common = tid_lists[0].intersection(*tid_lists[1:])
-
-            if len(common) >= min_support:
-                Ck_tid[cand] = common
-                support_data[cand] = len(common)
+            common = intersect_all(tid_lists, observer)
 
+            if pairs is not None:
+                support = pairs[cand]
+            else:
+                support = weighted_support(common, weights, min_support)
+            if support >= min_support:
+                kept = adapt(common, num_trans, backend)
+                Ck_tid[cand] = kept if spill is None else spill.keep(kept)
+                level[cand] = support
+
+        if observer is not None:
+            observer.level_end(k, len(Ck_tid), sum(map(len, Ck_tid.values())))
+        if spill is not None:
+            spill.release(prev_L.values())
         if not Ck_tid:
             break
 
-        L.append(list(Ck_tid.keys()))
         prev_L = Ck_tid
+        del Ck, Ck_tid, pairs
+        yield level
         k += 1
 
-    return L, support_data
+
+def iter_apriori_tid(
+    transactions,
+    min_support,
+    backend="auto",
+    observer=None,
+    memory_budget=None,
+    stats=None,
+    weights=None,
+    vectorized_pairs=True,
+):
+    """
+    Apriori-TID as a stream: yield (itemset, support) level by level.
+
+    Itemsets are sorted tuples. Each level is yielded as soon as it is
+    finished and only the TID-lists the next level is built from are
+    kept. Arguments as for apriori_tid; spill statistics reach stats
+    once the stream is exhausted.
+    """
+    check_backend(backend)
+    weights = as_weights(weights)
+    if observer is not None:
+        observer.level_start(1)
+
+    # Convert transactions to sets once
+    transactions = [set(t) for t in transactions]
+    num_trans = len(transactions)
+
+    # Step 1: C1
+    C1 = create_C1(transactions)
+    del transactions
+    spill = SpillStore(memory_budget) if memory_budget is not None else None
+    level = {}
+    for itemset, tids in C1.items():
+        support = weighted_support(tids, weights, min_support)
+        if support >= min_support:
+            level[itemset] = support
+    L1 = {itemset: make_tidlist(C1[itemset], num_trans, backend) for itemset in level}
+    if spill is not None:
+        L1 = {itemset: spill.keep(tids) for itemset, tids in L1.items()}
+
+    if observer is not None:
+        observer.candidates(1, len(C1), 0, 0.0)
+        observer.level_end(1, len(L1), sum(level.values()))
+    del C1
+
+    # Step 2: Lk for k >= 2 via TID-list intersection
+    levels = iter_tid_levels(
+        L1,
+        2,
+        min_support,
+        num_trans,
+        backend,
+        observer,
+        spill,
+        weights,
+        vectorized_pairs,
+    )
+    del L1  # iter_tid_levels owns the TID-lists now
+    try:
+        yield from level.items()
+        for level in levels:
+            yield from level.items()
+        if spill is not None and stats is not None:
+            spill.report(stats)
+    finally:
+        if spill is not None:
+            spill.close()
+
+
+def apriori_tid(
+    transactions,
+    min_support,
+    backend="auto",
+    observer=None,
+    memory_budget=None,
+    stats=None,
+    weights=None,
+    vectorized_pairs=True,
+):
+    """
+    Optimized Apriori-TID.
+
+    backend selects the TID-list encoding (see tidlist.BACKENDS);
+    "auto" picks one per itemset from its density.
+    observer (optional instrument.MiningObserver) receives per-level counters.
+    memory_budget (bytes, optional) caps the resident TID-lists; the rest
+    spill to a memory-mapped scratch file (see spill.py) and stats (dict)
+    receives "spilled_bytes", "spilled_lists", "peak_resident_bytes" and
+    "spill_file_bytes".
+    weights (optional) gives each transaction's multiplicity, e.g. for
+    merged duplicates (see preprocess.py); supports are then weighted.
+    vectorized_pairs counts level 2 with one sparse product (see
+    pair_counts.py) and intersects only the frequent pairs.
+    iter_apriori_tid streams the same result level by level.
+    """
+    return collect_levels(
+        iter_apriori_tid(
+            transactions,
+            min_support,
+            backend,
+            observer,
+            memory_budget,
+            stats,
+            weights,
+            vectorized_pairs,
+        )
+    )
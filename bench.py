@@ -0,0 +1,268 @@
+"""
+Benchmark harness: every measurement runs in a fresh subprocess.
+
+For each dataset x support x algorithm cell the harness runs `warmup`
+discarded runs, then `repeats` timed runs, each in its own interpreter
+so no GC state, caches or memory left by a previous algorithm leaks
+into the next. A worker loads the dataset, collects garbage, times the
+algorithm with perf_counter and reports peak RSS. One extra run per cell
+measures the tracemalloc peak (tracing slows Python down, so it is never
+timed).
+
+Output: one CSV per dataset with main.py's columns (runtime_seconds is
+the median) plus runtime statistics and memory columns. peak_rss_mb is
+the worker process itself; children_peak_rss_mb is the largest peak of
+the processes it started (pool workers of the parallel miners), as
+getrusage reports a maximum over children, not their sum.
+
+Usage:
+    python bench.py "T10.I2.D100K*.txt" -a apriori_tid fp_growth \\
+        -s 0.0025 0.005 0.01 --repeats 5 --warmup 1
+"""
+
+import argparse
+import csv
+import gc
+import glob
+import json
+import os
+import re
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+DEFAULT_SUPPORTS = [0.0025, 0.0033, 0.005, 0.0075, 0.01, 0.015, 0.02]
+
+CSV_COLUMNS = [
+    "algorithm",
+    "support_percent",
+    "min_support",
+    "runtime_seconds",
+    "num_frequent_itemsets",
+    "switch_level",
+    "dataset",
+    "repeats",
+    "runtime_median",
+    "runtime_iqr",
+    "runtime_min",
+    "runtime_max",
+    "peak_rss_mb",
+    "children_peak_rss_mb",
+    "tracemalloc_peak_mb",
+]
+
+
+# ----------------------------------------------------
+# Worker (one measurement per process)
+# ----------------------------------------------------
+def run_worker(spec):
+    """Run one cell once and return its measurements as a dict."""
+    from main import load_transactions, run_algorithm
+
+    transactions = load_transactions(spec["dataset"])
+    min_support = max(1, int(spec["support"] * len(transactions)))
+    stats = {}
+
+    gc.collect()
+    if spec["tracemalloc"]:
+        tracemalloc.start()
+
+    start = time.perf_counter()
+    _, support_data = run_algorithm(
+        spec["algorithm"],
+        transactions,
+        min_support,
+        spec["dataset"],
+        spec["workers"],
+        spec["chunk_size"],
+        stats,
+    )
+    runtime = time.perf_counter() - start
+
+    traced_peak = 0
+    if spec["tracemalloc"]:
+        traced_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    # pool workers have exited and been waited for by now
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return {
+        "min_support": min_support,
+        "runtime": runtime,
+        "num_itemsets": len(support_data),
+        "switch_level": stats.get("switch_level", ""),
+        # ru_maxrss is in KB on Linux
+        "peak_rss_kb": own.ru_maxrss,
+        "children_peak_rss_kb": children.ru_maxrss,
+        "tracemalloc_peak": traced_peak,
+    }
+
+
+# ----------------------------------------------------
+# Driver
+# ----------------------------------------------------
+def measure(spec, timeout=None):
+    """Run one measurement in a fresh interpreter."""
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", json.dumps(spec)],
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(
+            f"{spec['algorithm']} on {spec['dataset']} failed:\n{proc.stderr}"
+        )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def iqr(values):
+    if len(values) < 2:
+        return 0.0
+    q1, _, q3 = statistics.quantiles(values, n=4, method="inclusive")
+    return q3 - q1
+
+
+def bench_cell(spec, repeats, warmup, trace, timeout=None):
+    for _ in range(warmup):
+        measure(dict(spec, tracemalloc=False), timeout)
+
+    runs = [measure(dict(spec, tracemalloc=False), timeout) for _ in range(repeats)]
+    runtimes = [run["runtime"] for run in runs]
+
+    traced_peak = ""
+    if trace:
+        traced = measure(dict(spec, tracemalloc=True), timeout)
+        traced_peak = traced["tracemalloc_peak"] / 2**20
+
+    first = runs[0]
+    median = statistics.median(runtimes)
+    return {
+        "algorithm": spec["algorithm"],
+        "support_percent": spec["support"] * 100,
+        "min_support": first["min_support"],
+        "runtime_seconds": median,
+        "num_frequent_itemsets": first["num_itemsets"],
+        "switch_level": first["switch_level"],
+        "dataset": os.path.basename(spec["dataset"]),
+        "repeats": repeats,
+        "runtime_median": median,
+        "runtime_iqr": iqr(runtimes),
+        "runtime_min": min(runtimes),
+        "runtime_max": max(runtimes),
+        "peak_rss_mb": max(run["peak_rss_kb"] for run in runs) / 1024,
+        "children_peak_rss_mb": max(r["children_peak_rss_kb"] for r in runs) / 1024,
+        "tracemalloc_peak_mb": traced_peak,
+    }
+
+
+def expand_datasets(patterns):
+    files = []
+    for pattern in patterns:
+        matched = sorted(glob.glob(pattern))
+        if not matched:
+            print(f"No dataset matches {pattern}", file=sys.stderr)
+        files.extend(f for f in matched if f not in files)
+    return files
+
+
+def main(argv=None):
+    from main import ALGORITHM_NAMES, default_algorithms
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark mining algorithms, one subprocess per run."
+    )
+    parser.add_argument("datasets", nargs="+", help="dataset files or glob patterns")
+    parser.add_argument(
+        "-a",
+        "--algorithms",
+        nargs="+",
+        default=[a for a in default_algorithms() if a in ALGORITHM_NAMES],
+        choices=ALGORITHM_NAMES,
+        metavar="ALGO",
+        help="algorithms to run (default: the baseline miners of main.py "
+        "plus EXTRA_ALGORITHMS)",
+    )
+    parser.add_argument(
+        "-s",
+        "--supports",
+        nargs="+",
+        type=float,
+        default=DEFAULT_SUPPORTS,
+        help="supports as fractions of the dataset (0.005 = 0.5%%)",
+    )
+    parser.add_argument("-r", "--repeats", type=int, default=5)
+    parser.add_argument("-w", "--warmup", type=int, default=1)
+    parser.add_argument(
+        "--no-tracemalloc", action="store_true", help="skip the tracemalloc run"
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=20000)
+    parser.add_argument("--timeout", type=float, default=None, help="seconds per run")
+    parser.add_argument("-o", "--output-dir", default=".")
+    args = parser.parse_args(argv)
+
+    if args.repeats < 1:
+        parser.error("--repeats must be at least 1")
+
+    for dataset in expand_datasets(args.datasets):
+        name = os.path.basename(dataset)
+        algos_str = "_".join(args.algorithms)
+        supports_str = "_".join(str(p) for p in args.supports)
+
+        # same name as main.py, seed suffix included (e.g. S1207 -> _s1207)
+        seed_match = re.search(r"S(\d+)", name)
+        seed_suffix = f"_s{seed_match.group(1)}" if seed_match else ""
+        csv_filename = os.path.join(
+            args.output_dir,
+            f"benchmark_output_{name}_{algos_str}_{supports_str}{seed_suffix}.csv",
+        )
+
+        with open(csv_filename, "w", newline="") as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=CSV_COLUMNS)
+            writer.writeheader()
+
+            for support in args.supports:
+                for algo in args.algorithms:
+                    spec = {
+                        "dataset": os.path.abspath(dataset),
+                        "algorithm": algo,
+                        "support": support,
+                        "workers": args.workers,
+                        "chunk_size": args.chunk_size,
+                    }
+                    try:
+                        row = bench_cell(
+                            spec,
+                            args.repeats,
+                            args.warmup,
+                            not args.no_tracemalloc,
+                            args.timeout,
+                        )
+                    except (RuntimeError, subprocess.TimeoutExpired) as e:
+                        print(f"{name} {algo} @ {support * 100:.2f}%: {e}")
+                        continue
+
+                    writer.writerow(row)
+                    csvfile.flush()
+                    print(
+                        f"{name} {algo} @ {support * 100:.2f}%: "
+                        f"median {row['runtime_median']:.4f}s "
+                        f"(IQR {row['runtime_iqr']:.4f}s), "
+                        f"{row['num_frequent_itemsets']} itemsets, "
+                        f"peak RSS {row['peak_rss_mb']:.1f} MB"
+                    )
+
+        print(f"Saved: {csv_filename}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--worker":
+        print(json.dumps(run_worker(json.loads(sys.argv[2]))))
+    else:
+        main()
@@ -0,0 +1,67 @@
+import time
+from collections import defaultdict
+
+
+def generate_candidates(
+    prev_frequent_itemsets, k, stats=None, fixed_prefix=0, observer=None
+):
+    """
+    Generate Ck from L(k-1) by prefix equivalence classes.
+
+    L(k-1) is grouped by (k-2)-prefix and only itemsets in the same class
+    are joined, so no pair is compared across classes. Every joined
+    candidate is then checked against a hash index of L(k-1): if any of
+    its (k-1)-subsets is not frequent it is pruned before any TID-list
+    or transaction is touched.
+
+    Input:
+        prev_frequent_itemsets: iterable of sorted tuples, all of length k-1
+        k: length of the candidates to build
+        stats: optional dict; "generated" and "pruned" are incremented
+        fixed_prefix: number of leading items shared by every itemset in
+            prev_frequent_itemsets (a class-local L(k-1)); subsets that
+            drop one of them live in other classes and are not checked
+        observer: optional instrument.MiningObserver; receives the
+            generated and pruned counts and the time spent here
+
+    Output:
+        list of sorted candidate tuples
+    """
+    start = time.perf_counter() if observer is not None else None
+    prev_index = set(prev_frequent_itemsets)
+
+    # Group L(k-1) into equivalence classes by (k-2)-prefix
+    classes = defaultdict(list)
+    for itemset in prev_index:
+        classes[itemset[:-1]].append(itemset[-1])
+
+    candidates = []
+    generated = pruned = 0
+
+    for prefix, tails in classes.items():
+        if len(tails) < 2:
+            continue
+        tails.sort()
+
+        for i, a in enumerate(tails):
+            head = prefix + (a,)
+            for b in tails[i + 1 :]:
+                cand = head + (b,)
+                generated += 1
+
+                # the two parents are known to be frequent; check the rest
+                if any(
+                    cand[:j] + cand[j + 1 :] not in prev_index
+                    for j in range(fixed_prefix, k - 2)
+                ):
+                    pruned += 1
+                    continue
+                candidates.append(cand)
+
+    if stats is not None:
+        stats["generated"] = stats.get("generated", 0) + generated
+        stats["pruned"] = stats.get("pruned", 0) + pruned
+    if observer is not None:
+        observer.candidates(k, generated, pruned, time.perf_counter() - start)
+
+    return candidates
@@ -0,0 +1,240 @@
+"""
+Condensed representations of the frequent itemsets.
+
+    charm  - closed itemsets (CHARM, Zaki & Hsiao): no superset has the
+             same support. The closed sets determine every frequent
+             itemset and its support (see support_from_closed).
+    genmax - maximal itemsets (GenMax, Gouda & Zaki): no superset is
+             frequent. Much smaller, but supports of subsets are lost.
+
+Both search the itemset-tidset tree depth first on the TID-lists of
+apriori_tid.py and never enumerate the full frequent lattice: CHARM
+merges branches whose tidsets are equal or nested, GenMax prunes any
+branch whose head plus all remaining tail items is contained in an
+already known maximal itemset.
+
+Output matches the other miners: (L, support_data) with sorted tuples,
+L grouped by length.
+"""
+
+from collections import defaultdict
+
+from apriori_tid import create_C1
+from itemset_io import collect_levels
+from tidlist import BitmapTidList, adapt, check_backend, make_tidlist
+
+
+def _frequent_items(transactions, min_support, backend):
+    """[(item, tidlist)] for frequent items, by increasing support."""
+    transactions = [set(t) for t in transactions]
+    num_trans = len(transactions)
+    C1 = create_C1(transactions)
+    items = [
+        (item, make_tidlist(tids, num_trans, backend))
+        for (item,), tids in C1.items()
+        if len(tids) >= min_support
+    ]
+    items.sort(key=lambda entry: (len(entry[1]), entry[0]))
+    return items, num_trans
+
+
+def _to_levels(found):
+    """{frozenset: support} -> (L, support_data) with sorted tuples."""
+    return collect_levels((tuple(sorted(itemset)), s) for itemset, s in found.items())
+
+
+# ----------------------------------------------------
+# Closed itemsets (CHARM)
+# ----------------------------------------------------
+def charm(transactions, min_support, backend="auto"):
+    """
+    Mine all closed frequent itemsets.
+
+    Input:
+        transactions: list of lists/sets of items
+        min_support: integer support threshold (count, not fraction)
+        backend: TID-list encoding (see tidlist.BACKENDS)
+
+    Output:
+        L: list of lists of tuples (closed itemsets by level)
+        support_data: dict {tuple: support_count}
+    """
+    check_backend(backend)
+    items, num_trans = _frequent_items(transactions, min_support, backend)
+
+    # closed sets found so far, bucketed by (support, sum of TIDs): a set
+    # can only be subsumed by a closed superset with the same tidset
+    closed = {}
+    buckets = defaultdict(list)
+
+    def extend(nodes):
+        """nodes: list of [itemset (frozenset), tidlist], increasing support."""
+        removed = [False] * len(nodes)
+
+        for i in range(len(nodes)):
+            if removed[i]:
+                continue
+            head, head_tids = nodes[i]
+            head_support = len(head_tids)
+            grown = set()  # items every child inherits (properties 1 and 2)
+            children = []
+
+            for j in range(i + 1, len(nodes)):
+                if removed[j]:
+                    continue
+                other, other_tids = nodes[j]
+                tids = head_tids.intersect(other_tids)
+                support = len(tids)
+                if support < min_support:
+                    continue
+
+                if support == head_support:
+                    # t(head) is contained in t(other): other's items
+                    # belong to the closure of head
+                    grown |= other
+                    if support == len(other_tids):
+                        removed[j] = True  # equal tidsets, same closure
+                elif support == len(other_tids):
+                    # t(other) inside t(head): other only lives on under head
+                    removed[j] = True
+                    children.append([other, adapt(tids, num_trans, backend)])
+                else:
+                    children.append([other, adapt(tids, num_trans, backend)])
+
+            head = head | grown
+            if children:
+                children.sort(key=lambda node: len(node[1]))
+                extend([[head | other, tids] for other, tids in children])
+
+            bucket = buckets[head_support, sum(head_tids)]
+            if not any(head <= c for c in bucket):
+                closed[head] = head_support
+                bucket.append(head)
+
+    extend([[frozenset((item,)), tids] for item, tids in items])
+
+    return _to_levels(closed)
+
+
+class ClosedSupport:
+    """
+    Support of any frequent itemset, recovered from the closed itemsets.
+
+    support(X) is the largest support of a closed superset of X, and X is
+    frequent iff such a superset exists. Closed sets are numbered by
+    decreasing support and every item keeps a bitmap of the sets that
+    contain it, so a lookup is an AND of X's bitmaps and its lowest set
+    bit names the answer.
+    """
+
+    def __init__(self, closed_support):
+        self.closed = sorted(
+            ((frozenset(c), s) for c, s in closed_support.items()),
+            key=lambda entry: -entry[1],
+        )
+        postings = defaultdict(list)
+        for pos, (itemset, _) in enumerate(self.closed):
+            for item in itemset:
+                postings[item].append(pos)
+        self.masks = {
+            item: BitmapTidList.from_sorted(positions).bits
+            for item, positions in postings.items()
+        }
+
+    def support(self, itemset):
+        """Support of itemset, or 0 if it is not frequent."""
+        if not self.closed:
+            return 0
+        mask = -1
+        for item in itemset:
+            mask &= self.masks.get(item, 0)
+            if not mask:
+                return 0
+        if mask == -1:  # empty itemset
+            return self.closed[0][1]
+        return self.closed[(mask & -mask).bit_length() - 1][1]
+
+    def __contains__(self, itemset):
+        return self.support(itemset) > 0
+
+    def __getitem__(self, itemset):
+        support = self.support(itemset)
+        if not support:
+            raise KeyError(itemset)
+        return support
+
+
+def support_from_closed(itemset, closed_support):
+    """
+    One-off support lookup from closed itemsets (0 if infrequent).
+
+    For many lookups build a ClosedSupport once instead.
+    """
+    itemset = frozenset(itemset)
+    return max(
+        (s for c, s in closed_support.items() if itemset <= frozenset(c)), default=0
+    )
+
+
+# ----------------------------------------------------
+# Maximal itemsets (GenMax)
+# ----------------------------------------------------
+def genmax(transactions, min_support, backend="auto"):
+    """
+    Mine all maximal frequent itemsets.
+
+    Backtracking over the item tree with progressive focusing: each call
+    only checks subsumption against the maximal sets that contain its
+    head, and hands newly found ones back to its caller.
+
+    Input:
+        transactions: list of lists/sets of items
+        min_support: integer support threshold (count, not fraction)
+        backend: TID-list encoding (see tidlist.BACKENDS)
+
+    Output:
+        L: list of lists of tuples (maximal itemsets by level)
+        support_data: dict {tuple: support_count}
+    """
+    check_backend(backend)
+    items, num_trans = _frequent_items(transactions, min_support, backend)
+
+    maximal = {}
+
+    def search(head, tail, local):
+        """
+        head: frozenset, tail: [(item, tidlist of head + item)] by
+        increasing support, local: maximal sets containing head.
+        Returns the maximal sets found below head.
+        """
+        found = []
+        for i, (item, tids) in enumerate(tail):
+            # look-ahead: head + everything still to try is already covered
+            reach = head.union(x for x, _ in tail[i:])
+            if any(reach <= m for m in local):
+                break
+
+            new_head = head | {item}
+            new_tail = []
+            for other, other_tids in tail[i + 1 :]:
+                common = tids.intersect(other_tids)
+                if len(common) >= min_support:
+                    new_tail.append((other, adapt(common, num_trans, backend)))
+
+            if new_tail:
+                new_tail.sort(key=lambda entry: len(entry[1]))
+                new_local = [m for m in local if item in m]
+                new = search(new_head, new_tail, new_local)
+            elif not any(new_head <= m for m in local):
+                maximal[new_head] = len(tids)
+                new = [new_head]
+            else:
+                new = []
+
+            local.extend(new)
+            found.extend(new)
+        return found
+
+    search(frozenset(), items, [])
+
+    return _to_levels(maximal)
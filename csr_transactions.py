@@ -0,0 +1,249 @@
+"""
+Compact binary container for transaction datasets (CSR layout).
+
+File layout (little endian):
+    header   - magic, version, D, N, nnz, T, I, seed, section offsets
+    items    - int32[nnz], every transaction's items back to back
+    offsets  - int64[D + 1], transaction i is items[offsets[i]:offsets[i+1]]
+
+load_csr() memory-maps the file, so opening a dataset costs milliseconds,
+transactions are zero-copy views, and processes opening the same file
+share its pages. load_transactions() opens either a .csr file or a text
+dataset (one transaction per line).
+
+Usage:
+    python csr_transactions.py T10.I2.D100K.txt [more.txt ...]
+"""
+
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+from array import array
+from itertools import accumulate
+
+MAGIC = b"TXNCSR01"
+VERSION = 1
+CSR_SUFFIX = ".csr"
+
+# magic, version, D, N, nnz, T, I, seed, items_pos, offsets_pos
+HEADER = struct.Struct("<8sIqqqiiqqq")
+
+# Lines parsed per block by the text converter
+CONVERT_BLOCK_BYTES = 1 << 24
+
+
+def parse_dataset_name(path):
+    """Return (T, I, seed) from a T*.I*.D*[.S*] file name, -1 if absent."""
+    name = os.path.basename(path)
+    match = re.search(r"T(\d+)\.I(\d+)\.D[\w.]*?(?:\.S(\d+))?\.", name)
+    if not match:
+        return -1, -1, -1
+    T, I, seed = match.groups()
+    return int(T), int(I), int(seed) if seed is not None else -1
+
+
+class CSRWriter:
+    """
+    Stream transactions into a CSR file with constant memory.
+
+    Items go straight to the output file; offsets are spooled to a
+    temporary file and appended on close, then the header is rewritten.
+    """
+
+    def __init__(self, path, T=-1, I=-1, seed=-1):
+        self.path = path
+        self.T, self.I, self.seed = T, I, seed
+        self.f = open(path, "wb")
+        self.f.write(b"\0" * HEADER.size)
+        self.offsets_file = tempfile.TemporaryFile()
+        self.items = array("i")
+        self.offsets = array("q", [0])
+        self.nnz = 0
+        self.num_trans = 0
+        self.max_item = -1
+
+    def append(self, txn):
+        self.extend([txn])
+
+    def extend(self, transactions):
+        for txn in transactions:
+            self.items.extend(txn)
+            self.nnz += len(txn)
+            self.offsets.append(self.nnz)
+            self.num_trans += 1
+        if len(self.items) >= 1 << 20:
+            self._flush()
+
+    def extend_flat(self, items, lengths):
+        """
+        Append many transactions given back to back.
+
+        items: int32 buffer (array("i"), numpy array, bytes) of every
+            transaction's items; lengths: the item count of each one
+        """
+        self._flush()
+        items = memoryview(items).cast("B").cast("i")
+        if len(items):
+            self.max_item = max(self.max_item, max(items))
+        self.f.write(items)
+        offsets = array("q", accumulate(lengths, initial=self.nnz))
+        self.nnz = offsets[-1]
+        self.num_trans += len(offsets) - 1
+        offsets[1:].tofile(self.offsets_file)
+
+    def _flush(self):
+        if self.items:
+            self.max_item = max(self.max_item, max(self.items))
+            self.items.tofile(self.f)
+            self.items = array("i")
+        self.offsets.tofile(self.offsets_file)
+        self.offsets = array("q")
+
+    def close(self):
+        self._flush()
+        offsets_pos = self.f.tell()
+        self.offsets_file.seek(0)
+        while True:
+            block = self.offsets_file.read(1 << 20)
+            if not block:
+                break
+            self.f.write(block)
+        self.offsets_file.close()
+
+        self.f.seek(0)
+        self.f.write(
+            HEADER.pack(
+                MAGIC,
+                VERSION,
+                self.num_trans,
+                self.max_item + 1,
+                self.nnz,
+                self.T,
+                self.I,
+                self.seed,
+                HEADER.size,
+                offsets_pos,
+            )
+        )
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CSRTransactions:
+    """
+    Read-only, memory-mapped transaction dataset.
+
+    Behaves like a list of transactions: len(), indexing and iteration
+    give zero-copy int32 memoryviews that iterate as ints.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (
+            magic,
+            version,
+            self.D,
+            self.N,
+            self.nnz,
+            self.T,
+            self.I,
+            self.seed,
+            items_pos,
+            offsets_pos,
+        ) = HEADER.unpack_from(self._mm)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} CSR dataset")
+
+        view = memoryview(self._mm)
+        self.items = view[items_pos : items_pos + 4 * self.nnz].cast("i")
+        self.offsets = view[offsets_pos : offsets_pos + 8 * (self.D + 1)].cast("q")
+
+    def __len__(self):
+        return self.D
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self.D))]
+        if i < 0:
+            i += self.D
+        return self.items[self.offsets[i] : self.offsets[i + 1]]
+
+    def __iter__(self):
+        items, offsets = self.items, self.offsets
+        for i in range(self.D):
+            yield items[offsets[i] : offsets[i + 1]]
+
+    def __reduce__(self):
+        # Pickle by path: other processes map the same file
+        return (CSRTransactions, (self.path,))
+
+    def numpy_arrays(self):
+        """(items, offsets) as zero-copy numpy arrays (requires numpy)."""
+        import numpy as np
+
+        return (
+            np.frombuffer(self.items, dtype=np.int32),
+            np.frombuffer(self.offsets, dtype=np.int64),
+        )
+
+
+def load_csr(path):
+    return CSRTransactions(path)
+
+
+def load_transactions(path):
+    """Transactions of a dataset: one per line of text, or a .csr file."""
+    # Binary CSR datasets are memory-mapped instead of parsed
+    if path.endswith(CSR_SUFFIX):
+        return load_csr(path)
+
+    transactions = []
+    with open(path) as f:
+        for line in f:
+            items = list(map(int, line.strip().split()))
+            transactions.append(items)
+    return transactions
+
+
+def convert_text(src, dst=None):
+    """
+    One-shot converter from a one-transaction-per-line text file.
+
+    Lines are parsed in large blocks so int conversion runs in C.
+    Returns the output path (src with .txt replaced by .csr by default).
+    """
+    if dst is None:
+        dst = os.path.splitext(src)[0] + CSR_SUFFIX
+
+    T, I, seed = parse_dataset_name(src)
+    with open(src, "rb") as f, CSRWriter(dst, T, I, seed) as writer:
+        while True:
+            lines = f.readlines(CONVERT_BLOCK_BYTES)
+            if not lines:
+                break
+            items = array("i", map(int, b" ".join(lines).split()))
+            pos = 0
+            block = []
+            for line in lines:
+                n = len(line.split())
+                block.append(items[pos : pos + n])
+                pos += n
+            writer.extend(block)
+
+    return dst
+
+
+if __name__ == "__main__":
+    for src in sys.argv[1:]:
+        print(f"{src} -> {convert_text(src)}")
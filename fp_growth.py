@@ -0,0 +1,365 @@
+from array import array
+from collections import Counter
+from itertools import chain, combinations
+
+from itemset_io import collect_levels
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, pattern bases are then walked in Python
+    np = None
+
+# With numpy, trees of NUMPY_MIN_PATHS paths or more are built with
+# array operations, and trees of NUMPY_MIN_NODES nodes or more walk the
+# pattern bases of their long link chains (NUMPY_MIN_CHAIN nodes or more)
+# all at once
+NUMPY_MIN_PATHS = 512
+NUMPY_MIN_NODES = 4096
+NUMPY_MIN_CHAIN = 64
+
+
+def _to_array(typecode, values):
+    result = array(typecode)
+    result.frombytes(values.astype(np.int32 if typecode == "i" else np.int64).tobytes())
+    return result
+
+
+def _row_starts(lengths):
+    starts = np.zeros(len(lengths), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=starts[1:])
+    return starts
+
+
+class FPTree:
+    """
+    Array-backed FP-tree.
+
+    Nodes live in parallel arrays instead of per-node objects:
+        item[n]   - item rank stored in node n (root is node 0)
+        count[n]  - support count of the path ending at n
+        parent[n] - parent node index
+        link[n]   - next node holding the same item (-1 ends the chain)
+
+    The header table is two arrays indexed by rank: head[r] is the first
+    node holding r (-1 if none) and totals[r] its summed count. A tree is
+    built in one go from its paths sorted lexicographically; a path then
+    shares nodes only with the one before it, so no child lookup is
+    needed and nodes are numbered in depth-first order.
+    """
+
+    __slots__ = ("item", "count", "parent", "link", "head", "totals", "by_rank")
+
+    def __init__(self, paths, num_ranks):
+        """
+        paths: iterable of (ranks, weight), ranks ascending and non-empty
+        num_ranks: ranks are below this
+        """
+        paths = list(paths)
+        self.by_rank = None
+        if np is not None and len(paths) >= NUMPY_MIN_PATHS:
+            all_ranks = [ranks for ranks, _ in paths]
+            lengths = np.fromiter(map(len, all_ranks), dtype=np.int64)
+            flat = np.fromiter(
+                chain.from_iterable(all_ranks), dtype=np.int32, count=lengths.sum()
+            )
+            weights = np.fromiter((weight for _, weight in paths), dtype=np.int64)
+            del all_ranks, paths
+            self._build_vectorized(flat, lengths, weights, num_ranks)
+            return
+
+        item = self.item = array("i", [-1])
+        count = self.count = array("q", [0])
+        parent = self.parent = array("i", [-1])
+        link = self.link = array("i", [-1])
+        head = self.head = array("i", [-1]) * num_ranks
+
+        # stack[d] is the node at depth d + 1 of the previous path
+        stack = []
+        prev = ()
+        for ranks, weight in sorted(paths):
+            common = 0
+            limit = min(len(prev), len(ranks))
+            while common < limit and prev[common] == ranks[common]:
+                common += 1
+            del stack[common:]
+            node = stack[-1] if stack else 0
+            for r in ranks[common:]:
+                child = len(item)
+                item.append(r)
+                count.append(0)
+                parent.append(node)
+                link.append(head[r])
+                head[r] = child
+                stack.append(child)
+                node = child
+            # weights are added at the path's end and summed up below
+            count[node] += weight
+            prev = ranks
+
+        # children come after their parent, so one backward pass sums
+        # every subtree into its root
+        totals = self.totals = array("q", [0]) * num_ranks
+        for n in range(len(item) - 1, 0, -1):
+            c = count[n]
+            count[parent[n]] += c
+            totals[item[n]] += c
+
+    @classmethod
+    def from_flat(cls, flat, lengths, weights, num_ranks):
+        """
+        Tree of paths given as NumPy arrays (needs numpy).
+
+        flat holds every path's ranks back to back (ascending within a
+        path), lengths the length of each path (all > 0) and weights its
+        count.
+        """
+        if len(lengths) < NUMPY_MIN_PATHS:
+            ends = np.cumsum(lengths).tolist()
+            flat = flat.tolist()
+            paths = [
+                (tuple(flat[a:b]), w)
+                for a, b, w in zip([0] + ends[:-1], ends, weights.tolist())
+            ]
+            return cls(paths, num_ranks)
+        tree = cls.__new__(cls)
+        tree.by_rank = None
+        tree._build_vectorized(flat, lengths, weights, num_ranks)
+        return tree
+
+    def _build_vectorized(self, flat, lengths, weights, num_ranks):
+        """The same tree, node numbers included, built with NumPy."""
+        # Sort the paths lexicographically: pad them into rows (-1 sorts
+        # before any rank, so a prefix comes first) and sort by column
+        starts = _row_starts(lengths)
+        row = np.repeat(np.arange(len(lengths)), lengths)
+        depth = np.arange(len(flat)) - starts[row]
+        padded = np.full((len(lengths), int(lengths.max())), -1, dtype=np.int32)
+        padded[row, depth] = flat
+        order = np.lexsort(padded.T[::-1])
+        padded = padded[order]
+        flat = padded[padded >= 0]
+        lengths, weights = lengths[order], weights[order]
+        del padded, order
+
+        starts = _row_starts(lengths)
+        row = np.repeat(np.arange(len(lengths)), lengths)
+        depth = np.arange(len(flat)) - starts[row]
+
+        # Common prefix with the previous path: the first depth at which
+        # they differ, or where either of them ends
+        prev_start = np.concatenate(([0], starts[:-1]))[row]
+        prev_length = np.concatenate(([0], lengths[:-1]))[row]
+        same = depth < prev_length
+        same[same] = flat[same] == flat[(prev_start + depth)[same]]
+        common = np.minimum.reduceat(np.where(same, lengths[row], depth), starts)
+        new = depth >= common[row]
+
+        # New nodes are numbered in path order, as in the loop. A shared
+        # element is the newest node created at its depth so far; each
+        # depth's first element is new, so offsetting ids by depth lets a
+        # running maximum fill them in within depths only.
+        node_id = np.cumsum(new)
+        offset = depth * (len(flat) + 1)
+        by_depth = np.lexsort((row, depth))
+        filled = np.maximum.accumulate(np.where(new, node_id + offset, 0)[by_depth])
+        node_id[by_depth] = filled - offset[by_depth]
+
+        num_nodes = int(node_id.max()) + 1
+        positions = np.flatnonzero(new)
+        item = np.concatenate(([-1], flat[new]))
+        parent = np.zeros(num_nodes, dtype=np.int64)
+        parent[0] = -1
+        parent[1:] = np.where(depth[new] > 0, node_id[positions - 1], 0)
+        # every path passes each of its nodes once
+        count = np.bincount(node_id, weights=weights[row], minlength=num_nodes)
+        count = count.astype(np.int64)
+        count[0] = weights.sum()
+        totals = np.bincount(item[1:], weights=count[1:], minlength=num_ranks)
+
+        # link chains and head: the previous / last node of each rank
+        order = np.argsort(item[1:], kind="stable")
+        nodes, ranks = order + 1, item[1:][order]
+        link = np.full(num_nodes, -1, dtype=np.int64)
+        follows = ranks[1:] == ranks[:-1]
+        link[nodes[1:][follows]] = nodes[:-1][follows]
+        last = np.append(~follows, True)
+        head = np.full(num_ranks, -1, dtype=np.int64)
+        head[ranks[last]] = nodes[last]
+        self.by_rank = (nodes, np.searchsorted(ranks, np.arange(num_ranks + 1)))
+
+        self.item = _to_array("i", item)
+        self.count = _to_array("q", count)
+        self.parent = _to_array("i", parent)
+        self.link = _to_array("i", link)
+        self.head = _to_array("i", head)
+        self.totals = _to_array("q", totals)
+
+    def is_single_path(self):
+        # nodes are numbered depth-first, so a chain has parent = n - 1
+        return all(self.parent[n] == n - 1 for n in range(1, len(self.parent)))
+
+    def rank_nodes(self, rank):
+        """
+        Nodes holding rank as a NumPy array, or None.
+
+        Trees of at least NUMPY_MIN_NODES nodes, and those built with
+        NumPy, index their nodes by rank once; other trees follow the link
+        chains instead.
+        """
+        if self.by_rank is None:
+            if np is None or len(self.item) < NUMPY_MIN_NODES:
+                return None
+            ranks = np.frombuffer(self.item, dtype=np.int32)[1:]
+            order = np.argsort(ranks, kind="stable") + 1
+            bounds = np.searchsorted(ranks[order - 1], np.arange(len(self.head) + 1))
+            self.by_rank = (order, bounds)
+        order, bounds = self.by_rank
+        return order[bounds[rank] : bounds[rank + 1]]
+
+    def conditional_tree(self, rank, min_support):
+        """Build the conditional FP-tree from the pattern base of `rank`."""
+        nodes = self.rank_nodes(rank)
+        if nodes is not None and len(nodes) >= NUMPY_MIN_CHAIN:
+            flat, lengths, weights = self._vectorized_base(nodes, min_support)
+            return FPTree.from_flat(flat, lengths, weights, rank)
+
+        if nodes is None:
+            nodes = []
+            node = self.head[rank]
+            while node != -1:
+                nodes.append(node)
+                node = self.link[node]
+        else:
+            nodes = nodes.tolist()
+
+        item, parent = self.item, self.parent
+        paths = []
+        counts = array("q", [0]) * rank  # the base holds only lower ranks
+        for node in nodes:
+            weight = self.count[node]
+            path = []
+            p = parent[node]
+            while p > 0:
+                r = item[p]
+                path.append(r)
+                counts[r] += weight
+                p = parent[p]
+            if path:
+                paths.append((path, weight))
+
+        # path was collected leaf -> root, i.e. descending rank
+        filtered = []
+        for path, weight in paths:
+            ranks = tuple([r for r in reversed(path) if counts[r] >= min_support])
+            if ranks:
+                filtered.append((ranks, weight))
+        return FPTree(filtered, rank)
+
+    def _vectorized_base(self, nodes, min_support):
+        """
+        Filtered pattern base of a long chain, walked up all at once.
+
+        Returns the non-empty paths as (flat, lengths, weights), see
+        from_flat.
+        """
+        item = np.frombuffer(self.item, dtype=np.int32)
+        parent = np.frombuffer(self.parent, dtype=np.int32)
+        weights = np.frombuffer(self.count, dtype=np.int64)[nodes]
+
+        # (path, rank) pairs, one per ancestor of every node
+        rows, cols = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int32)]
+        path = np.arange(len(nodes))
+        p = parent[nodes]
+        while True:
+            inner = p > 0
+            path, p = path[inner], p[inner]
+            if not len(path):
+                break
+            rows.append(path)
+            cols.append(item[p])
+            p = parent[p]
+        rows = np.concatenate(rows)
+        cols = np.concatenate(cols)
+
+        counts = np.bincount(cols, weights=weights[rows])
+        keep = counts[cols] >= min_support
+        rows, cols = rows[keep], cols[keep]
+        order = np.lexsort((cols, rows))
+        lengths = np.bincount(rows, minlength=len(nodes))
+        kept = lengths > 0
+        return cols[order], lengths[kept], weights[kept]
+
+
+def _mine(tree, suffix, min_support, out):
+    """Recursively emit {tuple-of-ranks: support} into out."""
+    if tree.is_single_path():
+        # Single-path shortcut: every combination of path nodes is frequent
+        # with the support of its deepest node
+        path = list(range(1, len(tree.item)))
+        for size in range(1, len(path) + 1):
+            for combo in combinations(path, size):
+                support = tree.count[combo[-1]]
+                if support >= min_support:
+                    out[suffix + tuple(tree.item[n] for n in combo)] = support
+        return
+
+    # Least frequent items first
+    for rank in range(len(tree.head) - 1, -1, -1):
+        support = tree.totals[rank]
+        if support < min_support:
+            continue
+        itemset = suffix + (rank,)
+        out[itemset] = support
+
+        cond = tree.conditional_tree(rank, min_support)
+        if len(cond.item) > 1:
+            _mine(cond, itemset, min_support, out)
+
+
+def fp_growth(transactions, min_support):
+    """
+    FP-Growth with an array-backed FP-tree.
+
+    Uses conditional pattern-base projection and the single-path shortcut,
+    so no candidate itemsets are generated.
+
+    Input:
+        transactions: list of lists/sets of items
+        min_support: integer support threshold (count, not fraction)
+
+    Output:
+        L: list of lists of tuples (frequent itemsets by level)
+        support_data: dict {tuple: support_count}
+    """
+    transactions = list(transactions)
+
+    # Step 1: item frequencies, ranked by descending support
+    item_counts = Counter(chain.from_iterable(map(set, transactions)))
+
+    frequent = sorted(
+        (item for item, c in item_counts.items() if c >= min_support),
+        key=lambda item: (-item_counts[item], item),
+    )
+    rank_of = {item: r for r, item in enumerate(frequent)}
+
+    # Step 2: build the FP-tree from rank-ordered transactions; identical
+    # ones become a single weighted path
+    paths = Counter(
+        tuple(sorted(map(rank_of.__getitem__, rank_of.keys() & txn)))
+        for txn in transactions
+    )
+    del transactions
+    paths.pop((), None)
+    tree = FPTree(paths.items(), len(frequent))
+    del paths
+
+    # Step 3: mine it
+    found = {}
+    if len(tree.item) > 1:
+        _mine(tree, (), min_support, found)
+
+    # Map ranks back to items, grouped by level
+    return collect_levels(
+        (tuple(sorted(frequent[r] for r in ranks)), support)
+        for ranks, support in found.items()
+    )
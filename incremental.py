@@ -0,0 +1,177 @@
+"""
+Incremental update of frequent itemsets when transactions are appended
+(FUP, Cheung et al.).
+
+Given the result mined over the old data D and a batch d of new
+transactions, every level k is updated as follows:
+
+    - itemsets frequent in D only need their count in d added
+    - every other candidate must be frequent in d alone by a margin:
+      with support_D(X) < old_min_support, X can only reach min_support
+      over D + d if support_d(X) >= min_support - old_min_support + 1.
+      Only the candidates passing that test are counted over D.
+
+So D is scanned only for itemsets that may newly become frequent, and a
+level whose new candidates all fail the test never touches D at all.
+The result is exactly the one a full re-mine of D + d would give.
+"""
+
+from collections import defaultdict
+
+from apriori import CandidateTrie
+from candidates import generate_candidates
+from itemset_io import collect_levels
+
+
+def _count_items(transactions, items):
+    counts = dict.fromkeys(items, 0)
+    for txn in transactions:
+        for item in set(txn):
+            if item in counts:
+                counts[item] += 1
+    return counts
+
+
+def _frequent_work(transactions, frequent_items):
+    """(tid, sorted items) restricted to frequent_items, as the trie needs."""
+    work = []
+    for tid, txn in enumerate(transactions):
+        items = sorted(frequent_items.intersection(txn))
+        if len(items) >= 2:
+            work.append((tid, items))
+    return work
+
+
+def _count_in(work, candidates):
+    trie = CandidateTrie(candidates)
+    trie.count(work)
+    return dict(trie.items())
+
+
+def _like(template, support_data):
+    """Give support_data and its levels the key and level types of template."""
+    L_template, support_template = template
+    first = next(iter(support_template), ())
+    make_key = frozenset if isinstance(first, frozenset) else tuple
+
+    level_type = type(L_template[0]) if L_template else list
+    return collect_levels(
+        (
+            (make_key(itemset), support_data[itemset])
+            for itemset in sorted(support_data, key=lambda i: (len(i), i))
+        ),
+        level_type,
+    )
+
+
+def fup_update(
+    old_transactions,
+    old_result,
+    old_min_support,
+    new_transactions,
+    min_support,
+    stats=None,
+):
+    """
+    Update a mining result after appending new transactions.
+
+    Input:
+        old_transactions: the data old_result was mined from
+        old_result: (L, support_data) of any miner over old_transactions,
+            complete for old_min_support
+        old_min_support: integer threshold old_result was mined with
+        new_transactions: the appended batch
+        min_support: integer threshold for old + new data (counts, so a
+            fixed percentage becomes a larger count as the data grows);
+            must be >= old_min_support
+        stats: optional dict, receives "old_scans" (levels that had to
+            scan the old data) and "old_candidates" (itemsets counted there)
+
+    Output:
+        (L, support_data) over old + new data, in old_result's format
+    """
+    if min_support < old_min_support:
+        raise ValueError(
+            "min_support must not be lower than old_min_support: itemsets "
+            "below the old threshold are not in old_result"
+        )
+
+    old_support = defaultdict(dict)  # k -> {sorted tuple: support in D}
+    for itemset, support in old_result[1].items():
+        key = tuple(sorted(itemset))
+        old_support[len(key)][key] = support
+
+    # a candidate that was infrequent in D needs at least this much in d
+    delta_min = min_support - old_min_support + 1
+    old_scans = old_candidates = 0
+
+    # Step 1: items
+    new_counts = defaultdict(int)
+    for txn in new_transactions:
+        for item in set(txn):
+            new_counts[item] += 1
+
+    support_data = {}
+    for (item,), support in old_support[1].items():
+        total = support + new_counts.get(item, 0)
+        if total >= min_support:
+            support_data[(item,)] = total
+
+    fresh = [
+        item
+        for item, count in new_counts.items()
+        if (item,) not in old_support[1] and count >= delta_min
+    ]
+    if fresh:
+        old_scans += 1
+        old_candidates += len(fresh)
+        for item, count in _count_items(old_transactions, fresh).items():
+            if count + new_counts[item] >= min_support:
+                support_data[(item,)] = count + new_counts[item]
+
+    prev_L = [itemset for itemset in support_data]
+    frequent_items = {item for (item,) in prev_L}
+    new_work = _frequent_work(new_transactions, frequent_items)
+    old_work = None  # built on the first level that needs D
+
+    # Step 2: levels k >= 2
+    k = 2
+    while prev_L:
+        Ck = generate_candidates(prev_L, k)
+        if not Ck:
+            break
+
+        # one pass over d counts old winners and new candidates alike
+        in_new = _count_in(new_work, Ck)
+        known = old_support[k]
+
+        Lk = []
+        fresh = []
+        for cand in Ck:
+            if cand in known:
+                total = known[cand] + in_new[cand]
+                if total >= min_support:
+                    support_data[cand] = total
+                    Lk.append(cand)
+            elif in_new[cand] >= delta_min:
+                fresh.append(cand)
+
+        if fresh:
+            if old_work is None:
+                old_work = _frequent_work(old_transactions, frequent_items)
+            old_scans += 1
+            old_candidates += len(fresh)
+            for cand, count in _count_in(old_work, fresh).items():
+                total = count + in_new[cand]
+                if total >= min_support:
+                    support_data[cand] = total
+                    Lk.append(cand)
+
+        prev_L = Lk
+        k += 1
+
+    if stats is not None:
+        stats["old_scans"] = old_scans
+        stats["old_candidates"] = old_candidates
+
+    return _like(old_result, support_data)
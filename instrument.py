@@ -0,0 +1,107 @@
+"""
+Per-level instrumentation for the level-wise miners.
+
+SETM, apriori_native, apriori_tid, apriori_hybrid and apriori_diffset
+accept an optional observer and call its hooks while they mine:
+
+    level_start(k)                           - level k begins
+    candidates(k, generated, pruned, secs)   - from generate_candidates
+    intersected(nbytes, secs)                - one TID-list operation
+    level_end(k, frequent, tid_elements)     - level k is done
+
+Without an observer the miners skip every hook, so nothing is timed or
+measured. LevelRecorder turns the hooks into one row per level, which
+main.py writes to a per-level CSV.
+"""
+
+import csv
+import time
+
+
+class MiningObserver:
+    """Observer with no-op hooks; override the ones you need."""
+
+    def level_start(self, k):
+        pass
+
+    def candidates(self, k, generated, pruned, seconds):
+        pass
+
+    def intersected(self, nbytes, seconds):
+        pass
+
+    def level_end(self, k, frequent, tid_elements):
+        pass
+
+
+class LevelRecorder(MiningObserver):
+    """
+    Collects one record per level.
+
+    Every record is a dict with the LevelRecorder.COLUMNS keys:
+        level: k
+        seconds: wall time of the whole level
+        candidate_seconds: time spent in generate_candidates
+        intersect_seconds: time spent intersecting TID-lists; the rest of
+            `seconds` is bookkeeping (dicts, re-encoding, counting)
+        candidates: candidates joined (items seen, for level 1)
+        pruned: candidates dropped by the subset check (at level 2 with
+            vectorized pairs: co-occurring pairs below min_support)
+        frequent: frequent itemsets found
+        tid_elements: TIDs held by the level's kept TID-lists
+        bytes_intersected: footprint of every TID-list operand
+    """
+
+    COLUMNS = (
+        "level",
+        "seconds",
+        "candidate_seconds",
+        "intersect_seconds",
+        "candidates",
+        "pruned",
+        "frequent",
+        "tid_elements",
+        "bytes_intersected",
+    )
+
+    def __init__(self):
+        self.levels = []
+        self._current = None
+        self._start = None
+
+    def level_start(self, k):
+        self._current = dict.fromkeys(self.COLUMNS, 0)
+        self._current["level"] = k
+        self._start = time.perf_counter()
+
+    def candidates(self, k, generated, pruned, seconds):
+        self._current["candidates"] += generated
+        self._current["pruned"] += pruned
+        self._current["candidate_seconds"] += seconds
+
+    def intersected(self, nbytes, seconds):
+        self._current["bytes_intersected"] += nbytes
+        self._current["intersect_seconds"] += seconds
+
+    def level_end(self, k, frequent, tid_elements):
+        self._current["seconds"] = time.perf_counter() - self._start
+        self._current["frequent"] = frequent
+        self._current["tid_elements"] = tid_elements
+        self.levels.append(self._current)
+        self._current = None
+
+
+def write_levels_csv(rows, path):
+    """
+    Write per-level records (dicts) to a CSV file.
+
+    Keys outside LevelRecorder.COLUMNS (e.g. algorithm, support) become
+    leading columns, in the order of the first row.
+    """
+    rows = list(rows)
+    extra = [key for key in rows[0] if key not in LevelRecorder.COLUMNS] if rows else []
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=extra + list(LevelRecorder.COLUMNS))
+        writer.writeheader()
+        writer.writerows(rows)
+    return len(rows)
@@ -0,0 +1,58 @@
+"""
+Consumers for the streaming miners (iter_setm, iter_apriori_tid, ...).
+
+The iter_* miners yield (itemset, support) pairs level by level, as each
+level is finished, and drop the TID-lists of a level once the next one
+no longer needs them. collect_levels() rebuilds the usual (L,
+support_data) from such a stream, or from the pairs of any miner that
+does not work level by level; write_itemsets() sends it straight to a
+file instead, so no level is kept after it has been written.
+
+File format (SPMF style), one itemset per line:
+    1 5 9 #SUP: 12
+"""
+
+
+def collect_levels(pairs, level_type=list, keep_empty=True):
+    """
+    (L, support_data) from (itemset, support) pairs, L[k - 1] holding the
+    itemsets of length k.
+
+    Pairs may come in any order (e.g. support_data.items() of a
+    depth-first miner); each level keeps the order its itemsets came in.
+    level_type is the container of each level (list, set or dict of
+    supports); with keep_empty an empty result still has an empty L1, as
+    the level-wise miners return.
+    """
+    levels, support_data = [], {}
+    for itemset, support in pairs:
+        while len(levels) < len(itemset):
+            levels.append([])
+        levels[len(itemset) - 1].append(itemset)
+        support_data[itemset] = support
+
+    if level_type is dict:
+        L = [{i: support_data[i] for i in level} for level in levels]
+    else:
+        L = [level_type(level) for level in levels]
+    if not L and keep_empty:
+        L.append(level_type())
+    return L, support_data
+
+
+def write_itemsets(pairs, path):
+    """Write (itemset, support) pairs to path; returns the number written."""
+    count = 0
+    with open(path, "w") as f:
+        for itemset, support in pairs:
+            f.write(f"{' '.join(map(str, sorted(itemset)))} #SUP: {support}\n")
+            count += 1
+    return count
+
+
+def read_itemsets(path):
+    """Yield (sorted tuple, support) pairs from a write_itemsets() file."""
+    with open(path) as f:
+        for line in f:
+            items, _, support = line.partition("#SUP:")
+            yield tuple(map(int, items.split())), int(support)
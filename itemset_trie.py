@@ -0,0 +1,354 @@
+"""
+Compact, array-backed prefix trie of frequent itemsets and their supports.
+
+Every miner returns support_data as a dict of frozensets or tuples, which
+costs well over 200 bytes per itemset and can only be scanned. An
+ItemsetTrie stores the same result in five flat arrays (about 24 bytes
+per itemset) laid out level by level:
+
+    last_items   - int32, the last item of every node
+    counts       - int64, the node's support, -1 for a prefix-only node
+    parents      - int32, index of the parent node (-1 on level 1)
+    child_start  - int64[n + 1], children of node j are the nodes
+                   child_start[j]:child_start[j + 1]
+    level_ends   - int64, level k holds nodes level_ends[k-1]:level_ends[k]
+
+Nodes of a level are sorted by (parent, item), so children form one
+sorted slice and a lookup is one binary search per item. Results that
+are not downward closed (closed or maximal itemsets) get prefix-only
+nodes for their missing prefixes.
+
+The trie is a read-only Mapping {frozenset: support}, so it can stand in
+for support_data anywhere (main.py, rules, the result cache). save() and
+load() use a compact binary file that is memory-mapped on load.
+"""
+
+import mmap
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import ItemsView, Mapping
+
+MAGIC = b"ITSTRIE1"
+VERSION = 1
+TRIE_SUFFIX = ".trie"
+
+# magic, version, nodes, levels, itemsets
+HEADER = struct.Struct("<8sIqqq")
+
+
+class ItemsetTrie(Mapping):
+    """
+    Read-only frequent itemset store, see the module docstring.
+
+    Build it with from_items() or from_support_data(), or load() a saved
+    one. Keys are frozensets; lookups accept any iterable of items.
+    """
+
+    __slots__ = (
+        "last_items",
+        "counts",
+        "parents",
+        "child_start",
+        "level_ends",
+        "count",
+        "_mm",
+    )
+
+    def __init__(
+        self,
+        last_items,
+        counts,
+        parents,
+        child_start,
+        level_ends,
+        count=None,
+        mm=None,
+    ):
+        self.last_items = last_items
+        self.counts = counts
+        self.parents = parents
+        self.child_start = child_start
+        self.level_ends = level_ends
+        if count is None:
+            count = sum(1 for s in counts if s >= 0)
+        self.count = count
+        self._mm = mm
+
+    # ------------------------------------------------
+    # Building
+    # ------------------------------------------------
+    @classmethod
+    def from_items(cls, pairs):
+        """Build from (itemset, support) pairs (tuples, frozensets, ...)."""
+        supports = {tuple(sorted(itemset)): s for itemset, s in pairs}
+        nodes = set(supports)
+        for itemset in supports:
+            # downward-closed results already hold every prefix
+            for k in range(len(itemset) - 1, 0, -1):
+                prefix = itemset[:k]
+                if prefix in nodes:
+                    break
+                nodes.add(prefix)
+
+        # (length, itemset) order sorts each level by (parent, item)
+        order = sorted(nodes, key=lambda itemset: (len(itemset), itemset))
+        index = {itemset: i for i, itemset in enumerate(order)}
+        del nodes
+
+        items, node_supports, parents = array("i"), array("q"), array("i")
+        level_ends = array("q", [0])
+        num_children = array("q", bytes(8 * len(order)))
+        for i, itemset in enumerate(order):
+            if i and len(itemset) != len(order[i - 1]):
+                level_ends.append(i)
+            items.append(itemset[-1])
+            node_supports.append(supports.get(itemset, -1))
+            parent = index[itemset[:-1]] if len(itemset) > 1 else -1
+            parents.append(parent)
+            if parent >= 0:
+                num_children[parent] += 1
+        if order:
+            level_ends.append(len(order))
+
+        # children follow level by level, so their slices are contiguous
+        child_start = array("q", [level_ends[1] if len(level_ends) > 1 else 0])
+        for n in num_children:
+            child_start.append(child_start[-1] + n)
+
+        return cls(items, node_supports, parents, child_start, level_ends)
+
+    @classmethod
+    def from_support_data(cls, support_data):
+        """Build from any miner's support_data dict."""
+        return cls.from_items(support_data.items())
+
+    # ------------------------------------------------
+    # Lookup
+    # ------------------------------------------------
+    def _find(self, itemset):
+        """Node index of a sorted itemset, -1 if it is not in the trie."""
+        items, child_start = self.last_items, self.child_start
+        lo, hi = 0, self.level_ends[1] if len(self.level_ends) > 1 else 0
+        node = -1
+        for item in itemset:
+            node = bisect_left(items, item, lo, hi)
+            if node == hi or items[node] != item:
+                return -1
+            lo, hi = child_start[node], child_start[node + 1]
+        return node
+
+    def _itemset(self, node):
+        """Sorted tuple of a node, rebuilt from its parent chain."""
+        items, parents = self.last_items, self.parents
+        path = []
+        while node >= 0:
+            path.append(items[node])
+            node = parents[node]
+        return tuple(reversed(path))
+
+    def support(self, itemset, default=None):
+        """Support of an itemset (any iterable of items) in O(len) searches."""
+        node = self._find(sorted(itemset))
+        if node < 0 or self.counts[node] < 0:
+            return default
+        return self.counts[node]
+
+    def __getitem__(self, itemset):
+        s = self.support(itemset)
+        if s is None:
+            raise KeyError(itemset)
+        return s
+
+    def __contains__(self, itemset):
+        return self.support(itemset) is not None
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for itemset, _ in self.iter_items():
+            yield frozenset(itemset)
+
+    def items(self):
+        return _TrieItemsView(self)
+
+    @property
+    def nbytes(self):
+        return sum(
+            len(a) * a.itemsize
+            for a in (
+                self.last_items,
+                self.counts,
+                self.parents,
+                self.child_start,
+                self.level_ends,
+            )
+        )
+
+    # ------------------------------------------------
+    # Enumeration
+    # ------------------------------------------------
+    @property
+    def max_length(self):
+        return len(self.level_ends) - 1
+
+    def iter_items(self, k=None):
+        """(sorted tuple, support) of every itemset, or of level k only."""
+        levels = range(1, self.max_length + 1) if k is None else [k]
+        supports = self.counts
+        for level in levels:
+            if not 1 <= level <= self.max_length:
+                continue
+            for node in range(self.level_ends[level - 1], self.level_ends[level]):
+                if supports[node] >= 0:
+                    yield self._itemset(node), supports[node]
+
+    def level_size(self, k):
+        """Number of itemsets of length k."""
+        if not 1 <= k <= self.max_length:
+            return 0
+        supports = self.counts
+        return sum(
+            1
+            for node in range(self.level_ends[k - 1], self.level_ends[k])
+            if supports[node] >= 0
+        )
+
+    def levels(self):
+        """L in the miners' layout: one set-like view per level."""
+        return [TrieLevel(self, k) for k in range(1, self.max_length + 1)]
+
+    def supersets(self, itemset, length=None):
+        """
+        (sorted tuple, support) of every stored superset of itemset.
+
+        itemset itself is included when stored; length restricts the
+        output to supersets of that many items (e.g. all k-itemsets
+        containing X). Branches whose items pass the next wanted item
+        are cut, so only paths that can still contain itemset are walked.
+        """
+        target = sorted(itemset)
+        items, supports, child_start = self.last_items, self.counts, self.child_start
+        root_end = self.level_ends[1] if self.max_length else 0
+        # (first child, end, depth of the children, target items matched)
+        stack = [(0, root_end, 1, 0)]
+        while stack:
+            lo, hi, depth, matched = stack.pop()
+            if length is not None and depth > length:
+                continue
+            if matched < len(target):
+                if length is not None and len(target) - matched > length - depth + 1:
+                    continue  # too few levels left for the missing items
+                # children past the next wanted item cannot contain it
+                hi = bisect_right(items, target[matched], lo, hi)
+            for node in range(lo, hi):
+                m = matched
+                if m < len(target) and items[node] == target[m]:
+                    m += 1
+                if m == len(target) and supports[node] >= 0:
+                    if length is None or depth == length:
+                        yield self._itemset(node), supports[node]
+                start, end = child_start[node], child_start[node + 1]
+                if start < end:
+                    stack.append((start, end, depth + 1, m))
+
+    def subsets(self, itemset):
+        """(sorted tuple, support) of every stored non-empty subset of itemset."""
+        target = sorted(itemset)
+        items, supports, child_start = self.last_items, self.counts, self.child_start
+        root_end = self.level_ends[1] if self.max_length else 0
+        # (first child, end, position in target after the parent's item)
+        stack = [(0, root_end, 0)]
+        while stack:
+            lo, hi, pos = stack.pop()
+            for p in range(pos, len(target)):
+                node = bisect_left(items, target[p], lo, hi)
+                if node == hi or items[node] != target[p]:
+                    continue
+                lo = node + 1  # later target items are larger
+                if supports[node] >= 0:
+                    yield self._itemset(node), supports[node]
+                start, end = child_start[node], child_start[node + 1]
+                if start < end:
+                    stack.append((start, end, p + 1))
+
+    def filtered(self, min_support):
+        """A new trie with the itemsets whose support reaches min_support."""
+        return ItemsetTrie.from_items(
+            (itemset, s) for itemset, s in self.iter_items() if s >= min_support
+        )
+
+    # ------------------------------------------------
+    # Persistence
+    # ------------------------------------------------
+    def save(self, path):
+        """Write the trie to a compact binary file (see load)."""
+        with open(path, "wb") as f:
+            f.write(
+                HEADER.pack(
+                    MAGIC, VERSION, len(self.last_items), self.max_length, self.count
+                )
+            )
+            for a in (
+                self.level_ends,
+                self.child_start,
+                self.last_items,
+                self.counts,
+                self.parents,
+            ):
+                f.write(memoryview(a).cast("B"))
+
+    @classmethod
+    def load(cls, path):
+        """Memory-map a saved trie; the arrays are zero-copy views."""
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n, num_levels, count = HEADER.unpack_from(mm)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} itemset trie")
+
+        view = memoryview(mm)
+        pos = HEADER.size
+        arrays = []
+        for fmt, size in (
+            ("q", num_levels + 1),
+            ("q", n + 1),
+            ("i", n),
+            ("q", n),
+            ("i", n),
+        ):
+            nbytes = struct.calcsize(fmt) * size
+            arrays.append(view[pos : pos + nbytes].cast(fmt))
+            pos += nbytes
+        level_ends, child_start, items, supports, parents = arrays
+        return cls(items, supports, parents, child_start, level_ends, count, mm)
+
+
+class _TrieItemsView(ItemsView):
+    """items() that walks the arrays instead of looking every key up."""
+
+    def __iter__(self):
+        for itemset, s in self._mapping.iter_items():
+            yield frozenset(itemset), s
+
+
+class TrieLevel:
+    """Set-like view of the frozenset itemsets of one trie level."""
+
+    __slots__ = ("trie", "k")
+
+    def __init__(self, trie, k):
+        self.trie = trie
+        self.k = k
+
+    def __len__(self):
+        return self.trie.level_size(self.k)
+
+    def __iter__(self):
+        for itemset, _ in self.trie.iter_items(self.k):
+            yield frozenset(itemset)
+
+    def __contains__(self, itemset):
+        itemset = sorted(itemset)
+        return len(itemset) == self.k and itemset in self.trie
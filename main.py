@@ -3,31 +3,34 @@ import csv
 import os
 import re
 
-from apriori import apriori_efficient
-from setm import SETM
-from apriori_tid import apriori_tid
-from apriori_hybrid import apriori_hybrid
-
-
-# ----------------------------------------------------
-# Load transactions
-# ----------------------------------------------------
-def load_transactions(path):
-    transactions = []
-    with open(path) as f:
-        for line in f:
-            items = list(map(int, line.strip().split()))
-            transactions.append(items)
-    return transactions
+from apriori import apriori_efficient, apriori_native, iter_apriori_native
+from setm import SETM, iter_setm
+from apriori_tid import apriori_tid, iter_apriori_tid
+from apriori_hybrid import apriori_hybrid, iter_apriori_hybrid
+from apriori_diffset import apriori_diffset, iter_apriori_diffset
+from fp_growth import fp_growth
+from parallel import parallel_mine
+from partition import partition_mine
+from closed_maximal import charm, genmax
+from topk import topk_mine
+from sampling import toivonen_mine
+from rules import generate_rules, write_rules_csv
+from csr_transactions import load_transactions
+from sweep import mine_sweep
+from preprocess import mine_prepared, prepare
+from instrument import LevelRecorder, write_levels_csv
+from itemset_trie import ItemsetTrie
+from itemset_io import write_itemsets
+from result_cache import ResultCache, code_version, compare_results, dataset_hash
 
 
 # ----------------------------------------------------
 # Benchmark utility
 # ----------------------------------------------------
-def benchmark(algorithm_fn, *args):
-    start = time.time()
-    result = algorithm_fn(*args)
-    end = time.time()
+def benchmark(algorithm_fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = algorithm_fn(*args, **kwargs)
+    end = time.perf_counter()
     return result, end - start
 
 
@@ -45,6 +48,263 @@ def expand_datafiles(regex_list, folder="."):
     return sorted(selected)
 
 
+# ----------------------------------------------------
+# Algorithm dispatch
+# ----------------------------------------------------
+# Entry point of every algorithm, used to version its cached results
+ALGORITHM_FUNCTIONS = {
+    "setm": SETM,
+    "apriori": apriori_efficient,
+    "apriori_native": apriori_native,
+    "apriori_tid": apriori_tid,
+    "apriori_hybrid": apriori_hybrid,
+    "apriori_diffset": apriori_diffset,
+    "fp_growth": fp_growth,
+    "apriori_tid_parallel": parallel_mine,
+    "setm_parallel": parallel_mine,
+    "partition": partition_mine,
+    "charm": charm,
+    "genmax": genmax,
+    "toivonen": toivonen_mine,
+}
+ALGORITHM_NAMES = tuple(ALGORITHM_FUNCTIONS)
+
+# Algorithms run unless told otherwise (main block, bench.py)
+BASELINE_ALGORITHMS = ("setm", "apriori", "apriori_tid", "apriori_hybrid")
+
+
+def default_algorithms():
+    """
+    BASELINE_ALGORITHMS plus more of ALGORITHM_NAMES, comma separated in
+    the environment, e.g. EXTRA_ALGORITHMS=apriori_diffset,fp_growth,charm
+    """
+    algorithms = list(BASELINE_ALGORITHMS)
+    for algo in os.environ.get("EXTRA_ALGORITHMS", "").split(","):
+        if algo and algo not in algorithms:
+            algorithms.append(algo)
+    return algorithms
+
+
+# Algorithms that return a condensed representation instead of every
+# frequent itemset; their itemset counts are not comparable to the rest
+CONDENSED_ALGORITHMS = {"charm": "closed", "genmax": "maximal"}
+
+# Algorithms that report per-level counters to an observer
+INSTRUMENTED_ALGORITHMS = (
+    "setm",
+    "apriori_native",
+    "apriori_tid",
+    "apriori_hybrid",
+    "apriori_diffset",
+)
+
+# Algorithms that can mine preprocessed (recoded, merged, weighted) data
+WEIGHTED_ALGORITHMS = ("setm", "apriori_tid")
+
+# Level-wise miners with a streaming (itemset, support) generator
+STREAMING_ALGORITHMS = {
+    "setm": iter_setm,
+    "apriori_tid": iter_apriori_tid,
+    "apriori_hybrid": iter_apriori_hybrid,
+    "apriori_diffset": iter_apriori_diffset,
+    "apriori_native": iter_apriori_native,
+}
+
+
+def run_algorithm(
+    algo,
+    transactions,
+    min_support,
+    datafile=None,
+    num_workers=None,
+    chunk_size=20000,
+    stats=None,
+    sample_size=None,
+    miss_probability=0.01,
+    observer=None,
+    memory_budget=None,
+    prepared=None,
+):
+    """
+    Run one algorithm by name and return its (L, support_data).
+
+    datafile is only used by "partition", which streams the file itself.
+    stats (optional dict) receives algorithm-specific extras, e.g. the
+    level at which apriori_hybrid switched to TID-lists, or whether a
+    toivonen run (sample_size, miss_probability) is provably complete.
+    observer (optional instrument.MiningObserver) receives per-level
+    counters from the INSTRUMENTED_ALGORITHMS and is ignored by the rest.
+    memory_budget (bytes) caps the resident TID-lists of "setm" and
+    "apriori_tid", which spill the rest to disk and report it in stats.
+    prepared (optional preprocess.Prepared, built for at most min_support)
+    is mined instead of transactions by the WEIGHTED_ALGORITHMS; their
+    result is mapped back to the original item ids.
+    """
+    if prepared is not None and algo in WEIGHTED_ALGORITHMS:
+        return mine_prepared(
+            SETM if algo == "setm" else apriori_tid,
+            prepared,
+            min_support,
+            observer=observer,
+            memory_budget=memory_budget,
+            stats=stats,
+        )
+
+    if algo == "setm":
+        return SETM(
+            transactions,
+            min_support,
+            observer=observer,
+            memory_budget=memory_budget,
+            stats=stats,
+        )
+
+    elif algo == "apriori":
+        return apriori_efficient(transactions, min_support)
+
+    elif algo == "apriori_native":
+        return apriori_native(transactions, min_support, observer=observer)
+
+    elif algo == "apriori_tid":
+        return apriori_tid(
+            transactions,
+            min_support,
+            observer=observer,
+            memory_budget=memory_budget,
+            stats=stats,
+        )
+
+    elif algo == "apriori_hybrid":
+        return apriori_hybrid(transactions, min_support, stats=stats, observer=observer)
+
+    elif algo == "apriori_diffset":
+        return apriori_diffset(transactions, min_support, observer=observer)
+
+    elif algo == "fp_growth":
+        return fp_growth(transactions, min_support)
+
+    elif algo in ("apriori_tid_parallel", "setm_parallel"):
+        return parallel_mine(
+            transactions,
+            min_support,
+            workers=num_workers,
+            miner=algo[: -len("_parallel")],
+        )
+
+    elif algo == "partition":
+        return partition_mine(datafile, min_support, chunk_size)
+
+    elif algo == "charm":
+        return charm(transactions, min_support)
+
+    elif algo == "genmax":
+        return genmax(transactions, min_support)
+
+    elif algo == "toivonen":
+        L, support_data, _ = toivonen_mine(
+            transactions,
+            min_support,
+            sample_size=sample_size,
+            miss_probability=miss_probability,
+            stats=stats,
+        )
+        return L, support_data
+
+    raise ValueError(f"Unknown algorithm: {algo}")
+
+
+def stream_algorithm(
+    algo,
+    transactions,
+    min_support,
+    stats=None,
+    observer=None,
+    memory_budget=None,
+    prepared=None,
+):
+    """
+    (itemset, support) stream of one of the STREAMING_ALGORITHMS.
+
+    Pairs come level by level as the miner finishes each level; the
+    options mean the same as for run_algorithm.
+    """
+    iter_fn = STREAMING_ALGORITHMS[algo]
+    if algo in WEIGHTED_ALGORITHMS:
+        options = dict(observer=observer, memory_budget=memory_budget, stats=stats)
+        if prepared is None:
+            return iter_fn(transactions, min_support, **options)
+        pairs = iter_fn(
+            prepared.transactions, min_support, weights=prepared.weights, **options
+        )
+        decode = prepared.decode_itemset
+        return ((decode(itemset), s) for itemset, s in pairs)
+
+    if algo == "apriori_hybrid":
+        return iter_fn(transactions, min_support, stats=stats, observer=observer)
+    return iter_fn(transactions, min_support, observer=observer)
+
+
+def compact_result(result):
+    """(L, support_data) stored in an ItemsetTrie: (trie.levels(), trie)."""
+    trie = ItemsetTrie.from_support_data(result[1])
+    return trie.levels(), trie
+
+
+# ----------------------------------------------------
+# Result cache
+# ----------------------------------------------------
+def run_with_cache(cache, mode, data_hash, algo, min_support, run):
+    """
+    Run one benchmark cell through the result cache.
+
+    run() must return ((L, support_data), runtime, stats).
+    mode "use" returns a cached result (with its original runtime) when
+    there is one; mode "verify" always runs and checks support_data
+    against the cache, preferring this algorithm's own entry and falling
+    back to another algorithm's result of the same kind for the same
+    threshold.
+
+    Output: ((L, support_data), runtime, stats, status)
+    """
+    version = code_version(ALGORITHM_FUNCTIONS[algo])
+    cached = cache.get(data_hash, algo, min_support, version)
+
+    if mode == "use" and cached is not None:
+        result, runtime, stats = cached
+        return result, runtime, stats, "hit"
+
+    result, runtime, stats = run()
+    status = "miss"
+
+    if mode == "verify":
+        if cached is not None:
+            reference = (algo, cached[0][1])
+        else:
+            kind = CONDENSED_ALGORITHMS.get(algo)
+            peers = [
+                other
+                for other in ALGORITHM_NAMES
+                if other != algo and CONDENSED_ALGORITHMS.get(other) == kind
+            ]
+            reference = cache.reference(data_hash, min_support, peers)
+
+        if reference is None:
+            status = "unverified"
+        else:
+            ref_algo, ref_support = reference
+            missing, extra, wrong_count = compare_results(result[1], ref_support)
+            if missing or extra or wrong_count:
+                print(
+                    f"MISMATCH vs cached {ref_algo}: {len(missing)} missing, "
+                    f"{len(extra)} extra, {len(wrong_count)} wrong counts"
+                )
+                return result, runtime, stats, "mismatch"
+            status = "verified"
+
+    cache.put(data_hash, algo, min_support, version, result, runtime, stats)
+    return result, runtime, stats, status
+
+
 # ----------------------------------------------------
 # Main
 # ----------------------------------------------------
@@ -61,8 +321,33 @@ if __name__ == "__main__":
         r"T20\.I6\.D100K\.S.*\.txt",
     ]
 
-    # Algorithms to test
-    ALGORITHM_LIST = ["setm", "apriori", "apriori_tid", "apriori_hybrid"]
+    # Algorithms to test: the baseline miners plus any listed in the
+    # environment, e.g. EXTRA_ALGORITHMS=apriori_diffset,fp_growth python main.py
+    ALGORITHM_LIST = default_algorithms()
+
+    # Worker processes for the *_parallel algorithms (None = all cores)
+    NUM_WORKERS = None
+
+    # Transactions per chunk for the out-of-core "partition" algorithm
+    PARTITION_CHUNK_SIZE = 20000
+
+    # Sample size (None = sized from the support) and per-itemset miss
+    # probability for "toivonen"
+    SAMPLE_SIZE = None
+    MISS_PROBABILITY = 0.01
+
+    # Mine each algorithm once at the lowest support and derive the others
+    # by filtering; optionally still time the direct runs for the CSV
+    # (runtime_seconds is left empty for thresholds that were only filtered)
+    SWEEP_MODE = False
+    MEASURE_DIRECT_RUNTIME = False
+
+    # Result cache for direct (non-sweep) runs:
+    #   "off"    - always mine
+    #   "use"    - reuse cached results of unchanged algorithms
+    #   "verify" - always mine and check the output against the cache
+    CACHE_MODE = "off"
+    CACHE_MAX_MB = 256
 
     # Percent supports to test
     MIN_SUPPORT_PERCENT_LIST = [
@@ -75,10 +360,50 @@ if __name__ == "__main__":
         0.02,
     ]
 
+    # Write association rules for every run (None = off); condensed
+    # results (charm, genmax) are skipped, their subsets are not listed
+    RULES_MIN_CONFIDENCE = None
+    RULES_MIN_LIFT = None
+
+    # Top-k runs (no support threshold): k values and shortest itemset
+    # that counts. Rows use the support of the k-th itemset as min_support.
+    TOP_K_LIST = []
+    TOP_K_MIN_LENGTH = 1
+
+    # Write per-level counters (time, candidates, pruned, frequent,
+    # TID-list elements, bytes intersected) of the instrumented algorithms
+    # for direct runs; the hooks add some overhead to runtime_seconds
+    LEVEL_STATS = False
+
+    # Resident TID-list budget for setm/apriori_tid in MB (None = no
+    # limit); lists over budget spill to a memory-mapped scratch file
+    MEMORY_BUDGET_MB = None
+
+    # Write the itemsets of the STREAMING_ALGORITHMS to
+    # itemsets_<dataset>_<algo>_<pct>.txt level by level instead of keeping
+    # the result in memory (direct runs; these runs skip rules and cache)
+    STREAM_ITEMSETS = False
+
+    # Keep every result in a compact itemset trie (about 24 bytes per
+    # itemset instead of a dict entry); it still reads like support_data
+    COMPACT_RESULTS = False
+
+    # Recode items by frequency, strip infrequent items and merge duplicate
+    # transactions once per support level; setm/apriori_tid mine the result
+    PREPROCESS = False
+
     # ----------------------------------------------------
     # Loop over each dataset file
     # ----------------------------------------------------
     matched_files = expand_datafiles(DATAFILES)
+    memory_budget = None
+    if MEMORY_BUDGET_MB is not None:
+        memory_budget = int(MEMORY_BUDGET_MB * 2**20)
+
+    cache = None
+    if CACHE_MODE != "off":
+        cache = ResultCache(max_bytes=CACHE_MAX_MB << 20)
+
     for DATAFILE in matched_files:
 
         print(f"\n==============================")
@@ -88,6 +413,8 @@ if __name__ == "__main__":
         transactions = load_transactions(DATAFILE)
         print(f"Loaded {len(transactions)} transactions\n")
 
+        data_hash = dataset_hash(DATAFILE) if cache is not None else None
+
         # Convert list values into strings for file name
         algos_str = "_".join(ALGORITHM_LIST)
         supports_str = "_".join(str(p) for p in MIN_SUPPORT_PERCENT_LIST)
@@ -104,6 +431,7 @@ if __name__ == "__main__":
         )
 
         csvfile = open(csv_filename, "w", newline="")
+        level_rows = []
         writer = csv.writer(csvfile)
 
         writer.writerow(
@@ -113,9 +441,54 @@ if __name__ == "__main__":
                 "min_support",
                 "runtime_seconds",
                 "num_frequent_itemsets",
+                "switch_level",
+                "sweep_runtime_seconds",
+                "cache_status",
+                "spilled_bytes",
             ]
         )
 
+        # ----------------------------------------------------
+        # Sweep mode: mine once per algorithm at the lowest support
+        # ----------------------------------------------------
+        if SWEEP_MODE:
+            min_supports = [
+                max(1, int(pct * len(transactions))) for pct in MIN_SUPPORT_PERCENT_LIST
+            ]
+            lowest = min(min_supports)
+            sweep_results, sweep_stats = {}, {}
+            prepared = prepare(transactions, lowest) if PREPROCESS else None
+
+            for algo in ALGORITHM_LIST:
+                if algo not in ALGORITHM_NAMES:
+                    continue
+                print(f"Sweeping {algo} from min_support={lowest}...")
+                sweep_stats[algo] = {}
+
+                def mine(min_support):
+                    result = run_algorithm(
+                        algo,
+                        transactions,
+                        min_support,
+                        DATAFILE,
+                        NUM_WORKERS,
+                        PARTITION_CHUNK_SIZE,
+                        sweep_stats[algo] if min_support == lowest else None,
+                        sample_size=SAMPLE_SIZE,
+                        miss_probability=MISS_PROBABILITY,
+                        memory_budget=memory_budget,
+                        prepared=prepared,
+                    )
+                    return compact_result(result) if COMPACT_RESULTS else result
+
+                sweep_results[algo] = mine_sweep(
+                    mine,
+                    min_supports,
+                    measure_direct=MEASURE_DIRECT_RUNTIME,
+                    # maximal sets at a higher support are not a subset
+                    filterable=CONDENSED_ALGORITHMS.get(algo) != "maximal",
+                )
+
         # ----------------------------------------------------
         # Loop over support % values
         # ----------------------------------------------------
@@ -129,45 +502,189 @@ if __name__ == "__main__":
                 f"\n=== Testing support {pct*100:.2f}% (min_support={MIN_SUPPORT}) ==="
             )
 
+            prepared = None
+            if PREPROCESS and not SWEEP_MODE:
+                prepared = prepare(transactions, MIN_SUPPORT)
+                print(
+                    f"Preprocessed: {len(prepared)} distinct transactions, "
+                    f"{len(prepared.items)} frequent items"
+                )
+
             # ----------------------------------------------------
             # Loop over algorithms
             # ----------------------------------------------------
             for algo in ALGORITHM_LIST:
 
-                print(f"Running {algo}...")
+                if algo not in ALGORITHM_NAMES:
+                    print(f"Unknown algorithm: {algo}")
+                    continue
 
-                if algo == "setm":
-                    (L, support_data), runtime = benchmark(
-                        SETM, transactions, MIN_SUPPORT
-                    )
-                    num_itemsets = len(support_data)
+                sweep_runtime = ""
+                cache_status = ""
 
-                elif algo == "apriori":
-                    (L, support_data), runtime = benchmark(
-                        apriori_efficient, transactions, MIN_SUPPORT
-                    )
+                if SWEEP_MODE:
+                    (L, support_data), sweep_runtime, direct_runtime = sweep_results[
+                        algo
+                    ][MIN_SUPPORT]
+                    runtime = "" if direct_runtime is None else direct_runtime
+                    run_stats = sweep_stats[algo] if MIN_SUPPORT == lowest else {}
+                else:
+                    print(f"Running {algo}...")
+                    recorder = None
+                    if LEVEL_STATS and algo in INSTRUMENTED_ALGORITHMS:
+                        recorder = LevelRecorder()
+
+                    def stream():
+                        run_stats = {}
+                        itemsets_filename = f"itemsets_{DATAFILE}_{algo}_{pct}.txt"
+                        num_itemsets, runtime = benchmark(
+                            write_itemsets,
+                            stream_algorithm(
+                                algo,
+                                transactions,
+                                MIN_SUPPORT,
+                                run_stats,
+                                observer=recorder,
+                                memory_budget=memory_budget,
+                                prepared=prepared,
+                            ),
+                            itemsets_filename,
+                        )
+                        print(f"{num_itemsets} itemsets written to {itemsets_filename}")
+                        return num_itemsets, runtime, run_stats
+
+                    def run():
+                        run_stats = {}
+                        result, runtime = benchmark(
+                            run_algorithm,
+                            algo,
+                            transactions,
+                            MIN_SUPPORT,
+                            DATAFILE,
+                            NUM_WORKERS,
+                            PARTITION_CHUNK_SIZE,
+                            run_stats,
+                            sample_size=SAMPLE_SIZE,
+                            miss_probability=MISS_PROBABILITY,
+                            observer=recorder,
+                            memory_budget=memory_budget,
+                            prepared=prepared,
+                        )
+                        if COMPACT_RESULTS:
+                            result = compact_result(result)
+                        return result, runtime, run_stats
+
+                    L = support_data = None  # drop the previous result first
+                    if STREAM_ITEMSETS and algo in STREAMING_ALGORITHMS:
+                        num_itemsets, runtime, run_stats = stream()
+                    elif cache is None:
+                        (L, support_data), runtime, run_stats = run()
+                    else:
+                        (L, support_data), runtime, run_stats, cache_status = (
+                            run_with_cache(
+                                cache, CACHE_MODE, data_hash, algo, MIN_SUPPORT, run
+                            )
+                        )
+                        print(f"cache: {cache_status}")
+
+                    if recorder is not None:
+                        level_rows.extend(
+                            dict(algorithm=algo, support_percent=pct * 100, **level)
+                            for level in recorder.levels
+                        )
+
+                if support_data is not None:
                     num_itemsets = len(support_data)
-
-                elif algo == "apriori_tid":
-                    (L, support_data), runtime = benchmark(
-                        apriori_tid, transactions, MIN_SUPPORT
+                switch_level = run_stats.get("switch_level", "")
+                if algo == "apriori_hybrid" and "switch_level" in run_stats:
+                    print(f"{algo} switched to TID-lists at level {switch_level}")
+                if algo == "toivonen" and "complete" in run_stats:
+                    print(f"{algo} result complete: {run_stats['complete']}")
+                spilled = run_stats.get("spilled_bytes", "")
+                if spilled:
+                    print(
+                        f"{algo} spilled {spilled:,} bytes in "
+                        f"{run_stats['spilled_lists']} TID-lists "
+                        f"(scratch file {run_stats['spill_file_bytes']:,} bytes)"
                     )
-                    num_itemsets = len(support_data)
 
-                elif algo == "apriori_hybrid":
-                    (L, support_data), runtime = benchmark(
-                        apriori_hybrid, transactions, MIN_SUPPORT
+                if runtime == "":
+                    print(
+                        f"{algo} filtered in {sweep_runtime:.4f} sec "
+                        f"({num_itemsets} itemsets)"
                     )
-                    num_itemsets = len(support_data)
-
                 else:
-                    print(f"Unknown algorithm: {algo}")
-                    continue
+                    print(
+                        f"{algo} finished in {runtime:.4f} sec ({num_itemsets} itemsets)"
+                    )
 
-                print(f"{algo} finished in {runtime:.4f} sec ({num_itemsets} itemsets)")
+                if (
+                    RULES_MIN_CONFIDENCE is not None
+                    and algo not in CONDENSED_ALGORITHMS
+                    and support_data is not None
+                ):
+                    rules_filename = f"rules_{DATAFILE}_{algo}_{pct}.csv"
+                    num_rules = write_rules_csv(
+                        generate_rules(
+                            support_data,
+                            RULES_MIN_CONFIDENCE,
+                            num_trans=len(transactions),
+                            min_lift=RULES_MIN_LIFT,
+                            workers=NUM_WORKERS,
+                        ),
+                        rules_filename,
+                    )
+                    print(f"{num_rules} rules written to {rules_filename}")
 
                 # Write results for this dataset
-                writer.writerow([algo, pct * 100, MIN_SUPPORT, runtime, num_itemsets])
+                writer.writerow(
+                    [
+                        algo,
+                        pct * 100,
+                        MIN_SUPPORT,
+                        runtime,
+                        num_itemsets,
+                        switch_level,
+                        sweep_runtime,
+                        cache_status,
+                        spilled,
+                    ]
+                )
+
+        # ----------------------------------------------------
+        # Top-k runs
+        # ----------------------------------------------------
+        for k in TOP_K_LIST:
+            print(f"\n=== Top-{k} (min_length={TOP_K_MIN_LENGTH}) ===")
+            topk_stats = {}
+            (L, support_data), runtime = benchmark(
+                topk_mine, transactions, k, TOP_K_MIN_LENGTH, stats=topk_stats
+            )
+            reached = topk_stats["min_support"]
+            print(
+                f"topk finished in {runtime:.4f} sec "
+                f"({len(support_data)} itemsets, min_support={reached})"
+            )
+            writer.writerow(
+                [
+                    f"topk_{k}",
+                    reached / len(transactions) * 100,
+                    reached,
+                    runtime,
+                    len(support_data),
+                    "",
+                    "",
+                    "",
+                    "",
+                ]
+            )
 
         csvfile.close()
         print(f"\nBenchmark for {DATAFILE} complete. Saved: {csv_filename}")
+
+        if level_rows:
+            levels_filename = (
+                f"levels_{DATAFILE}_{algos_str}_{supports_str}{seed_suffix}.csv"
+            )
+            write_levels_csv(level_rows, levels_filename)
+            print(f"Per-level counters saved: {levels_filename}")
@@ -0,0 +1,106 @@
+"""
+Vectorized level-2 counting for the vertical miners.
+
+Level 2 used to intersect the TID-lists of every pair in L1 x L1: with
+~1000 frequent items that is up to 500K Python-level intersections, the
+most expensive level of a run. Instead, the L1 TID-lists are stacked into
+a sparse transaction x item incidence matrix X (the lists are its
+columns) and one sparse product X^T X gives the support of every pair at
+once. Only pairs that reach min_support are then joined into TID-lists
+for level 3 and up.
+
+Needs numpy and scipy; without them frequent_pairs() returns None and the
+miners fall back to intersecting every candidate pair.
+"""
+
+import time
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # scipy is optional, pairs are then intersected one by one
+    np = sparse = None
+
+from spill import load
+from tidlist import ArrayTidList, SetTidList
+
+
+def _tid_array(tidlist):
+    tidlist = load(tidlist)
+    if isinstance(tidlist, ArrayTidList):
+        return tidlist.tids
+    # column indices need not be sorted, so sets are not sorted first
+    tids = tidlist.tids if isinstance(tidlist, SetTidList) else tidlist
+    return np.fromiter(tids, dtype=np.int32, count=len(tidlist))
+
+
+def pair_matrix(tid_lists, num_trans, weights=None):
+    """
+    Supports of all pairs of items as one sparse product (needs scipy).
+
+    Input as for frequent_pairs. Returns (items, counts): items are the
+    keys' items in sorted order and counts the upper triangle of X^T X
+    as a COO matrix, counts[i, j] (i < j) being the support of
+    (items[i], items[j]). Pairs that never co-occur are not stored.
+    None without numpy/scipy.
+    """
+    if sparse is None:
+        return None
+    keys = sorted(tid_lists)
+    items = [item for (item,) in keys]
+    columns = [_tid_array(tid_lists[key]) for key in keys]
+    indptr = np.zeros(len(columns) + 1, dtype=np.int64)
+    np.cumsum([len(c) for c in columns], out=indptr[1:])
+    indices = np.concatenate(columns) if columns else np.zeros(0, dtype=np.int32)
+    del columns
+
+    shape = (num_trans, len(keys))
+    ones = np.ones(len(indices), dtype=np.int64)
+    X = sparse.csc_matrix((ones, indices, indptr), shape=shape)
+    if weights is None:
+        left = X
+    else:
+        row_weights = np.ones(num_trans, dtype=np.int64)
+        row_weights[: weights.limit] += weights.array
+        left = sparse.csc_matrix((row_weights[indices], indices, indptr), shape=shape)
+
+    # upper triangle of X^T X: the support of every pair (i < j)
+    return items, sparse.triu(left.T @ X, k=1, format="coo")
+
+
+def frequent_pairs(tid_lists, num_trans, min_support, weights=None, observer=None):
+    """
+    Support of every pair of frequent items that reaches min_support.
+
+    Input:
+        tid_lists: {(item,): TID-list} of L1 (any backend, spilled lists
+            or plain lists of TIDs)
+        num_trans: number of transactions (rows of X)
+        weights: optional tidlist.Weights; supports become X^T W X
+        observer: optional instrument.MiningObserver; told the pairs
+            that co-occur at all as generated, those below min_support
+            as pruned and the time spent as level 2 candidate generation
+
+    Output:
+        {(a, b): support} with a < b, or None without numpy/scipy
+    """
+    if sparse is None:
+        return None
+    start = time.perf_counter()
+
+    items, counts = pair_matrix(tid_lists, num_trans, weights)
+    keep = counts.data >= min_support
+    pairs = {
+        (items[i], items[j]): s
+        for i, j, s in zip(
+            counts.row[keep].tolist(),
+            counts.col[keep].tolist(),
+            counts.data[keep].tolist(),
+        )
+    }
+
+    if observer is not None:
+        counted = counts.nnz
+        elapsed = time.perf_counter() - start
+        observer.candidates(2, counted, counted - len(pairs), elapsed)
+    return pairs
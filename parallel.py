@@ -0,0 +1,213 @@
+"""
+Process-pool driver for the vertical miners (Apriori-TID, SETM).
+
+After the L1/L2 pass the search space is split into independent
+first-item equivalence classes: class `a` holds every frequent itemset
+whose smallest item is `a`. Each class is mined level-wise in a worker
+by TID-list intersection. Workers read the L1 TID-lists from one shared
+memory block, so only item ids and supports are pickled.
+"""
+
+import os
+from array import array
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from multiprocessing import shared_memory
+
+from apriori_tid import create_C1
+from candidates import generate_candidates
+from itemset_io import collect_levels
+from pair_counts import frequent_pairs
+from tidlist import adapt, check_backend, make_tidlist
+
+# ----------------------------------------------------
+# Worker side
+# ----------------------------------------------------
+_worker = {}
+
+
+def _init_worker(shm_name, offsets, pair_set, num_trans, min_support, backend):
+    """Attach to the shared TID-list block once per worker process."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _worker.update(
+        shm=shm,
+        tids=shm.buf.cast("i"),
+        offsets=offsets,
+        pair_set=pair_set,
+        num_trans=num_trans,
+        min_support=min_support,
+        backend=backend,
+    )
+
+
+def _item_tidlist(item):
+    start, length = _worker["offsets"][item]
+    return make_tidlist(
+        _worker["tids"][start : start + length].tolist(),
+        _worker["num_trans"],
+        _worker["backend"],
+    )
+
+
+def _mine_class(first_item, tails):
+    """
+    Mine every frequent itemset of length >= 3 that starts with first_item.
+
+    tails are the items b with (first_item, b) frequent. Returns
+    {tuple: support}.
+    """
+    min_support = _worker["min_support"]
+    num_trans = _worker["num_trans"]
+    backend = _worker["backend"]
+    pair_set = _worker["pair_set"]
+
+    head = _item_tidlist(first_item)
+    prev_L = {
+        (first_item, b): adapt(head.intersect(_item_tidlist(b)), num_trans, backend)
+        for b in tails
+    }
+    del head
+
+    found = {}
+    k = 3
+    while len(prev_L) > 1:
+        Ck = generate_candidates(prev_L.keys(), k, fixed_prefix=1)
+        if k == 3:
+            # the subset without first_item is a pair from another class
+            Ck = [cand for cand in Ck if cand[1:] in pair_set]
+
+        Ck_tid = {}
+        for cand in Ck:
+            # intersect the two prefix-class parents
+            tids = prev_L[cand[:-1]].intersect(prev_L[cand[:-2] + cand[-1:]])
+            if len(tids) >= min_support:
+                Ck_tid[cand] = adapt(tids, num_trans, backend)
+                found[cand] = len(tids)
+
+        prev_L = Ck_tid
+        k += 1
+
+    return found
+
+
+# ----------------------------------------------------
+# Driver
+# ----------------------------------------------------
+def _balance(classes, pair_support):
+    """
+    Order classes largest first (LPT scheduling).
+
+    A class with m tails does about m^2 / 2 joins, each intersecting
+    TID-lists of roughly the average pair support.
+    """
+
+    def cost(first_item):
+        tails = classes[first_item]
+        total = sum(pair_support[(first_item, b)] for b in tails)
+        return total * len(tails)
+
+    return sorted((a for a in classes if len(classes[a]) > 1), key=cost, reverse=True)
+
+
+def parallel_mine(
+    transactions, min_support, workers=None, miner="apriori_tid", backend="auto"
+):
+    """
+    Mine frequent itemsets with one task per first-item equivalence class.
+
+    Input:
+        transactions: list of lists/sets of items
+        min_support: integer support threshold (count, not fraction)
+        workers: process count (default: os.cpu_count())
+        miner: "apriori_tid" or "setm", selects the output format so the
+            result equals the serial miner's exactly
+        backend: TID-list encoding used inside the workers
+
+    Output:
+        L, support_data in the format of the selected serial miner
+    """
+    if miner not in ("apriori_tid", "setm"):
+        raise ValueError(f"Unknown vertical miner: {miner}")
+    check_backend(backend)
+    workers = workers or os.cpu_count()
+
+    transactions = [set(t) for t in transactions]
+    num_trans = len(transactions)
+
+    # Step 1: L1 with TID-lists
+    C1 = create_C1(transactions)
+    L1 = {item: tids for (item,), tids in C1.items() if len(tids) >= min_support}
+    del C1
+    support_data = {(item,): len(tids) for item, tids in L1.items()}
+
+    # Step 2: L2 from one sparse product over the L1 TID-lists, or by
+    # counting pairs of frequent items per transaction without scipy
+    pair_support = frequent_pairs(
+        {(item,): tids for item, tids in L1.items()}, num_trans, min_support
+    )
+    if pair_support is None:
+        pair_support = defaultdict(int)
+        for txn in transactions:
+            for pair in combinations(sorted(L1.keys() & txn), 2):
+                pair_support[pair] += 1
+        pair_support = {p: c for p, c in pair_support.items() if c >= min_support}
+    del transactions
+    support_data.update(pair_support)
+
+    classes = defaultdict(list)
+    for a, b in sorted(pair_support):
+        classes[a].append(b)
+    order = _balance(classes, pair_support)
+
+    # Step 3: pack L1 TID-lists into shared memory
+    offsets = {}
+    packed = array("i")
+    for item, tids in L1.items():
+        offsets[item] = (len(packed), len(tids))
+        packed.extend(tids)
+    del L1
+
+    nbytes = packed.itemsize * len(packed)
+    shm = shared_memory.SharedMemory(create=True, size=max(packed.itemsize, nbytes))
+    try:
+        shm.buf[:nbytes] = packed.tobytes()
+        del packed
+        init_args = (
+            shm.name,
+            offsets,
+            set(pair_support),
+            num_trans,
+            min_support,
+            backend,
+        )
+
+        # Step 4: mine the classes, biggest first
+        if workers == 1 or len(order) <= 1:
+            _init_worker(*init_args)
+            try:
+                results = [_mine_class(a, classes[a]) for a in order]
+            finally:
+                _worker["tids"].release()
+                _worker.pop("shm").close()
+                _worker.clear()
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=init_args
+            ) as pool:
+                futures = [pool.submit(_mine_class, a, classes[a]) for a in order]
+                results = [f.result() for f in futures]
+    finally:
+        shm.close()
+        shm.unlink()
+
+    for found in results:
+        support_data.update(found)
+
+    # Step 5: group by level in the serial miner's format
+    if miner == "setm":
+        return collect_levels(
+            ((frozenset(itemset), s) for itemset, s in support_data.items()),
+            level_type=set,
+        )
+    return collect_levels(support_data.items())
@@ -0,0 +1,88 @@
+"""
+Partition algorithm (Savasere, Omiecinski & Navathe) for files that do not
+fit in memory.
+
+Pass 1 streams the file in fixed-size chunks and mines each chunk with an
+in-memory miner at a proportionally scaled threshold. Any globally
+frequent itemset is locally frequent in at least one chunk, so the union
+of the local results is a complete candidate set. Pass 2 streams the file
+again and counts every candidate exactly. Peak memory is bounded by one
+chunk plus the candidate set.
+"""
+
+from apriori import CandidateTrie
+from apriori_tid import apriori_tid
+from csr_transactions import CSR_SUFFIX, load_csr
+from itemset_io import collect_levels
+
+
+def iter_transaction_chunks(path, chunk_size):
+    """Yield lists of at most chunk_size transactions (text or CSR file)."""
+    if path.endswith(CSR_SUFFIX):
+        data = load_csr(path)
+        for start in range(0, len(data), chunk_size):
+            yield data[start : start + chunk_size]
+        return
+
+    chunk = []
+    with open(path) as f:
+        for line in f:
+            chunk.append(list(map(int, line.strip().split())))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def count_transactions(path):
+    if path.endswith(CSR_SUFFIX):
+        return len(load_csr(path))
+    with open(path) as f:
+        return sum(1 for _ in f)
+
+
+def local_threshold(min_support, chunk_len, num_trans):
+    """ceil(min_support * chunk_len / num_trans), at least 1."""
+    return max(1, -(-min_support * chunk_len // num_trans))
+
+
+def partition_mine(path, min_support, chunk_size=10000, miner=apriori_tid):
+    """
+    Two-pass out-of-core mining of a transaction file.
+
+    Input:
+        path: text file with one transaction per line, or a .csr file
+        min_support: integer support threshold (count, not fraction)
+        chunk_size: transactions held in memory at a time
+        miner: any in-memory miner returning (L, support_data)
+
+    Output:
+        L: list of lists of tuples (frequent itemsets by level)
+        support_data: dict {tuple: support_count}
+    """
+    num_trans = count_transactions(path)
+
+    # Pass 1: locally frequent itemsets of every chunk
+    candidates = set()
+    for chunk in iter_transaction_chunks(path, chunk_size):
+        local_min = local_threshold(min_support, len(chunk), num_trans)
+        _, local_support = miner(chunk, local_min)
+        candidates.update(tuple(sorted(itemset)) for itemset in local_support)
+        del chunk, local_support
+
+    # Pass 2: exact global counts for every candidate
+    trie = CandidateTrie(candidates)
+    del candidates
+    tid = 0
+    for chunk in iter_transaction_chunks(path, chunk_size):
+        work = []
+        for txn in chunk:
+            work.append((tid, sorted(set(txn))))
+            tid += 1
+        trie.count(work)
+        del chunk, work
+
+    return collect_levels(
+        (itemset, count) for itemset, count in trie.items() if count >= min_support
+    )
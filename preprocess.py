@@ -0,0 +1,127 @@
+"""
+Preprocessing stage run once per (dataset, min_support) before mining.
+
+prepare() rewrites the transactions so the vertical miners see less data:
+    - items are recoded densely by descending frequency (0 = most frequent)
+    - items below min_support are stripped; they cannot be in any
+      frequent itemset, and transactions left empty are dropped
+    - identical transactions are merged into one, weighted by its count
+
+Miners that take weights (SETM, apriori_tid) count a merged transaction
+as often as it occurred; Prepared.decode() maps their results back to
+the original item ids. Transactions that occurred more than once come
+first, so weighted supports only look at a short prefix of each TID-list
+(see tidlist.Weights). Both groups keep their first-occurrence order:
+sorting them would cluster every TID-list, and "auto" would then pick
+run-length lists, whose mixed intersections with bitmaps are slower.
+"""
+
+from collections import Counter
+
+
+class Prepared:
+    """
+    Recoded, stripped and merged transactions of one dataset.
+
+    Attributes:
+        transactions: distinct sorted tuples of recoded items
+        weights: multiplicity of each transaction (same order)
+        items: original id of every recoded item (items[new] = old)
+        min_support: threshold the infrequent items were stripped at
+        num_trans: number of transactions before merging
+    """
+
+    __slots__ = ("transactions", "weights", "items", "min_support", "num_trans")
+
+    def __init__(self, transactions, weights, items, min_support, num_trans):
+        self.transactions = transactions
+        self.weights = weights
+        self.items = items
+        self.min_support = min_support
+        self.num_trans = num_trans
+
+    def __len__(self):
+        return len(self.transactions)
+
+    def decode_itemset(self, itemset):
+        """Recoded itemset back to original ids, keeping its container type."""
+        items = self.items
+        if isinstance(itemset, frozenset):
+            return frozenset(items[i] for i in itemset)
+        return tuple(sorted(items[i] for i in itemset))
+
+    def decode(self, L, support_data):
+        """
+        Map a miner's (L, support_data) back to the original item ids.
+
+        Levels keep their container type (list, set or dict), itemsets
+        stay frozensets or sorted tuples.
+        """
+        decode = self.decode_itemset
+        decoded_L = []
+        for level in L:
+            if isinstance(level, dict):
+                decoded_L.append({decode(i): s for i, s in level.items()})
+            else:
+                decoded_L.append(type(level)(decode(i) for i in level))
+        decoded_support = {decode(i): s for i, s in support_data.items()}
+        return decoded_L, decoded_support
+
+
+def prepare(transactions, min_support):
+    """
+    Recode, strip and merge transactions for one support threshold.
+
+    Input:
+        transactions: sequence of item lists (read twice)
+        min_support: absolute threshold (count)
+
+    Output:
+        Prepared
+    """
+    counts = Counter()
+    num_trans = 0
+    for txn in transactions:
+        counts.update(set(txn))
+        num_trans += 1
+
+    # Ties are broken by item id so the recoding is deterministic
+    frequent = sorted(
+        (item for item, c in counts.items() if c >= min_support),
+        key=lambda item: (-counts[item], item),
+    )
+    recode = {item: new for new, item in enumerate(frequent)}
+
+    merged = Counter()
+    for txn in transactions:
+        kept = tuple(sorted({recode[i] for i in txn if i in recode}))
+        if kept:
+            merged[kept] += 1
+
+    # repeated transactions first (stable, see the module docstring)
+    unique = sorted(merged, key=lambda txn: merged[txn] == 1)
+    return Prepared(
+        unique, [merged[txn] for txn in unique], frequent, min_support, num_trans
+    )
+
+
+def mine_prepared(miner, prepared, min_support=None, **kwargs):
+    """
+    Run a weighted miner on prepared data and decode its result.
+
+    miner: callable(transactions, min_support, weights=..., **kwargs)
+        returning (L, support_data), e.g. setm.SETM or apriori_tid
+    min_support defaults to the threshold prepared was built for; a
+    higher one is fine, a lower one would miss the stripped items.
+    """
+    if min_support is None:
+        min_support = prepared.min_support
+    if min_support < prepared.min_support:
+        raise ValueError(
+            f"Data was prepared for min_support={prepared.min_support}, "
+            f"cannot mine at {min_support}"
+        )
+    L, support_data = miner(
+        prepared.transactions, min_support, weights=prepared.weights, **kwargs
+    )
+    return prepared.decode(L, support_data)
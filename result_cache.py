@@ -0,0 +1,249 @@
+"""
+On-disk cache of mining results.
+
+An entry holds one algorithm's support_data (plus its runtime and stats)
+for one dataset and min_support. Entries are keyed by
+
+    dataset content hash + algorithm + min_support + code version
+
+where the code version hashes the source of the algorithm's module and
+every local module it reaches, so editing a miner invalidates only its
+own entries. The cache directory is bounded in size; the least recently
+used entries (by file mtime) are evicted first.
+
+Itemsets are stored as flat int arrays (lengths, items, counts) and
+zlib-compressed, a small fraction of a pickled dict of frozensets.
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+import zlib
+from array import array
+from types import ModuleType
+
+from itemset_io import collect_levels
+
+CACHE_DIR = ".mining_cache"
+CACHE_SUFFIX = ".bin"
+FORMAT_VERSION = 1
+
+# Default bound on the total size of the cache directory
+DEFAULT_MAX_BYTES = 256 << 20
+
+HASH_BLOCK_BYTES = 1 << 20
+
+
+# ----------------------------------------------------
+# Keys
+# ----------------------------------------------------
+def dataset_hash(path):
+    """sha256 of the file content (hex)."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(HASH_BLOCK_BYTES)
+            if not block:
+                break
+            h.update(block)
+    return h.hexdigest()
+
+
+def code_version(fn):
+    """
+    Hash of the source files fn depends on.
+
+    Starts at fn's module and follows every module, function and class
+    referenced from module globals, restricted to modules that live next
+    to this file (third-party packages are not hashed).
+    """
+    root = os.path.dirname(os.path.abspath(__file__))
+    seen = set()
+    stack = [fn.__module__]
+    while stack:
+        name = stack.pop()
+        if name in seen:
+            continue
+        path = getattr(sys.modules.get(name), "__file__", None)
+        if not path or os.path.dirname(os.path.abspath(path)) != root:
+            continue
+        seen.add(name)
+        for value in vars(sys.modules[name]).values():
+            if isinstance(value, ModuleType):
+                stack.append(value.__name__)
+            else:
+                dep = getattr(value, "__module__", None)
+                if isinstance(dep, str):
+                    stack.append(dep)
+
+    h = hashlib.sha256()
+    for name in sorted(seen):
+        h.update(name.encode())
+        with open(sys.modules[name].__file__, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+# ----------------------------------------------------
+# Serialization
+# ----------------------------------------------------
+def encode_result(L, support_data):
+    """Compact bytes for support_data; L is rebuilt from it on decode."""
+    first = next(iter(support_data), ())
+    key_type = "frozenset" if isinstance(first, frozenset) else "tuple"
+    level_type = type(L[0]).__name__ if L else "list"
+
+    lengths = array("H")
+    items = array("i")
+    counts = array("q")
+    for itemset in sorted(tuple(sorted(i)) for i in support_data):
+        lengths.append(len(itemset))
+        items.extend(itemset)
+        key = frozenset(itemset) if key_type == "frozenset" else itemset
+        counts.append(support_data[key])
+
+    payload = (
+        FORMAT_VERSION,
+        key_type,
+        level_type,
+        lengths.tobytes(),
+        items.tobytes(),
+        counts.tobytes(),
+    )
+    return zlib.compress(pickle.dumps(payload, pickle.HIGHEST_PROTOCOL))
+
+
+def decode_result(data):
+    """Inverse of encode_result: (L, support_data) in the miner's format."""
+    version, key_type, level_type, raw_lengths, raw_items, raw_counts = pickle.loads(
+        zlib.decompress(data)
+    )
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported cache format {version}")
+
+    lengths, items, counts = array("H"), array("i"), array("q")
+    lengths.frombytes(raw_lengths)
+    items.frombytes(raw_items)
+    counts.frombytes(raw_counts)
+
+    make_key = frozenset if key_type == "frozenset" else tuple
+    pairs = []
+    pos = 0
+    for n, count in zip(lengths, counts):
+        pairs.append((make_key(items[pos : pos + n]), count))
+        pos += n
+
+    level_type = {"dict": dict, "set": set}.get(level_type, list)
+    return collect_levels(pairs, level_type)
+
+
+def compare_results(support_data, reference):
+    """
+    Differences between two support_data dicts, ignoring key types.
+
+    Returns (missing, extra, wrong_count): itemsets only in reference,
+    itemsets only in support_data, and itemsets whose counts differ.
+    """
+    ours = {frozenset(i): s for i, s in support_data.items()}
+    theirs = {frozenset(i): s for i, s in reference.items()}
+    missing = [i for i in theirs if i not in ours]
+    extra = [i for i in ours if i not in theirs]
+    wrong_count = [i for i in ours if i in theirs and ours[i] != theirs[i]]
+    return missing, extra, wrong_count
+
+
+# ----------------------------------------------------
+# Cache
+# ----------------------------------------------------
+class ResultCache:
+    """
+    Directory of cached results with size-bounded LRU eviction.
+
+    File names are <dataset>_<min_support>_<algorithm>_<code>.bin so all
+    entries for one dataset and threshold can be found without an index.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, data_hash, algo, min_support, version):
+        name = f"{data_hash[:16]}_{min_support}_{algo}_{version[:12]}{CACHE_SUFFIX}"
+        return os.path.join(self.directory, name)
+
+    def _read(self, path):
+        with open(path, "rb") as f:
+            runtime, stats, data = pickle.load(f)
+        os.utime(path)  # mark as recently used
+        L, support_data = decode_result(data)
+        return (L, support_data), runtime, stats
+
+    def get(self, data_hash, algo, min_support, version):
+        """((L, support_data), runtime, stats) or None on a miss."""
+        path = self._path(data_hash, algo, min_support, version)
+        if not os.path.exists(path):
+            return None
+        try:
+            return self._read(path)
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError, zlib.error):
+            os.remove(path)  # corrupt or outdated entry
+            return None
+
+    def put(self, data_hash, algo, min_support, version, result, runtime, stats=None):
+        L, support_data = result
+        path = self._path(data_hash, algo, min_support, version)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(
+                (runtime, dict(stats or {}), encode_result(L, support_data)),
+                f,
+                pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(tmp, path)
+        self.evict()
+
+    def reference(self, data_hash, min_support, algorithms):
+        """
+        Cached support_data for this dataset and threshold from any of
+        the given algorithms.
+
+        Used to verify a new algorithm against results another algorithm
+        produced earlier. Returns (algo, support_data) or None.
+        """
+        prefix = f"{data_hash[:16]}_{min_support}_"
+        for name in sorted(os.listdir(self.directory)):
+            if not (name.startswith(prefix) and name.endswith(CACHE_SUFFIX)):
+                continue
+            algo = name[len(prefix) : -len(CACHE_SUFFIX)].rsplit("_", 1)[0]
+            if algo not in algorithms:
+                continue
+            try:
+                (_, support_data), _, _ = self._read(os.path.join(self.directory, name))
+            except (OSError, ValueError, EOFError, pickle.UnpicklingError, zlib.error):
+                continue
+            return algo, support_data
+        return None
+
+    def evict(self):
+        """Delete least recently used entries until under max_bytes."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(CACHE_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            st = os.stat(path)
+            entries.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(CACHE_SUFFIX):
+                os.remove(os.path.join(self.directory, name))
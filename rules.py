@@ -0,0 +1,170 @@
+"""
+Association rules from any miner's support_data.
+
+Rules X -> Y are grown per frequent itemset Z = X u Y with the
+ap-genrules scheme (Agrawal & Srikant): start from 1-item consequents
+and join surviving consequents level by level, like candidate
+generation. conf(Z - H -> H) can only drop as H grows, so a consequent
+that fails min_confidence is never extended. Lift and conviction are not
+monotone and only filter the output.
+
+Rules are yielded one by one, and big inputs are split over a process
+pool, so memory stays flat however many rules come out.
+"""
+
+import csv
+import os
+from collections import namedtuple
+from multiprocessing import Pool
+
+from candidates import generate_candidates
+
+Rule = namedtuple("Rule", "antecedent consequent support confidence lift conviction")
+
+# Itemsets per task when generating over a process pool
+CHUNK_SIZE = 2000
+
+# Below this many itemsets, rules are generated in-process
+PARALLEL_MIN_ITEMSETS = 20000
+
+
+def _normalize(support_data):
+    return {tuple(sorted(itemset)): s for itemset, s in support_data.items()}
+
+
+def _rules_for(itemset, support, lookup, num_trans, thresholds):
+    """All rules from one itemset, consequents grown by ap-genrules."""
+    min_confidence, min_lift, min_conviction = thresholds
+    rules = []
+    consequents = [(item,) for item in itemset]
+    m = 1
+    while consequents and m < len(itemset):
+        kept = []
+        for consequent in consequents:
+            antecedent = tuple(i for i in itemset if i not in consequent)
+            confidence = support / lookup[antecedent]
+            if confidence < min_confidence:
+                continue  # no superset of this consequent can pass
+            kept.append(consequent)
+
+            lift = conviction = None
+            if num_trans:
+                consequent_freq = lookup[consequent] / num_trans
+                lift = confidence / consequent_freq
+                conviction = (
+                    (1 - consequent_freq) / (1 - confidence)
+                    if confidence < 1
+                    else float("inf")
+                )
+                if min_lift is not None and lift < min_lift:
+                    continue
+                if min_conviction is not None and conviction < min_conviction:
+                    continue
+            rules.append(
+                Rule(antecedent, consequent, support, confidence, lift, conviction)
+            )
+
+        m += 1
+        consequents = generate_candidates(kept, m) if m < len(itemset) else []
+    return rules
+
+
+# ----------------------------------------------------
+# Worker side
+# ----------------------------------------------------
+_worker = {}
+
+
+def _init_worker(lookup, num_trans, thresholds):
+    _worker.update(lookup=lookup, num_trans=num_trans, thresholds=thresholds)
+
+
+def _rules_chunk(itemsets):
+    lookup = _worker["lookup"]
+    rules = []
+    for itemset in itemsets:
+        rules.extend(
+            _rules_for(
+                itemset,
+                lookup[itemset],
+                lookup,
+                _worker["num_trans"],
+                _worker["thresholds"],
+            )
+        )
+    return rules
+
+
+# ----------------------------------------------------
+# Driver
+# ----------------------------------------------------
+def generate_rules(
+    support_data,
+    min_confidence=0.0,
+    num_trans=None,
+    min_lift=None,
+    min_conviction=None,
+    workers=None,
+):
+    """
+    Yield association rules from frequent itemsets.
+
+    Input:
+        support_data: {itemset: support_count} from any miner (tuples or
+            frozensets); must be downward closed, as every miner returns
+        min_confidence: minimum confidence in [0, 1]
+        num_trans: number of transactions, needed for lift and conviction
+        min_lift, min_conviction: optional output filters
+        workers: process count (default: os.cpu_count()); small inputs
+            always run in-process
+
+    Output:
+        iterator of Rule(antecedent, consequent, support, confidence,
+        lift, conviction) with sorted tuples; lift and conviction are
+        None when num_trans is not given
+    """
+    if (min_lift is not None or min_conviction is not None) and not num_trans:
+        raise ValueError("min_lift and min_conviction need num_trans")
+
+    lookup = _normalize(support_data)
+    thresholds = (min_confidence, min_lift, min_conviction)
+    itemsets = [itemset for itemset in lookup if len(itemset) > 1]
+    workers = workers or os.cpu_count()
+
+    if workers == 1 or len(itemsets) < PARALLEL_MIN_ITEMSETS:
+        for itemset in itemsets:
+            yield from _rules_for(
+                itemset, lookup[itemset], lookup, num_trans, thresholds
+            )
+        return
+
+    chunks = (
+        itemsets[start : start + CHUNK_SIZE]
+        for start in range(0, len(itemsets), CHUNK_SIZE)
+    )
+    with Pool(
+        workers, initializer=_init_worker, initargs=(lookup, num_trans, thresholds)
+    ) as pool:
+        for rules in pool.imap_unordered(_rules_chunk, chunks):
+            yield from rules
+
+
+def write_rules_csv(rules, path):
+    """Stream rules into a CSV file; returns the number written."""
+    count = 0
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(Rule._fields)
+        for rule in rules:
+            writer.writerow(
+                [
+                    " ".join(map(str, rule.antecedent)),
+                    " ".join(map(str, rule.consequent)),
+                    rule.support,
+                    rule.confidence,
+                    "" if rule.lift is None else rule.lift,
+                    "" if rule.conviction is None else rule.conviction,
+                ]
+            )
+            count += 1
+    return count
@@ -0,0 +1,269 @@
+"""
+Sampling-based mining with negative-border verification (Toivonen).
+
+A random sample is mined at a lowered threshold with any in-memory
+miner. Its frequent itemsets S plus their negative border NB(S) - the
+itemsets that are not in S but whose every proper subset is - are then
+counted over the full data in one streaming pass. The itemsets of S that
+reach min_support are returned, and the result is provably complete when
+no border itemset turned out frequent: every frequent itemset missing
+from S would have a subset in the border.
+
+The threshold is lowered with the multiplicative Chernoff bound so a
+single frequent itemset is missed from the sample with probability at
+most miss_probability.
+"""
+
+import math
+import random
+from collections import defaultdict
+from itertools import chain, combinations
+
+from candidates import generate_candidates
+from fp_growth import fp_growth
+from itemset_io import collect_levels
+from pair_counts import pair_matrix
+from partition import count_transactions, iter_transaction_chunks
+from tidlist import intersect_all, make_tidlist
+
+# Relative error the default sample size is sized for: the sample
+# threshold ends up about half of min_support
+DEFAULT_RELATIVE_ERROR = 0.5
+
+# Transactions per chunk in the streaming verification pass
+VERIFY_CHUNK_SIZE = 100000
+
+# Itemsets of length >= 3 in S and NB(S) are counted one by one (pairs
+# come from one sparse product). Past this many, verifying costs more
+# than mining, so the full data is mined directly instead.
+MAX_LONGER_ITEMSETS = 50000
+
+# The lowered sample threshold stays at or above this share of the scaled
+# threshold, and at or above 2: near 1 every itemset of the sample counts
+# as frequent and the negative border explodes. Itemsets missed because
+# of the floor still show up as border misses (complete is then False).
+MIN_THRESHOLD_RATIO = 0.25
+
+
+def default_sample_size(num_trans, min_support, miss_probability):
+    """Sample size at which the lowered threshold is (1 - 0.5) * min_support."""
+    freq = min_support / num_trans
+    size = 2 * math.log(1 / miss_probability) / (freq * DEFAULT_RELATIVE_ERROR**2)
+    return min(num_trans, max(1, math.ceil(size)))
+
+
+def lowered_threshold(min_support, num_trans, sample_size, miss_probability):
+    """
+    Sample support count for a full-data threshold of min_support.
+
+    P(freq_sample < (1 - eps) * freq) <= exp(-eps^2 * freq * n / 2), so
+    eps = sqrt(2 ln(1/miss_probability) / (freq * n)). The result is
+    floored at MIN_THRESHOLD_RATIO of the scaled threshold (and 2).
+    """
+    freq = min_support / num_trans
+    eps = math.sqrt(2 * math.log(1 / miss_probability) / (freq * sample_size))
+    floor = max(2, math.ceil(MIN_THRESHOLD_RATIO * freq * sample_size))
+    return max(floor, math.floor((1 - eps) * freq * sample_size))
+
+
+def _draw_sample(data, num_trans, sample_size, rng):
+    """Uniform sample without replacement; reservoir sampling for files."""
+    if not isinstance(data, str):
+        picked = sorted(rng.sample(range(num_trans), sample_size))
+        return [list(data[i]) for i in picked]
+
+    reservoir = []
+    seen = 0
+    for chunk in iter_transaction_chunks(data, VERIFY_CHUNK_SIZE):
+        for txn in chunk:
+            if seen < sample_size:
+                reservoir.append(list(txn))
+            else:
+                j = rng.randrange(seen + 1)
+                if j < sample_size:
+                    reservoir[j] = list(txn)
+            seen += 1
+    return reservoir
+
+
+def _chunks(data):
+    if isinstance(data, str):
+        yield from iter_transaction_chunks(data, VERIFY_CHUNK_SIZE)
+    else:
+        for start in range(0, len(data), VERIFY_CHUNK_SIZE):
+            yield data[start : start + VERIFY_CHUNK_SIZE]
+
+
+def _mine_directly(data, num_trans, min_support, miner, rng, stats):
+    """Mine the whole data at min_support; the result is complete."""
+    if isinstance(data, str):
+        data = _draw_sample(data, num_trans, num_trans, rng)
+    _, counts = miner(data, min_support)
+    L, support_data = collect_levels((tuple(sorted(i)), c) for i, c in counts.items())
+    if stats is not None:
+        stats["sample_size"] = num_trans
+        stats["sample_min_support"] = min_support
+        stats["border_size"] = 0
+        stats["misses"] = []
+        stats["complete"] = True
+    return L, support_data, True
+
+
+def negative_border(frequent, min_length=2):
+    """
+    Negative border (length >= min_length) of a downward-closed set of
+    sorted tuples.
+
+    Single items are left out: the verification pass counts every item
+    anyway, so any frequent item missing from the sample is caught there.
+    """
+    levels = defaultdict(list)
+    for itemset in frequent:
+        levels[len(itemset)].append(itemset)
+
+    border = []
+    for k in range(max(2, min_length), max(levels, default=0) + 2):
+        candidates = generate_candidates(levels[k - 1], k)
+        border.extend(cand for cand in candidates if cand not in frequent)
+    return border
+
+
+def toivonen_mine(
+    data,
+    min_support,
+    sample_size=None,
+    miss_probability=0.01,
+    miner=fp_growth,
+    seed=None,
+    stats=None,
+):
+    """
+    Mine a sample, then verify against the full data in one pass.
+
+    When the sample would be the whole data set (small data, or
+    sample_size >= its size), or S and NB(S) hold more than
+    MAX_LONGER_ITEMSETS itemsets of length >= 3, the data is mined
+    directly at min_support and there is no border to check.
+
+    Input:
+        data: list of transactions, or a transaction file path (text or
+            .csr), which is then streamed instead of loaded
+        min_support: integer support threshold over the full data
+        sample_size: transactions in the sample (default: sized so the
+            sample threshold is about half of min_support)
+        miss_probability: chance of missing one given frequent itemset
+            from the sample, used to lower the sample threshold
+        miner: any in-memory miner returning (L, support_data)
+        seed: seed for the sample
+        stats: optional dict, receives "sample_size", "sample_min_support",
+            "border_size", "misses" (frequent border itemsets) and
+            "complete"
+
+    Output:
+        L: list of lists of tuples (frequent itemsets by level)
+        support_data: dict {tuple: support_count} (exact counts)
+        complete: True when no border itemset is frequent, so the result
+            provably holds every frequent itemset
+    """
+    num_trans = count_transactions(data) if isinstance(data, str) else len(data)
+    if sample_size is None:
+        sample_size = default_sample_size(num_trans, min_support, miss_probability)
+    sample_size = min(sample_size, num_trans)
+    rng = random.Random(seed)
+
+    if sample_size == num_trans:
+        return _mine_directly(data, num_trans, min_support, miner, rng, stats)
+
+    # Step 1: mine the sample at the lowered threshold
+    sample = _draw_sample(data, num_trans, sample_size, rng)
+    sample_min = lowered_threshold(
+        min_support, num_trans, sample_size, miss_probability
+    )
+    _, sample_support = miner(sample, sample_min)
+    del sample
+
+    frequent = {tuple(sorted(itemset)) for itemset in sample_support}
+    sample_items = sorted(itemset[0] for itemset in frequent if len(itemset) == 1)
+    # NB(S) at length 2 is every pair of sample items not in S; it is
+    # counted along with S2 below instead of being listed
+    pair_border = len(sample_items) * (len(sample_items) - 1) // 2
+    pair_border -= sum(1 for itemset in frequent if len(itemset) == 2)
+    longer = [itemset for itemset in frequent if len(itemset) > 2]
+    border = negative_border(frequent, min_length=3)
+    longer += border
+    if len(longer) > MAX_LONGER_ITEMSETS:
+        return _mine_directly(data, num_trans, min_support, miner, rng, stats)
+    longer_items = set(chain.from_iterable(longer))
+
+    # Step 2: one pass over the full data, a chunk at a time. Each chunk
+    # becomes TID-lists: items are counted from them, every pair of
+    # sample items with one sparse product (pair_counts.py) and longer
+    # itemsets of S and NB(S) by intersection.
+    item_counts = defaultdict(int)
+    pair_counts = defaultdict(int)
+    pair_total = None
+    longer_counts = [0] * len(longer)
+    for chunk in _chunks(data):
+        tids_of = defaultdict(list)
+        for tid, txn in enumerate(chunk):
+            for item in set(txn):
+                tids_of[item].append(tid)
+        for item, tids in tids_of.items():
+            item_counts[item] += len(tids)
+
+        sample_lists = {(item,): tids_of.get(item, ()) for item in sample_items}
+        product = pair_matrix(sample_lists, len(chunk))
+        if product is not None:
+            counts = product[1]
+            pair_total = counts if pair_total is None else pair_total + counts
+        else:  # without scipy, pairs are counted per transaction
+            for txn in chunk:
+                items = sorted(set(txn).intersection(sample_items))
+                for pair in combinations(items, 2):
+                    pair_counts[pair] += 1
+
+        tidlists = {
+            item: make_tidlist(tids_of[item], len(chunk), "bitmap")
+            for item in longer_items
+            if item in tids_of
+        }
+        for i, itemset in enumerate(longer):
+            if all(item in tidlists for item in itemset):
+                common = intersect_all([tidlists[item] for item in itemset])
+                longer_counts[i] += len(common)
+
+    if pair_total is not None:
+        pair_total = pair_total.tocoo()
+        keep = pair_total.data >= min_support
+        for i, j, count in zip(
+            pair_total.row[keep].tolist(),
+            pair_total.col[keep].tolist(),
+            pair_total.data[keep].tolist(),
+        ):
+            pair_counts[(sample_items[i], sample_items[j])] = count
+
+    # Step 3: keep what is frequent, check the border
+    counts = {(item,): c for item, c in item_counts.items()}
+    counts.update(pair_counts)
+    counts.update(zip(longer, longer_counts))
+
+    found = []
+    misses = []
+    for itemset, count in counts.items():
+        if count < min_support:
+            continue
+        if itemset in frequent:
+            found.append((itemset, count))
+        else:
+            misses.append(itemset)  # border itemset (or item) frequent
+
+    L, support_data = collect_levels(found)
+
+    if stats is not None:
+        stats["sample_size"] = sample_size
+        stats["sample_min_support"] = sample_min
+        stats["border_size"] = pair_border + len(border)
+        stats["misses"] = misses
+        stats["complete"] = not misses
+
+    return L, support_data, not misses
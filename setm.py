@@ -1,91 +1,176 @@
-from itertools import combinations
 from collections import defaultdict
 
-
-def generate_candidates(prev_frequent_itemsets, k):
-    """
-    Generate candidate itemsets Ck from L(k-1)
-    Optimized: avoid repeated sorting
+from candidates import generate_candidates
+from itemset_io import collect_levels
+from pair_counts import frequent_pairs
+from spill import SpillStore, load
+from tidlist import (
+    adapt,
+    as_weights,
+    check_backend,
+    intersect_all,
+    make_tidlist,
+    weighted_support,
+)
+
+
+def iter_setm(
+    transactions,
+    min_support,
+    backend="auto",
+    observer=None,
+    memory_budget=None,
+    stats=None,
+    weights=None,
+    vectorized_pairs=True,
+):
     """
-    candidates = set()
-    prev_list = list(prev_frequent_itemsets)
-
-    prev_list_sorted = [tuple(sorted(itemset)) for itemset in prev_list]
-
-    for i in range(len(prev_list_sorted)):
-        for j in range(i + 1, len(prev_list_sorted)):
-            L1 = prev_list_sorted[i]
-            L2 = prev_list_sorted[j]
-
-            # join step: first k-2 items must match
-            if L1[: k - 2] == L2[: k - 2]:
-                new_candidate = frozenset(L1) | frozenset(L2)
-                candidates.add(new_candidate)
+    SETM as a stream: yield (frozenset, support) level by level.
 
-    return candidates
-
-
-def SETM(transactions, min_support):
-    """
-    Optimized SETM Algorithm with TID-lists intersection
+    Each level is yielded as soon as it is finished; the TID-lists of a
+    level are dropped once the next one has been built from them.
+    Arguments as for SETM; spill statistics reach stats once the stream
+    is exhausted.
     """
+    check_backend(backend)
+    weights = as_weights(weights)
+    if observer is not None:
+        observer.level_start(1)
+
     # Convert transactions to sets for faster subset checks
     transactions = [set(txn) for txn in transactions]
+    num_trans = len(transactions)
 
-    # Step 1: Build C1 with TID-lists
-    C1 = defaultdict(set)
+    # Step 1: Build C1 with TID-lists (appended in order, so sorted)
+    # Itemsets are sorted tuples internally and frozensets in the output
+    C1 = defaultdict(list)
     for tid, txn in enumerate(transactions):
         for item in txn:
-            C1[frozenset([item])].add(tid)
+            C1[(item,)].append(tid)
+    del transactions
 
     # Step 2: Filter L1
-    L = []
-    L1 = {i for i, tids in C1.items() if len(tids) >= min_support}
-    L.append(L1)
-
-    # Support counts
-    support_data = {itemset: len(C1[itemset]) for itemset in L1}
-
-    k = 2
-    prev_Lk = L1
-
-    # Step 3: Iterative generation
-    while prev_Lk:
-        # Generate candidates
-        Ck = generate_candidates(prev_Lk, k)
-        if not Ck:
-            break
-
-        # Build TID-lists for Ck via intersection of subsets' TID-lists
-        prev_tid_dict = {
-            itemset: C1[itemset] if k == 2 else prev_Lk_tid[itemset]
-            for itemset in prev_Lk
-        }
-        Ck_tid = defaultdict(set)
-
-        for cand in Ck:
-            subsets = [frozenset(s) for s in combinations(cand, k - 1)]
-            try:
+    level = {i: weighted_support(tids, weights, min_support) for i, tids in C1.items()}
+    L1 = {i for i, s in level.items() if s >= min_support}
+    if observer is not None:
+        observer.candidates(1, len(C1), 0, 0.0)
+    C1 = {i: make_tidlist(C1[i], num_trans, backend) for i in L1}
+    level = {i: level[i] for i in L1}
+    spill = SpillStore(memory_budget) if memory_budget is not None else None
+    if spill is not None:
+        C1 = {i: spill.keep(tids) for i, tids in C1.items()}
+    if observer is not None:
+        observer.level_end(1, len(L1), sum(level.values()))
+
+    try:
+        for itemset, s in level.items():
+            yield frozenset(itemset), s
+
+        k = 2
+        prev_Lk = L1
+        prev_Lk_tid = C1
+        del C1
+
+        # Step 3: Iterative generation
+        while prev_Lk:
+            if observer is not None:
+                observer.level_start(k)
+
+            # Level 2 supports come from one sparse product (pair_counts.py),
+            # so only the frequent pairs are intersected below
+            pairs = None
+            if k == 2 and vectorized_pairs:
+                pairs = frequent_pairs(
+                    prev_Lk_tid, num_trans, min_support, weights, observer
+                )
+
+            # Generate candidates (an empty Ck leaves Lk empty below)
+            if pairs is not None:
+                Ck = list(pairs)
+            else:
+                Ck = generate_candidates(prev_Lk, k, observer=observer)
+
+            # Build TID-lists for Ck via intersection of subsets' TID-lists
+            Ck_tid = {}
+            level = {}
+
+            for cand in Ck:
+                # Ck is subset-pruned, so every (k-1)-subset has a TID-list
+                subsets = [cand[:i] + cand[i + 1 :] for i in range(k)]
                 # intersection of all subsets TID-lists
-                intersect_tids = set.intersection(*(prev_tid_dict[s] for s in subsets))
-            except KeyError:
-                continue
-
-            if len(intersect_tids) >= min_support:
-                Ck_tid[cand] = intersect_tids
-
-        # Filter frequent itemsets
-        Lk = set(Ck_tid.keys())
-        if not Lk:
-            break
-
-        L.append(Lk)
-        for cand in Lk:
-            support_data[cand] = len(Ck_tid[cand])
-
-        # Prepare for next iteration
-        prev_Lk = Lk
-        prev_Lk_tid = Ck_tid
-        k += 1
+                tid_lists = [prev_Lk_tid[s] for s in subsets]
+                if spill is not None:
+                    tid_lists = [load(tids) for tids in tid_lists]
+                intersect_tids = intersect_all(tid_lists, observer)
+
+                if pairs is not None:
+                    support = pairs[cand]
+                else:
+                    support = weighted_support(intersect_tids, weights, min_support)
+                if support >= min_support:
+                    kept = adapt(intersect_tids, num_trans, backend)
+                    Ck_tid[cand] = kept if spill is None else spill.keep(kept)
+                    level[cand] = support
+
+            # Filter frequent itemsets
+            Lk = set(Ck_tid.keys())
+            if observer is not None:
+                observer.level_end(k, len(Lk), sum(map(len, Ck_tid.values())))
+            if spill is not None:
+                spill.release(prev_Lk_tid.values())
+            if not Lk:
+                break
+
+            # Prepare for next iteration; the previous level's lists go
+            prev_Lk = Lk
+            prev_Lk_tid = Ck_tid
+            del Ck, Ck_tid, pairs
+            for itemset, s in level.items():
+                yield frozenset(itemset), s
+            k += 1
+
+        if spill is not None and stats is not None:
+            spill.report(stats)
+    finally:
+        if spill is not None:
+            spill.close()
+
+
+def SETM(
+    transactions,
+    min_support,
+    backend="auto",
+    observer=None,
+    memory_budget=None,
+    stats=None,
+    weights=None,
+    vectorized_pairs=True,
+):
+    """
+    Optimized SETM Algorithm with TID-lists intersection
 
-    return L, support_data
+    backend selects the TID-list encoding (see tidlist.BACKENDS);
+    observer (optional instrument.MiningObserver) receives per-level counters;
+    memory_budget (bytes, optional) caps the resident TID-lists, the rest
+    spill to a memory-mapped scratch file (see spill.py) and stats (dict)
+    receives "spilled_bytes", "spilled_lists", "peak_resident_bytes" and
+    "spill_file_bytes";
+    weights (optional) gives each transaction's multiplicity, e.g. for
+    merged duplicates (see preprocess.py); supports are then weighted;
+    vectorized_pairs counts level 2 with one sparse product (see
+    pair_counts.py) and intersects only the frequent pairs;
+    iter_setm streams the same result level by level
+    """
+    return collect_levels(
+        iter_setm(
+            transactions,
+            min_support,
+            backend,
+            observer,
+            memory_budget,
+            stats,
+            weights,
+            vectorized_pairs,
+        ),
+        set,
+    )
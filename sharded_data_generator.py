@@ -0,0 +1,315 @@
+"""
+Vectorized, sharded T*.I*.D* dataset generator for very large D.
+
+Same model as fast_mining_data_generator_with_seed.py: transactions
+are built from random picks of L maximal itemsets over N items, topped
+up with random items, with a random item dropped (10%) or noise added
+(noise_prob). Sizes, picks and top-ups are drawn with NumPy for a whole
+shard at once instead of one transaction at a time.
+
+D is split into shards of shard_size transactions. Shard i draws from
+SeedSequence(seed, spawn_key=(1, i)), so its content only depends on
+(seed, shard_size, i): shards run in a process pool in any order and
+the output is the same for any number of workers. Shards are written as
+they complete, in order, straight to the text or binary CSR output, so
+memory stays at a few shards whatever D is.
+
+The stream is not identical to the pure-Python generator for the same
+seed (different random streams), only drawn from the same distribution.
+
+Usage:
+    python sharded_data_generator.py --T 10 --I 4 --D 10M --seeds 1 2 3 \\
+        [--format txt|csr] [--shard-size 250000] [--workers 8]
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from csr_transactions import CSR_SUFFIX, CSRWriter
+from fast_mining_data_generator_with_seed import auto_filename
+
+# Transactions per shard (one shard is generated in one call)
+DEFAULT_SHARD_SIZE = 250_000
+
+# Maximal-set picks drawn per transaction: up to 3 initial sets plus up
+# to 5 top-up attempts, as in the pure-Python generator
+MAX_PICKS = 8
+
+# Shards generated ahead of the writer, per worker
+PREFETCH_PER_WORKER = 2
+
+
+# ----------------------------------------------------
+# Sizes and maximal itemsets
+# ----------------------------------------------------
+def sample_sizes(rng, mean, n, min_v=1, max_v=None):
+    """n sizes: Poisson(mean) for small means, else rounded-down Gaussian."""
+    if mean <= 10:
+        sizes = rng.poisson(mean, n)
+    else:
+        sizes = rng.normal(mean, np.sqrt(mean), n).astype(np.int64)
+    sizes = np.maximum(sizes, min_v)
+    if max_v is not None:
+        sizes = np.minimum(sizes, max_v)
+    return sizes
+
+
+def generate_maximal_itemsets(N=1000, L=2000, I_mean=2, max_itemset_size=20, seed=0):
+    """
+    L maximal itemsets as CSR arrays.
+
+    Output:
+        (items, offsets): set j is items[offsets[j]:offsets[j + 1]], sorted
+    """
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(0,)))
+    sizes = np.minimum(sample_sizes(rng, I_mean, L, 1, max_itemset_size), N)
+    items = np.concatenate(
+        [np.sort(rng.choice(N, size, replace=False)) for size in sizes]
+    ).astype(np.int32)
+    offsets = np.zeros(L + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    return items, offsets
+
+
+# ----------------------------------------------------
+# One shard
+# ----------------------------------------------------
+def _gather(set_items, set_offsets, rows, picks):
+    """(row, item) pairs of every item in maximal sets picks, owned by rows."""
+    starts = set_offsets[picks]
+    lengths = set_offsets[picks + 1] - starts
+    total = int(lengths.sum())
+    # position of every gathered item inside its set
+    within = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.repeat(rows, lengths), set_items[np.repeat(starts, lengths) + within]
+
+
+def _dedup(*keys):
+    """
+    Sorted unique (row, item) keys (row * N + item) of the key arrays.
+
+    Sort-based: np.unique's hash path is several times slower here.
+    """
+    keys = np.sort(np.concatenate(keys))
+    keep = np.ones(len(keys), dtype=bool)
+    np.not_equal(keys[1:], keys[:-1], out=keep[1:])
+    return keys[keep]
+
+
+def generate_shard(
+    shard,
+    size,
+    maximal_sets,
+    T_mean=5,
+    N=1000,
+    noise_prob=0.02,
+    txn_size_max=50,
+    seed=0,
+):
+    """
+    Transactions of one shard as CSR arrays.
+
+    Output:
+        (items, lengths): int32 items of every transaction back to back
+        (each sorted) and int32 transaction lengths
+    """
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(1, shard)))
+    set_items, set_offsets = maximal_sets
+    num_sets = len(set_offsets) - 1
+
+    # Step 1: sizes and how many maximal sets each transaction takes.
+    # 1 set (80%), 2 (18%) or 3 (2%), then up to 5 more while short;
+    # stop at the first set whose union with the earlier ones reaches
+    # the target
+    target = sample_sizes(rng, T_mean, size, 1, txn_size_max)
+    u, v = rng.random(size), rng.random(size)
+    k_sets = np.where(u < 0.8, 1, np.where(v < 0.9, 2, 3))
+    picks = rng.integers(num_sets, size=(size, MAX_PICKS))
+
+    # every (row, item) of all MAX_PICKS picks, tagged with the first
+    # pick that brings it in: keys sort as row * N + item, then pick
+    slots, items = _gather(
+        set_items, set_offsets, np.arange(size * MAX_PICKS), picks.ravel()
+    )
+    rows, pick = np.divmod(slots, MAX_PICKS)
+    tagged = np.sort((rows * N + items) * MAX_PICKS + pick)
+    first = np.ones(len(tagged), dtype=bool)
+    np.not_equal(tagged[1:] // MAX_PICKS, tagged[:-1] // MAX_PICKS, out=first[1:])
+    keys, pick = np.divmod(tagged[first], MAX_PICKS)
+    rows = keys // N
+
+    # union size after each pick
+    new_items = np.bincount(rows * MAX_PICKS + pick, minlength=size * MAX_PICKS)
+    union = np.cumsum(new_items.reshape(size, MAX_PICKS), axis=1)
+    reached = union >= target[:, None]
+    first_reach = np.where(reached.any(axis=1), reached.argmax(axis=1) + 1, MAX_PICKS)
+    used = np.minimum(first_reach, k_sets + 5)
+    keys = keys[pick < used[rows]]
+
+    # Step 2: top up with random items until every target is met
+    while True:
+        counts = np.bincount(keys // N, minlength=size)
+        short = np.flatnonzero(counts < target)
+        if not len(short):
+            break
+        missing = target[short] - counts[short]
+        extra_rows = np.repeat(short, missing)
+        extra = rng.integers(N, size=len(extra_rows))
+        keys = _dedup(keys, extra_rows.astype(np.int64) * N + extra)
+
+    # Step 3: drop one random item from 10% of the transactions
+    counts = np.bincount(keys // N, minlength=size)
+    starts = np.cumsum(counts) - counts
+    drop = np.flatnonzero((rng.random(size) < 0.1) & (counts > 1))
+    if len(drop):
+        positions = starts[drop] + rng.integers(counts[drop])
+        keys = np.delete(keys, positions)
+
+    # Step 4: noise, 1 or 2 random items
+    noisy = np.flatnonzero(rng.random(size) < noise_prob)
+    if len(noisy):
+        noise_rows = np.repeat(noisy, rng.integers(1, 3, size=len(noisy)))
+        noise = rng.integers(N, size=len(noise_rows))
+        keys = _dedup(keys, noise_rows.astype(np.int64) * N + noise)
+
+    # Step 5: cap at txn_size_max with a random subset of the items
+    rows = keys // N
+    counts = np.bincount(rows, minlength=size)
+    if counts.max() > txn_size_max:
+        order = np.lexsort((rng.random(len(keys)), rows))
+        rank = np.arange(len(keys)) - np.repeat(np.cumsum(counts) - counts, counts)
+        keys = np.sort(keys[order][rank < txn_size_max])
+        counts = np.minimum(counts, txn_size_max)
+
+    return (keys % N).astype(np.int32), counts.astype(np.int32)
+
+
+def format_shard(items, lengths, N):
+    """One line per transaction, items separated by spaces."""
+    spaced = np.array([f"{item} " for item in range(N)], dtype=object)
+    ended = np.array([f"{item}\n" for item in range(N)], dtype=object)
+    words = spaced[items]
+    last = np.cumsum(lengths) - 1
+    words[last] = ended[items[last]]
+    return "".join(words.tolist())
+
+
+def _shard_task(args):
+    shard, size, maximal_sets, params, fmt = args
+    items, lengths = generate_shard(shard, size, maximal_sets, **params)
+    if fmt == "txt":
+        return format_shard(items, lengths, params["N"])
+    return items, lengths
+
+
+# ----------------------------------------------------
+# Driver
+# ----------------------------------------------------
+def generate_dataset(
+    path,
+    D=100_000,
+    T_mean=5,
+    I_mean=2,
+    N=1000,
+    L=2000,
+    noise_prob=0.02,
+    txn_size_max=50,
+    seed=0,
+    shard_size=DEFAULT_SHARD_SIZE,
+    workers=None,
+):
+    """
+    Generate one dataset and stream it to path.
+
+    The format follows the file name: CSR_SUFFIX writes the binary CSR
+    layout (see csr_transactions.py), anything else one transaction per
+    line. Returns the number of items written.
+    """
+    fmt = "csr" if path.endswith(CSR_SUFFIX) else "txt"
+    maximal_sets = generate_maximal_itemsets(N, L, I_mean, seed=seed)
+    params = dict(
+        T_mean=T_mean,
+        N=N,
+        noise_prob=noise_prob,
+        txn_size_max=txn_size_max,
+        seed=seed,
+    )
+    tasks = (
+        (shard, min(shard_size, D - start), maximal_sets, params, fmt)
+        for shard, start in enumerate(range(0, D, shard_size))
+    )
+
+    workers = workers or os.cpu_count()
+    if fmt == "csr":
+        out = CSRWriter(path, T_mean, I_mean, seed)
+    else:
+        out = open(path, "w")
+
+    nnz = 0
+    with out, ProcessPoolExecutor(workers) as pool:
+        # a bounded window of pending shards keeps memory flat
+        pending = []
+        for task in tasks:
+            pending.append(pool.submit(_shard_task, task))
+            if len(pending) < PREFETCH_PER_WORKER * workers:
+                continue
+            nnz += _write(out, fmt, pending.pop(0).result())
+        for future in pending:
+            nnz += _write(out, fmt, future.result())
+    return nnz
+
+
+def _write(out, fmt, shard):
+    if fmt == "txt":
+        out.write(shard)
+        return shard.count(" ") + shard.count("\n")
+    items, lengths = shard
+    out.extend_flat(items, lengths.tolist())
+    return len(items)
+
+
+def parse_count(text):
+    """'100000', '100K', '10M' or '1G' as an int."""
+    units = {"K": 10**3, "M": 10**6, "G": 10**9}
+    text = text.strip().upper()
+    if text[-1:] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--T", type=int, default=10, help="mean transaction size")
+    parser.add_argument("--I", type=int, default=4, help="mean maximal-set size")
+    parser.add_argument("--D", type=parse_count, default=100_000)
+    parser.add_argument("--N", type=int, default=1000, help="number of items")
+    parser.add_argument("--L", type=int, default=2000, help="maximal itemsets")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[1])
+    parser.add_argument("--format", choices=("txt", "csr"), default="txt")
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output-dir", default=".")
+    args = parser.parse_args()
+
+    for seed in args.seeds:
+        filename = auto_filename(args.T, args.I, args.D, seed)
+        if args.format == "csr":
+            filename = os.path.splitext(filename)[0] + CSR_SUFFIX
+        path = os.path.join(args.output_dir, filename)
+
+        print(f"=== Seed {seed}: {path} ===")
+        nnz = generate_dataset(
+            path,
+            D=args.D,
+            T_mean=args.T,
+            I_mean=args.I,
+            N=args.N,
+            L=args.L,
+            seed=seed,
+            shard_size=args.shard_size,
+            workers=args.workers,
+        )
+        print(f"Done: {args.D} transactions, {nnz} items")
@@ -0,0 +1,220 @@
+"""
+Memory budget for the vertical miners: spill TID-lists to a scratch file.
+
+SETM and Apriori-TID keep the TID-lists of two whole levels in RAM. With
+a memory_budget, every TID-list a miner keeps goes through
+SpillStore.keep(): while the resident lists fit in the budget it stays
+in memory, otherwise it is written to an anonymous scratch file and
+replaced by a SpilledTidList proxy. Lists of the level being built are
+the ones that spill; they are cold until the next level reads them.
+Space of released lists is reused, so the file grows with the lists
+spilled at one time rather than with the total over the run.
+
+Spilled lists are read back through a memory map, so they live in the
+page cache, which the OS can drop under pressure, instead of the heap.
+Sorted arrays come back as zero-copy views, bitmaps are rebuilt from
+their bytes. Results are unchanged, only slower to compute.
+"""
+
+import mmap
+import os
+import tempfile
+from array import array
+from collections import OrderedDict
+
+from tidlist import ArrayTidList, BitmapTidList, SetTidList, np
+
+# Recently read lists kept decoded: consecutive candidates share their
+# prefix parent, so it is not rebuilt for every one of them
+READ_CACHE_LISTS = 16
+
+
+class SpilledTidList:
+    """Proxy for a TID-list stored in a SpillStore."""
+
+    __slots__ = ("store", "offset", "size", "count", "kind")
+    name = "spilled"
+
+    def __init__(self, store, offset, size, count, kind):
+        self.store = store
+        self.offset = offset
+        self.size = size
+        self.count = count
+        self.kind = kind
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return iter(self.load())
+
+    @property
+    def nbytes(self):
+        return self.size
+
+    def load(self):
+        return self.store.read(self)
+
+    def intersect(self, other):
+        return self.load().intersect(load(other))
+
+    def difference(self, other):
+        return self.load().difference(load(other))
+
+
+def load(tidlist):
+    """A resident TID-list: spilled lists are read back, others returned."""
+    if isinstance(tidlist, SpilledTidList):
+        return tidlist.load()
+    return tidlist
+
+
+class SpillStore:
+    """
+    Budget tracker plus scratch file for TID-lists.
+
+    Input:
+        budget: bytes of resident TID-lists allowed (nbytes of each list)
+        directory: where the scratch file goes (default: the temp dir)
+
+    Counters: resident, peak_resident, spilled_bytes, spilled_lists and
+    file_bytes (size the scratch file grew to).
+
+    Released lists leave free extents, kept sorted and coalesced; a new
+    list goes into the first one it fits, or is appended. Free space at
+    the end of the file is handed back to appends. The file is never
+    truncated: views of released lists may still be mapped.
+    """
+
+    def __init__(self, budget, directory=None):
+        if budget < 0:
+            raise ValueError("memory budget must be >= 0")
+        self.budget = budget
+        self.file = tempfile.TemporaryFile(dir=directory)
+        self.end = 0
+        self._free = []  # [offset, size] extents, sorted by offset
+        self._map = None
+        self._mapped = 0
+        self._cache = OrderedDict()
+
+        self.resident = 0
+        self.peak_resident = 0
+        self.spilled_bytes = 0
+        self.spilled_lists = 0
+        self.file_bytes = 0
+
+    # ----------------------------------------------------
+    # Budget
+    # ----------------------------------------------------
+    def keep(self, tidlist):
+        """Account for a list that is kept; spill it if over budget."""
+        nbytes = tidlist.nbytes
+        if self.resident + nbytes <= self.budget:
+            self.resident += nbytes
+            self.peak_resident = max(self.peak_resident, self.resident)
+            return tidlist
+        return self.spill(tidlist)
+
+    def release(self, tidlists):
+        """Forget lists that are no longer referenced (a finished level)."""
+        freed = []
+        for tidlist in tidlists:
+            if isinstance(tidlist, SpilledTidList):
+                # the offset may be reused, so its decoded copy must go
+                self._cache.pop(tidlist.offset, None)
+                if tidlist.size:
+                    freed.append([tidlist.offset, tidlist.size])
+            else:
+                self.resident -= tidlist.nbytes
+        if freed:
+            self._free_extents(freed)
+
+    # ----------------------------------------------------
+    # Scratch file
+    # ----------------------------------------------------
+    def spill(self, tidlist):
+        if isinstance(tidlist, BitmapTidList) and 4 * len(tidlist) >= tidlist.nbytes:
+            kind, data = "bitmap", tidlist.to_bytes()
+        elif isinstance(tidlist, ArrayTidList):
+            tids = np.ascontiguousarray(tidlist.tids, dtype=np.int32)
+            kind, data = "array", tids.tobytes()
+        else:
+            # sparse bitmaps too: their TIDs take less room than the bits
+            kind, data = "array", array("i", tidlist).tobytes()
+
+        offset = self._allocate(len(data)) if data else self.end
+        os.pwrite(self.file.fileno(), data, offset)
+        self.file_bytes = max(self.file_bytes, offset + len(data))
+        self.spilled_bytes += len(data)
+        self.spilled_lists += 1
+        return SpilledTidList(self, offset, len(data), len(tidlist), kind)
+
+    def _allocate(self, size):
+        """Offset for size bytes: first free extent that fits, else the end."""
+        for i, (offset, free) in enumerate(self._free):
+            if free >= size:
+                if free == size:
+                    del self._free[i]
+                else:
+                    self._free[i] = [offset + size, free - size]
+                return offset
+        offset = self.end
+        self.end += size
+        return offset
+
+    def _free_extents(self, extents):
+        merged = []
+        for offset, size in sorted(self._free + extents):
+            if merged and merged[-1][0] + merged[-1][1] == offset:
+                merged[-1][1] += size
+            else:
+                merged.append([offset, size])
+        if merged and merged[-1][0] + merged[-1][1] == self.end:
+            self.end = merged.pop()[0]
+        self._free = merged
+
+    def _view(self, offset, size):
+        if offset + size > self._mapped:
+            # remap to cover what was written past the old map; views into
+            # it keep it alive until they are dropped. Writes to reused
+            # extents inside the map show through it (shared mapping).
+            self._map = mmap.mmap(self.file.fileno(), self.end, access=mmap.ACCESS_READ)
+            self._mapped = self.end
+        return self._map, offset
+
+    def read(self, spilled):
+        if spilled.size == 0:
+            return SetTidList(set())
+        cached = self._cache.get(spilled.offset)
+        if cached is not None:
+            self._cache.move_to_end(spilled.offset)
+            return cached
+        tidlist = self._decode(spilled)
+        self._cache[spilled.offset] = tidlist
+        if len(self._cache) > READ_CACHE_LISTS:
+            self._cache.popitem(last=False)
+        return tidlist
+
+    def _decode(self, spilled):
+        buf, offset = self._view(spilled.offset, spilled.size)
+        if spilled.kind == "bitmap":
+            raw = buf[offset : offset + spilled.size]
+            return BitmapTidList(int.from_bytes(raw, "little"), spilled.count)
+        if np is not None:
+            return ArrayTidList(
+                np.frombuffer(buf, dtype=np.int32, count=spilled.count, offset=offset)
+            )
+        tids = array("i", buf[offset : offset + spilled.size])
+        return SetTidList(set(tids))
+
+    def report(self, stats):
+        """Write the spill counters into a stats dict."""
+        stats["spilled_bytes"] = self.spilled_bytes
+        stats["spilled_lists"] = self.spilled_lists
+        stats["peak_resident_bytes"] = self.peak_resident
+        stats["spill_file_bytes"] = self.file_bytes
+
+    def close(self):
+        self._cache.clear()
+        self._map = None
+        self.file.close()
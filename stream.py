@@ -0,0 +1,251 @@
+"""
+Approximate frequent itemsets over a live transaction feed.
+
+Transactions arrive one per line (the format main.load_transactions
+reads), from a growing file or stdin, and are processed in panes of
+pane_size transactions. Each pane is mined with an in-memory miner at
+ceil(error * pane_size), so every itemset left out of a pane's summary
+occurs fewer than error * pane_size times in it.
+
+    window=None  - landmark window (everything since the start), merged
+                   Lossy Counting style (Manku & Motwani): tracked
+                   itemsets are counted exactly in each new pane and
+                   dropped once count + delta <= error * N.
+    window=W     - sliding window over the last W transactions, kept as
+                   W / pane_size pane summaries; the oldest pane expires
+                   as a new one completes.
+
+Error bound: with N the transactions covered by a snapshot (everything
+so far, or the panes in the window plus the open pane), every reported
+count f satisfies
+
+    f <= true count <= f + error * N
+
+so snapshot(s) reports every itemset with true support >= s and none
+below s - error. Memory is bounded by the pane buffer plus the tracked
+itemsets, not by the length of the stream.
+
+Usage:
+    python stream.py FILE|- --support 0.01 [--error 0.001] [--window N]
+"""
+
+import argparse
+import math
+import sys
+import time
+from collections import defaultdict, deque
+
+from apriori import CandidateTrie
+from fp_growth import fp_growth
+from itemset_io import collect_levels
+
+DEFAULT_PANE_BUCKETS = 10
+
+
+def _sorted_work(transactions):
+    return [(tid, sorted(set(txn))) for tid, txn in enumerate(transactions)]
+
+
+class StreamMiner:
+    """
+    Landmark or sliding-window frequent itemset summary of a stream.
+
+    Feed transactions with add()/extend(); query with snapshot() at any
+    time, including in the middle of a pane.
+    """
+
+    def __init__(self, error=0.001, window=None, pane_size=None, miner=fp_growth):
+        if not 0 < error < 1:
+            raise ValueError("error must be in (0, 1)")
+        if pane_size is None:
+            pane_size = DEFAULT_PANE_BUCKETS * math.ceil(1 / error)
+            if window is not None:
+                pane_size = min(pane_size, window)
+        if window is not None and window % pane_size:
+            raise ValueError("window must be a multiple of pane_size")
+
+        self.error = error
+        self.window = window
+        self.pane_size = pane_size
+        self.miner = miner
+
+        self.buffer = []  # the open pane
+        self.num_seen = 0
+
+        # landmark: itemset -> [count, delta] and transactions merged
+        self.tracked = {}
+        self.merged = 0
+
+        # sliding: (pane length, {itemset: count}) of the complete panes
+        self.panes = deque()
+
+    # ----------------------------------------------------
+    # Input
+    # ----------------------------------------------------
+    def add(self, txn):
+        self.buffer.append(txn)
+        self.num_seen += 1
+        if len(self.buffer) == self.pane_size:
+            self._close_pane()
+
+    def extend(self, transactions):
+        for txn in transactions:
+            self.add(txn)
+
+    def _pane_threshold(self, n):
+        return max(1, math.ceil(self.error * n))
+
+    def _summarize(self, pane):
+        """Exact counts of every itemset occurring >= error * len(pane) times."""
+        _, support = self.miner(pane, self._pane_threshold(len(pane)))
+        return {tuple(sorted(itemset)): count for itemset, count in support.items()}
+
+    def _merge(self, tracked, merged, pane):
+        """Lossy Counting step: fold one pane into a landmark summary."""
+        n = len(pane)
+        if tracked:
+            trie = CandidateTrie(tracked)
+            trie.count(_sorted_work(pane))
+            for itemset, count in trie.items():
+                tracked[itemset][0] += count
+
+        # untracked itemsets missed at most error * merged occurrences so far
+        delta = math.floor(self.error * merged)
+        for itemset, count in self._summarize(pane).items():
+            if itemset not in tracked:
+                tracked[itemset] = [count, delta]
+
+        merged += n
+        limit = self.error * merged
+        for itemset in [i for i, (f, d) in tracked.items() if f + d <= limit]:
+            del tracked[itemset]
+        return merged
+
+    def _close_pane(self):
+        pane, self.buffer = self.buffer, []
+        if self.window is None:
+            self.merged = self._merge(self.tracked, self.merged, pane)
+            return
+        self.panes.append((len(pane), self._summarize(pane)))
+        if len(self.panes) * self.pane_size > self.window:
+            self.panes.popleft()
+
+    # ----------------------------------------------------
+    # Queries
+    # ----------------------------------------------------
+    def covered(self):
+        """Transactions the next snapshot covers (N in the error bound)."""
+        if self.window is None:
+            return self.num_seen
+        return sum(n for n, _ in self.panes) + len(self.buffer)
+
+    def error_bound(self):
+        """Largest possible undercount of any reported support."""
+        return self.error * self.covered()
+
+    def counts(self):
+        """{itemset: lower-bound count} over the covered transactions."""
+        if self.window is None:
+            tracked = {i: list(entry) for i, entry in self.tracked.items()}
+            if self.buffer:
+                self._merge(tracked, self.merged, self.buffer)
+            return {itemset: f for itemset, (f, _) in tracked.items()}
+
+        totals = defaultdict(int)
+        summaries = [summary for _, summary in self.panes]
+        if self.buffer:
+            summaries.append(self._summarize(self.buffer))
+        for summary in summaries:
+            for itemset, count in summary.items():
+                totals[itemset] += count
+        return totals
+
+    def snapshot(self, min_support):
+        """
+        Approximate frequent itemsets right now.
+
+        Input:
+            min_support: support threshold as a fraction of covered()
+
+        Output:
+            L: list of lists of tuples (itemsets by level)
+            support_data: dict {tuple: lower-bound count}; every itemset
+                with true support >= min_support is included and
+                none below min_support - error
+        """
+        n = self.covered()
+        limit = (min_support - self.error) * n
+        return collect_levels(
+            (itemset, f) for itemset, f in self.counts().items() if f >= limit and f > 0
+        )
+
+
+# ----------------------------------------------------
+# Sources
+# ----------------------------------------------------
+def parse_line(line):
+    return list(map(int, line.split()))
+
+
+def read_stream(fileobj):
+    """Transactions from an open text stream (e.g. sys.stdin) until EOF."""
+    for line in fileobj:
+        if line.strip():
+            yield parse_line(line)
+
+
+def follow(path, poll_interval=1.0, from_start=True):
+    """
+    Transactions appended to a growing file, like `tail -f`.
+
+    Only complete lines are parsed; a line still being written is held
+    back until its newline arrives. Never returns.
+    """
+    with open(path) as f:
+        if not from_start:
+            f.seek(0, 2)
+        pending = ""
+        while True:
+            chunk = f.readline()
+            if not chunk:
+                time.sleep(poll_interval)
+                continue
+            pending += chunk
+            if not pending.endswith("\n"):
+                continue
+            line, pending = pending, ""
+            if line.strip():
+                yield parse_line(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("source", help="transaction file to follow, or - for stdin")
+    parser.add_argument("--support", type=float, required=True)
+    parser.add_argument("--error", type=float, default=0.001)
+    parser.add_argument("--window", type=int, default=None)
+    parser.add_argument("--pane-size", type=int, default=None)
+    parser.add_argument(
+        "--every", type=int, default=10000, help="transactions between snapshots"
+    )
+    args = parser.parse_args()
+
+    if args.support <= args.error:
+        parser.error("--support must be larger than --error")
+
+    stream_miner = StreamMiner(args.error, args.window, args.pane_size)
+    source = read_stream(sys.stdin) if args.source == "-" else follow(args.source)
+
+    for txn in source:
+        stream_miner.add(txn)
+        if stream_miner.num_seen % args.every == 0:
+            _, support_data = stream_miner.snapshot(args.support)
+            print(
+                f"{stream_miner.num_seen} transactions: {len(support_data)} itemsets "
+                f"(N={stream_miner.covered()}, "
+                f"undercount <= {stream_miner.error_bound():.0f})",
+                flush=True,
+            )
+
+    _, support_data = stream_miner.snapshot(args.support)
+    print(f"final: {len(support_data)} itemsets over {stream_miner.covered()}")
@@ -0,0 +1,91 @@
+import time
+
+from itemset_trie import ItemsetTrie
+
+
+def filter_result(L, support_data, min_support):
+    """
+    Restrict a result mined at a lower threshold to min_support.
+
+    Frequent itemsets at a higher threshold are exactly the ones whose
+    support reaches it, so no re-mining is needed. Each level keeps its
+    container type (list, set or dict) and empty levels are dropped.
+    An ItemsetTrie result is filtered into a new trie.
+    """
+    if isinstance(support_data, ItemsetTrie):
+        trie = support_data.filtered(min_support)
+        return trie.levels(), trie
+
+    filtered_support = {
+        itemset: s for itemset, s in support_data.items() if s >= min_support
+    }
+
+    filtered_L = []
+    for level in L:
+        if isinstance(level, dict):
+            kept = {i: s for i, s in level.items() if s >= min_support}
+        else:
+            kept = type(level)(i for i in level if support_data[i] >= min_support)
+        if kept:
+            filtered_L.append(kept)
+    if not filtered_L and L:
+        filtered_L.append(type(L[0])())  # keep an empty L1 like the miners do
+
+    return filtered_L, filtered_support
+
+
+def mine_sweep(mine_fn, min_supports, measure_direct=False, filterable=True):
+    """
+    Mine once at the lowest threshold and derive every higher one.
+
+    Input:
+        mine_fn: callable(min_support) -> (L, support_data)
+        min_supports: integer thresholds (counts)
+        measure_direct: also run mine_fn at every higher threshold to
+            record the runtime the direct method would have had
+        filterable: False for results that cannot be derived by
+            filtering (maximal itemsets); every threshold is then mined
+
+    Output:
+        {min_support: ((L, support_data), sweep_runtime, direct_runtime)}
+        sweep_runtime is the mining time for the lowest threshold and the
+        filtering time for the others; direct_runtime is the time of a
+        run of mine_fn at that threshold, None where the result was only
+        filtered (measure_direct not set).
+    """
+    thresholds = sorted(set(min_supports))
+    lowest = thresholds[0]
+
+    start = time.perf_counter()
+    base = mine_fn(lowest)
+    base_runtime = time.perf_counter() - start
+
+    results = {lowest: (base, base_runtime, base_runtime)}
+
+    for min_support in thresholds[1:]:
+        if not filterable:
+            start = time.perf_counter()
+            result = mine_fn(min_support)
+            sweep_runtime = time.perf_counter() - start
+            results[min_support] = (result, sweep_runtime, sweep_runtime)
+            continue
+
+        start = time.perf_counter()
+        result = filter_result(*base, min_support)
+        sweep_runtime = time.perf_counter() - start
+
+        direct_runtime = None
+        if measure_direct:
+            start = time.perf_counter()
+            direct = mine_fn(min_support)
+            direct_runtime = time.perf_counter() - start
+            if len(direct[1]) != len(result[1]):
+                raise AssertionError(
+                    f"Sweep result differs from direct mining at {min_support}: "
+                    f"{len(result[1])} vs {len(direct[1])} itemsets"
+                )
+            del direct
+
+        results[min_support] = (result, sweep_runtime, direct_runtime)
+
+    return results
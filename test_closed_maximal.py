@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from apriori_tid import apriori_tid
+from closed_maximal import ClosedSupport, charm, genmax, support_from_closed
+
+
+def random_transactions(seed, num_items=15, num_trans=120):
+    rng = random.Random(seed)
+    return [rng.sample(range(num_items), rng.randint(1, 6)) for _ in range(num_trans)]
+
+
+def frequent_itemsets(transactions, min_support):
+    _, support_data = apriori_tid(transactions, min_support)
+    return {frozenset(i): s for i, s in support_data.items()}
+
+
+def as_tuples(found):
+    return {tuple(sorted(i)): s for i, s in found.items()}
+
+
+CASES = [(seed, min_support) for seed in range(3) for min_support in (2, 5, 15)]
+
+
+@pytest.mark.parametrize("backend", ["set", "bitmap"])
+@pytest.mark.parametrize("seed, min_support", CASES)
+def test_charm_finds_exactly_the_closed_itemsets(backend, seed, min_support):
+    transactions = random_transactions(seed)
+    frequent = frequent_itemsets(transactions, min_support)
+    expected = {
+        i: s
+        for i, s in frequent.items()
+        if not any(i < j and s == t for j, t in frequent.items())
+    }
+
+    L, support_data = charm(transactions, min_support, backend=backend)
+
+    assert support_data == as_tuples(expected)
+    assert sorted(i for level in L for i in level) == sorted(support_data)
+
+
+@pytest.mark.parametrize("backend", ["set", "bitmap"])
+@pytest.mark.parametrize("seed, min_support", CASES)
+def test_genmax_finds_exactly_the_maximal_itemsets(backend, seed, min_support):
+    transactions = random_transactions(seed)
+    frequent = frequent_itemsets(transactions, min_support)
+    expected = {i: s for i, s in frequent.items() if not any(i < j for j in frequent)}
+
+    L, support_data = genmax(transactions, min_support, backend=backend)
+
+    assert support_data == as_tuples(expected)
+    assert sorted(i for level in L for i in level) == sorted(support_data)
+
+
+@pytest.mark.parametrize("seed, min_support", CASES)
+def test_closed_itemsets_recover_every_support(seed, min_support):
+    transactions = random_transactions(seed)
+    frequent = frequent_itemsets(transactions, min_support)
+    _, closed = charm(transactions, min_support)
+    lookup = ClosedSupport(closed)
+
+    for itemset, support in frequent.items():
+        assert lookup.support(itemset) == support
+        assert support_from_closed(itemset, closed) == support
+    assert lookup.support({10**6}) == 0
+    assert support_from_closed({10**6}, closed) == 0
@@ -0,0 +1,50 @@
+import random
+
+import pytest
+
+import fp_growth
+from apriori_tid import apriori_tid
+from fp_growth import FPTree
+
+pytest.importorskip("numpy")
+
+# thresholds that force the Python loops, NumPy everywhere, and a mix
+SETTINGS = [(10**9, 10**9, 10**9), (1, 1, 1), (8, 16, 4)]
+
+
+def random_transactions(seed, num_items=25, num_trans=300):
+    rng = random.Random(seed)
+    return [rng.sample(range(num_items), rng.randint(1, 8)) for _ in range(num_trans)]
+
+
+@pytest.mark.parametrize("settings", SETTINGS)
+def test_matches_apriori_tid(monkeypatch, settings):
+    min_paths, min_nodes, min_chain = settings
+    monkeypatch.setattr(fp_growth, "NUMPY_MIN_PATHS", min_paths)
+    monkeypatch.setattr(fp_growth, "NUMPY_MIN_NODES", min_nodes)
+    monkeypatch.setattr(fp_growth, "NUMPY_MIN_CHAIN", min_chain)
+    for seed in range(5):
+        transactions = random_transactions(seed)
+        for min_support in (2, 5, 20):
+            L, support_data = fp_growth.fp_growth(transactions, min_support)
+            _, expected = apriori_tid(transactions, min_support)
+
+            assert support_data == {tuple(sorted(i)): s for i, s in expected.items()}
+            assert sum(map(len, L)) == len(support_data)
+
+
+def test_vectorized_build_matches_loop(monkeypatch):
+    rng = random.Random(0)
+    for _ in range(50):
+        num_ranks = rng.randint(1, 12)
+        paths = [
+            (tuple(sorted(rng.sample(range(num_ranks), rng.randint(1, num_ranks)))), 2)
+            for _ in range(rng.randint(1, 60))
+        ]
+        monkeypatch.setattr(fp_growth, "NUMPY_MIN_PATHS", 10**9)
+        loop = FPTree(paths, num_ranks)
+        monkeypatch.setattr(fp_growth, "NUMPY_MIN_PATHS", 1)
+        vectorized = FPTree(paths, num_ranks)
+
+        for column in ("item", "count", "parent", "link", "head", "totals"):
+            assert getattr(vectorized, column) == getattr(loop, column)
@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+from apriori_tid import apriori_tid
+from fp_growth import fp_growth
+from incremental import fup_update
+
+
+def random_transactions(rng, num_trans, num_items=15):
+    return [rng.sample(range(num_items), rng.randint(1, 6)) for _ in range(num_trans)]
+
+
+def normalized(support_data):
+    return {tuple(sorted(i)): s for i, s in support_data.items()}
+
+
+@pytest.mark.parametrize("miner", [apriori_tid, fp_growth])
+def test_update_matches_full_remine(miner):
+    rng = random.Random(0)
+    for _ in range(5):
+        old = random_transactions(rng, 150)
+        new = random_transactions(rng, rng.randint(1, 60))
+        for old_min_support in (3, 10):
+            old_result = miner(old, old_min_support)
+            for min_support in (old_min_support, old_min_support + 4):
+                L, support_data = fup_update(
+                    old, old_result, old_min_support, new, min_support
+                )
+                _, expected = apriori_tid(old + new, min_support)
+
+                assert normalized(support_data) == normalized(expected)
+                assert sum(map(len, L)) == len(support_data)
+                # keys keep the type the old result used
+                first = next(iter(old_result[1]))
+                assert all(type(i) is type(first) for i in support_data)
+
+
+def test_empty_batch_never_scans_old_data():
+    rng = random.Random(1)
+    old = random_transactions(rng, 150)
+    stats = {}
+    _, support_data = fup_update(old, fp_growth(old, 5), 5, [], 5, stats=stats)
+
+    assert normalized(support_data) == normalized(fp_growth(old, 5)[1])
+    assert stats == {"old_scans": 0, "old_candidates": 0}
+
+
+def test_threshold_below_old_threshold_is_rejected():
+    old = [[1, 2], [1, 2]]
+    with pytest.raises(ValueError):
+        fup_update(old, fp_growth(old, 2), 2, [[1]], 1)
@@ -0,0 +1,56 @@
+import os
+import time
+
+from csr_transactions import load_transactions
+from fp_growth import fp_growth
+from sampling import lowered_threshold, toivonen_mine
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_whole_data_sample_is_mined_directly():
+    transactions = load_transactions(os.path.join(HERE, "T5.I2.D1K.txt"))
+    for min_support in (3, 5, 10):
+        stats = {}
+        L, support_data, complete = toivonen_mine(
+            transactions, min_support, stats=stats
+        )
+        _, expected = fp_growth(transactions, min_support)
+
+        assert complete
+        assert support_data == {tuple(sorted(i)): s for i, s in expected.items()}
+        assert stats["sample_size"] == len(transactions)
+        assert stats["sample_min_support"] == min_support
+        assert stats["border_size"] == 0
+
+
+def test_lowered_threshold_does_not_fall_to_one():
+    # the Chernoff bound alone would give (1 - eps) < 0 here
+    assert lowered_threshold(3, 1000, 500, 0.01) >= 2
+    assert lowered_threshold(10, 1000, 500, 0.01) >= 2
+    # and it never exceeds the scaled threshold when that is large
+    assert lowered_threshold(5000, 100000, 50000, 0.01) <= 2500
+
+
+def _best_time(function, *args, repeat=2, **kwargs):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def test_default_sample_is_cheaper_than_direct_mining():
+    transactions = load_transactions(os.path.join(HERE, "T10.I2.D100K.txt"))
+    min_support = len(transactions) // 100  # 1%
+
+    sampled, (_, support_data, complete) = _best_time(
+        toivonen_mine, transactions, min_support, seed=0
+    )
+    direct, (_, expected) = _best_time(fp_growth, transactions, min_support)
+
+    assert complete
+    assert support_data == {tuple(sorted(i)): s for i, s in expected.items()}
+    assert sampled < direct
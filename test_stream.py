@@ -0,0 +1,63 @@
+import math
+import random
+
+import pytest
+
+from apriori_tid import apriori_tid
+from stream import StreamMiner
+
+
+def skewed_transactions(seed, num_trans=700, num_items=20):
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(num_items)]
+    return [
+        list(set(rng.choices(range(num_items), weights, k=rng.randint(1, 6))))
+        for _ in range(num_trans)
+    ]
+
+
+def true_count(itemset, transactions):
+    return sum(1 for txn in transactions if set(itemset) <= set(txn))
+
+
+def check_bounds(miner, covered, min_support):
+    n = len(covered)
+    assert miner.covered() == n
+    assert miner.error_bound() == pytest.approx(miner.error * n)
+
+    _, reported = miner.snapshot(min_support)
+    for itemset, f in reported.items():
+        true = true_count(itemset, covered)
+        assert f <= true <= f + miner.error * n
+        assert true >= (min_support - miner.error) * n
+
+    _, frequent = apriori_tid(covered, max(1, math.ceil(min_support * n)))
+    for itemset in frequent:
+        assert tuple(sorted(itemset)) in reported
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_landmark_bounds(seed):
+    transactions = skewed_transactions(seed)
+    miner = StreamMiner(error=0.02, pane_size=50)
+    for end in (30, 50, 230, 500, 700):  # mid-pane and pane boundaries
+        miner.extend(transactions[miner.num_seen : end])
+        check_bounds(miner, transactions[:end], 0.1)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_sliding_window_bounds(seed):
+    transactions = skewed_transactions(seed)
+    miner = StreamMiner(error=0.02, window=200, pane_size=50)
+    for end in (30, 200, 230, 500, 700):
+        miner.extend(transactions[miner.num_seen : end])
+        check_bounds(miner, transactions[end - miner.covered() : end], 0.1)
+        # the window holds the last full panes plus the open one
+        assert miner.covered() == min(end, 200) + (end % 50 if end > 200 else 0)
+
+
+def test_invalid_window_is_rejected():
+    with pytest.raises(ValueError):
+        StreamMiner(error=0.02, window=120, pane_size=50)
+    with pytest.raises(ValueError):
+        StreamMiner(error=1.5)
@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+from apriori_tid import apriori_tid
+from topk import topk_mine
+
+
+def random_transactions(seed, num_items=15, num_trans=120):
+    rng = random.Random(seed)
+    return [rng.sample(range(num_items), rng.randint(1, 6)) for _ in range(num_trans)]
+
+
+def all_itemsets(transactions):
+    _, support_data = apriori_tid(transactions, 1)
+    return {tuple(sorted(i)): s for i, s in support_data.items()}
+
+
+@pytest.mark.parametrize("backend", ["set", "bitmap"])
+@pytest.mark.parametrize("min_length", [1, 2, 3])
+def test_matches_ranked_full_lattice(backend, min_length):
+    for seed in range(3):
+        transactions = random_transactions(seed)
+        ranked = sorted(
+            (-s, len(i), i)
+            for i, s in all_itemsets(transactions).items()
+            if len(i) >= min_length
+        )
+        for k in (1, 10, 50):
+            stats = {}
+            L, support_data = topk_mine(
+                transactions, k, min_length=min_length, backend=backend, stats=stats
+            )
+            expected = {i: -s for s, _, i in ranked[:k]}
+
+            assert support_data == expected
+            assert sorted(i for level in L for i in level) == sorted(expected)
+            assert stats["min_support"] == -ranked[k - 1][0]
+
+
+def test_k_beyond_all_itemsets_returns_everything():
+    transactions = [[1, 2], [2, 3], [1, 2, 3]]
+    _, support_data = topk_mine(transactions, 100)
+    assert support_data == all_itemsets(transactions)
+
+
+def test_k_must_be_positive():
+    with pytest.raises(ValueError):
+        topk_mine([[1]], 0)
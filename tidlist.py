@@ -0,0 +1,552 @@
+"""
+Interchangeable TID-list backends for the vertical miners (SETM, Apriori-TID).
+
+Backends:
+    "set"    - Python set of ints (the original representation)
+    "array"  - sorted int32 NumPy array (needs numpy)
+    "bitmap" - packed bitmap held in a single Python int
+    "rle"    - run-length compressed bitmap (start/end runs)
+    "auto"   - pick the smallest encoding per itemset from its density
+
+Every backend exposes the same small interface: len(), iteration in
+ascending TID order, intersect(), difference() and nbytes.
+"""
+
+import sys
+import time
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, "array" backend is unavailable
+    np = None
+
+
+BACKENDS = ("set", "array", "bitmap", "rle", "auto")
+
+# Rough per-TID cost of a Python set entry (hash slot + int object)
+SET_BYTES_PER_TID = 64
+
+# Average run length below which "auto" never picks the "rle" backend
+RLE_MIN_RUN_LENGTH = 4
+
+# Lists this short stay Python sets under "auto": probing a bitmap with a
+# few TIDs beats AND-ing whole bitmaps, but only up to ~20-30 TIDs
+SMALL_LIST_MAX = 16
+
+# A bitmap is preferred over a sorted array until it is this many times
+# larger: AND + popcount on packed words is much faster than a merge.
+# Tuned with SMALL_LIST_MAX on apriori_tid over T5/T10 data (20K-100K
+# transactions), where "auto" then matches or beats "bitmap" alone
+BITMAP_PREFERENCE = 32
+
+
+# ----------------------------------------------------
+# Backends
+# ----------------------------------------------------
+class SetTidList:
+    """TID-list stored as a Python set."""
+
+    __slots__ = ("tids",)
+    name = "set"
+
+    def __init__(self, tids):
+        self.tids = tids
+
+    @classmethod
+    def from_sorted(cls, tids):
+        return cls(set(tids))
+
+    def __len__(self):
+        return len(self.tids)
+
+    def __iter__(self):
+        return iter(sorted(self.tids))
+
+    @property
+    def nbytes(self):
+        return sys.getsizeof(self.tids) + 28 * len(self.tids)
+
+    def intersect(self, other):
+        if isinstance(other, SetTidList):
+            return SetTidList(self.tids & other.tids)
+        if isinstance(other, BitmapTidList):
+            # probe the bitmap instead of decoding it
+            raw, size = other.to_bytes(), other.nbytes
+            return SetTidList(
+                {t for t in self.tids if t >> 3 < size and raw[t >> 3] >> (t & 7) & 1}
+            )
+        return SetTidList(self.tids.intersection(other))
+
+    def difference(self, other):
+        if isinstance(other, SetTidList):
+            return SetTidList(self.tids - other.tids)
+        return SetTidList(self.tids.difference(other))
+
+
+class ArrayTidList:
+    """TID-list stored as a sorted int32 NumPy array."""
+
+    __slots__ = ("tids",)
+    name = "array"
+
+    def __init__(self, tids):
+        self.tids = tids
+
+    @classmethod
+    def from_sorted(cls, tids):
+        return cls(np.fromiter(tids, dtype=np.int32))
+
+    def __len__(self):
+        return len(self.tids)
+
+    def __iter__(self):
+        return iter(self.tids.tolist())
+
+    @property
+    def nbytes(self):
+        return self.tids.nbytes
+
+    def _as_array(self, other):
+        if isinstance(other, ArrayTidList):
+            return other.tids
+        return np.fromiter(other, dtype=np.int32)
+
+    def intersect(self, other):
+        if isinstance(other, BitmapTidList):
+            # probe the bitmap instead of decoding it
+            raw = np.frombuffer(other.to_bytes(), dtype=np.uint8)
+            tids = self.tids[self.tids < 8 * len(raw)]
+            hits = (raw[tids >> 3] >> (tids & 7)) & 1
+            return ArrayTidList(tids[hits.astype(bool)])
+        return ArrayTidList(
+            np.intersect1d(self.tids, self._as_array(other), assume_unique=True)
+        )
+
+    def difference(self, other):
+        return ArrayTidList(
+            np.setdiff1d(self.tids, self._as_array(other), assume_unique=True)
+        )
+
+
+# Bit positions set in each byte value, used to decode bitmaps quickly
+_BYTE_BITS = [tuple(b for b in range(8) if v >> b & 1) for v in range(256)]
+
+
+class BitmapTidList:
+    """TID-list stored as a packed bitmap (bit t set <=> TID t present)."""
+
+    __slots__ = ("bits", "count", "_raw")
+    name = "bitmap"
+
+    def __init__(self, bits, count=None):
+        self.bits = bits
+        self.count = bits.bit_count() if count is None else count
+        self._raw = None
+
+    @classmethod
+    def from_sorted(cls, tids):
+        tids = tids if isinstance(tids, (list, tuple)) else list(tids)
+        if not tids:
+            return cls(0, 0)
+        buf = bytearray(tids[-1] // 8 + 1)
+        for t in tids:
+            buf[t >> 3] |= 1 << (t & 7)
+        return cls(int.from_bytes(buf, "little"), len(tids))
+
+    def __len__(self):
+        return self.count
+
+    def to_bytes(self):
+        # cached: sparse lists probe the same bitmap many times per level
+        if self._raw is None:
+            self._raw = self.bits.to_bytes(self.nbytes, "little")
+        return self._raw
+
+    def __iter__(self):
+        if np is not None:
+            # only unpack the non-zero bytes: sparse results of dense
+            # intersections are decoded often by adapt()
+            raw = np.frombuffer(self.to_bytes(), dtype=np.uint8)
+            nonzero = np.flatnonzero(raw)
+            rows, cols = np.nonzero(
+                np.unpackbits(raw[nonzero, None], axis=1, bitorder="little")
+            )
+            return iter((nonzero[rows] * 8 + cols).tolist())
+        return self._iter_bytes()
+
+    def _iter_bytes(self):
+        for i, byte in enumerate(self.to_bytes()):
+            if byte:
+                base = i << 3
+                for b in _BYTE_BITS[byte]:
+                    yield base + b
+
+    @property
+    def nbytes(self):
+        return (self.bits.bit_length() + 7) // 8
+
+    def _as_bits(self, other):
+        if isinstance(other, BitmapTidList):
+            return other.bits
+        return BitmapTidList.from_sorted(list(other)).bits
+
+    def intersect(self, other):
+        if isinstance(other, (SetTidList, ArrayTidList)):
+            # the sparse side probes this bitmap instead of being packed
+            return other.intersect(self)
+        return BitmapTidList(self.bits & self._as_bits(other))
+
+    def difference(self, other):
+        return BitmapTidList(self.bits & ~self._as_bits(other))
+
+
+class RunTidList:
+    """
+    TID-list stored as run-length encoded runs [start, end).
+
+    Compact when TIDs are clustered (e.g. sorted or time-ordered data).
+    """
+
+    __slots__ = ("starts", "ends", "count")
+    name = "rle"
+
+    def __init__(self, starts, ends, count=None):
+        self.starts = starts
+        self.ends = ends
+        if count is None:
+            count = sum(e - s for s, e in zip(starts, ends))
+        self.count = count
+
+    @classmethod
+    def from_sorted(cls, tids):
+        if np is not None:
+            tids = np.fromiter(tids, dtype=np.int32)
+            if not len(tids):
+                return cls(array("i"), array("i"), 0)
+            # a run ends wherever the next TID is not the successor
+            breaks = np.flatnonzero(np.diff(tids) != 1)
+            starts = tids[np.concatenate(([0], breaks + 1))]
+            ends = tids[np.concatenate((breaks, [len(tids) - 1]))] + 1
+            return cls(_int_array(starts), _int_array(ends), len(tids))
+        starts, ends = array("i"), array("i")
+        count = 0
+        for t in tids:
+            if ends and ends[-1] == t:
+                ends[-1] = t + 1
+            else:
+                starts.append(t)
+                ends.append(t + 1)
+            count += 1
+        return cls(starts, ends, count)
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for s, e in zip(self.starts, self.ends):
+            yield from range(s, e)
+
+    @property
+    def nbytes(self):
+        return (len(self.starts) + len(self.ends)) * self.starts.itemsize
+
+    def _as_runs(self, other):
+        if isinstance(other, RunTidList):
+            return other
+        return RunTidList.from_sorted(other)
+
+    def _np_runs(self):
+        return (
+            np.frombuffer(self.starts, dtype=np.int32),
+            np.frombuffer(self.ends, dtype=np.int32),
+        )
+
+    def intersect(self, other):
+        other = self._as_runs(other)
+        if np is not None:
+            a, b = (other, self) if other.count == len(other.starts) else (self, other)
+            if a.count == len(a.starts):
+                # single-TID runs (unclustered data): probe, don't merge
+                tids = a._np_runs()[0]
+                return _single_runs(tids[_in_runs(tids, *b._np_runs())])
+            return _intersect_runs(*a._np_runs(), *b._np_runs())
+        a_s, a_e, b_s, b_e = self.starts, self.ends, other.starts, other.ends
+        starts, ends = array("i"), array("i")
+        i = j = 0
+        while i < len(a_s) and j < len(b_s):
+            lo = max(a_s[i], b_s[j])
+            hi = min(a_e[i], b_e[j])
+            if lo < hi:
+                starts.append(lo)
+                ends.append(hi)
+            # advance whichever run finishes first
+            if a_e[i] < b_e[j]:
+                i += 1
+            else:
+                j += 1
+        return RunTidList(starts, ends)
+
+    def difference(self, other):
+        other = self._as_runs(other)
+        if np is not None:
+            if self.count == len(self.starts):
+                tids = self._np_runs()[0]
+                return _single_runs(tids[~_in_runs(tids, *other._np_runs())])
+            # A - B is A intersected with the gaps between B's runs
+            b_s, b_e = other._np_runs()
+            gap_starts = np.concatenate(([0], b_e))
+            gap_ends = np.concatenate((b_s, [np.iinfo(np.int32).max]))
+            return _intersect_runs(*self._np_runs(), gap_starts, gap_ends)
+        b_s, b_e = other.starts, other.ends
+        starts, ends = array("i"), array("i")
+        j = 0
+        for s, e in zip(self.starts, self.ends):
+            # skip runs of `other` that end before this run starts
+            while j < len(b_s) and b_e[j] <= s:
+                j += 1
+            k = j
+            while k < len(b_s) and b_s[k] < e:
+                if b_s[k] > s:
+                    starts.append(s)
+                    ends.append(b_s[k])
+                s = max(s, b_e[k])
+                k += 1
+            if s < e:
+                starts.append(s)
+                ends.append(e)
+        return RunTidList(starts, ends)
+
+
+def _int_array(values):
+    return array("i", values.astype(np.int32).tobytes())
+
+
+def _intersect_runs(a_s, a_e, b_s, b_e):
+    """Vectorized merge of two sorted run lists (numpy arrays)."""
+    # runs of b overlapping run i of a are first[i]:last[i]
+    first = np.searchsorted(b_e, a_s, side="right")
+    last = np.searchsorted(b_s, a_e, side="left")
+    counts = last - first  # runs are disjoint and sorted, so >= 0
+    a_idx = np.repeat(np.arange(len(a_s)), counts)
+    b_idx = np.arange(len(a_idx)) + np.repeat(
+        first - (np.cumsum(counts) - counts), counts
+    )
+    lo = np.maximum(a_s[a_idx], b_s[b_idx])
+    hi = np.minimum(a_e[a_idx], b_e[b_idx])
+    keep = lo < hi
+    lo, hi = lo[keep], hi[keep]
+    return RunTidList(_int_array(lo), _int_array(hi), int((hi - lo).sum()))
+
+
+def _in_runs(tids, starts, ends):
+    """Mask of the TIDs (numpy array) that fall inside one of the runs."""
+    if not len(starts):
+        return np.zeros(len(tids), dtype=bool)
+    idx = np.searchsorted(starts, tids, side="right") - 1
+    return (idx >= 0) & (tids < ends[idx])
+
+
+def _single_runs(tids):
+    # a subset of single-TID runs has no adjacent TIDs, so no runs merge
+    return RunTidList(_int_array(tids), _int_array(tids + 1), len(tids))
+
+
+BACKEND_CLASSES = {
+    "set": SetTidList,
+    "array": ArrayTidList,
+    "bitmap": BitmapTidList,
+    "rle": RunTidList,
+}
+
+
+# ----------------------------------------------------
+# Backend selection
+# ----------------------------------------------------
+def estimate_nbytes(backend, count, num_transactions, runs=None):
+    """Estimated footprint of a TID-list with `count` TIDs in `backend`."""
+    if backend == "set":
+        return SET_BYTES_PER_TID * count
+    if backend == "array":
+        return 4 * count
+    if backend == "bitmap":
+        return num_transactions // 8 + 1
+    if backend == "rle":
+        return 8 * (count if runs is None else runs)
+    raise ValueError(f"Unknown TID-list backend: {backend}")
+
+
+def choose_backend(count, num_transactions, runs=None):
+    """
+    Pick the backend with the smallest estimated footprint.
+
+    Lists of up to SMALL_LIST_MAX TIDs are always sets, and bitmaps get a
+    BITMAP_PREFERENCE discount for their faster intersections. The sparse
+    fallback is "array" when numpy is available, else "set". "rle" is
+    only considered when the number of runs is known and the TIDs are
+    clustered enough (merging runs costs more per run than an array
+    merge, so it only pays off when there are several TIDs per run).
+    """
+    if count <= SMALL_LIST_MAX:
+        return "set"
+    candidates = ["array" if np is not None else "set", "bitmap"]
+    if runs is not None and runs * RLE_MIN_RUN_LENGTH <= count:
+        candidates.append("rle")
+
+    def cost(b):
+        nbytes = estimate_nbytes(b, count, num_transactions, runs)
+        return nbytes / BITMAP_PREFERENCE if b == "bitmap" else nbytes
+
+    return min(candidates, key=cost)
+
+
+def check_backend(backend):
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"Unknown TID-list backend: {backend} (expected one of {BACKENDS})"
+        )
+    if backend == "array" and np is None:
+        raise ImportError('The "array" TID-list backend requires numpy')
+
+
+def count_runs(sorted_tids):
+    runs, prev = 0, None
+    for t in sorted_tids:
+        if prev is None or t != prev + 1:
+            runs += 1
+        prev = t
+    return runs
+
+
+def make_tidlist(sorted_tids, num_transactions, backend="auto"):
+    """
+    Build a TID-list from TIDs given in ascending order.
+
+    With backend="auto" the encoding is chosen from the list's density
+    (and run structure), so dense lists become bitmaps and sparse ones
+    become sorted arrays.
+    """
+    if backend == "auto":
+        tids = list(sorted_tids)
+        backend = choose_backend(len(tids), num_transactions, count_runs(tids))
+        sorted_tids = tids
+    return BACKEND_CLASSES[backend].from_sorted(sorted_tids)
+
+
+def adapt(tidlist, num_transactions, backend="auto"):
+    """
+    Re-encode an intersection result if another backend suits its density.
+
+    Only active for backend="auto"; a result is converted when the
+    preferred encoding is at least twice as small as the current one.
+    """
+    if backend != "auto":
+        return tidlist
+    count = len(tidlist)
+    best = choose_backend(count, num_transactions)
+    if best == tidlist.name:
+        return tidlist
+    if 2 * estimate_nbytes(best, count, num_transactions) > tidlist.nbytes:
+        return tidlist
+    return BACKEND_CLASSES[best].from_sorted(list(tidlist))
+
+
+class Weights:
+    """
+    Per-TID weights, e.g. the multiplicity of merged transactions.
+
+    A weighted support is the TID count plus the surplus (weight - 1) of
+    its TIDs. Only TIDs below `limit` have a surplus, so when the heavy
+    transactions come first (see preprocess.py) only a short prefix of
+    each TID-list is ever looked at.
+    """
+
+    __slots__ = ("surplus", "array", "limit", "max")
+
+    def __init__(self, values):
+        self.surplus = [w - 1 for w in values]
+        self.limit = max((t + 1 for t, s in enumerate(self.surplus) if s), default=0)
+        self.max = max(values, default=1)
+        self.array = None
+        if np is not None:
+            self.array = np.asarray(self.surplus[: self.limit], dtype=np.int64)
+
+    def extra(self, tidlist):
+        """Summed surplus of the TIDs of tidlist (any backend or sorted list)."""
+        limit, surplus = self.limit, self.surplus
+        if isinstance(tidlist, SetTidList):
+            return sum(surplus[t] for t in tidlist.tids if t < limit)
+        if self.array is not None:
+            if isinstance(tidlist, ArrayTidList):
+                tids = tidlist.tids
+                if not len(tids) or tids[0] >= limit:
+                    return 0
+                return int(self.array[tids[: tids.searchsorted(limit)]].sum())
+            if isinstance(tidlist, BitmapTidList):
+                raw = tidlist.to_bytes()[: (limit + 7) // 8]
+                raw = np.frombuffer(raw, dtype=np.uint8)
+                bits = np.unpackbits(raw, bitorder="little")[:limit]
+                return int(self.array[: len(bits)] @ bits)
+        extra = 0
+        for t in tidlist:  # ascending
+            if t >= limit:
+                break
+            extra += surplus[t]
+        return extra
+
+
+def as_weights(weights):
+    """
+    Per-TID weights for weighted_support(), or None if they are all 1.
+
+    Unit weights count like plain lengths, so they are dropped instead of
+    slowing every support computation down.
+    """
+    if weights is None or isinstance(weights, Weights):
+        return weights
+    if all(w == 1 for w in weights):
+        return None
+    return Weights(weights)
+
+
+def weighted_support(tidlist, weights, min_support=0):
+    """
+    Support of a TID-list: its length, or the summed weights of its TIDs.
+
+    weights (optional, see as_weights) holds one count per TID, e.g. the
+    multiplicity of each merged transaction (see preprocess.py). Plain
+    sorted lists of TIDs are accepted too. A list too short to reach
+    min_support even at the largest weight is not summed: its length is
+    returned, which is below min_support as well.
+    """
+    count = len(tidlist)
+    if weights is None or count * weights.max < min_support:
+        return count
+    return count + weights.extra(tidlist)
+
+
+def intersect_all(tid_lists, observer=None):
+    """
+    Intersect TID-lists smallest first, stopping early when empty.
+
+    observer (optional instrument.MiningObserver) is told the operand
+    bytes and the time of the whole intersection.
+    """
+    tid_lists = sorted(tid_lists, key=len)
+    common = tid_lists[0]
+    if observer is not None:
+        start = time.perf_counter()
+        nbytes = 0
+        for other in tid_lists[1:]:
+            if not len(common):
+                break
+            nbytes += common.nbytes + other.nbytes
+            common = common.intersect(other)
+        observer.intersected(nbytes, time.perf_counter() - start)
+        return common
+
+    for other in tid_lists[1:]:
+        if not len(common):
+            break
+        common = common.intersect(other)
+    return common
@@ -0,0 +1,123 @@
+"""
+Top-k frequent itemset mining without a support threshold.
+
+Best-first search over the same item-tidset tree as Apriori-TID: a
+frontier heap always expands the most frequent open itemset, so results
+come out in order of decreasing support. A bounded min-heap holds the
+supports of the k best itemsets known so far (found or waiting in the
+frontier); once it is full its minimum is a valid support threshold, and
+every extension below it is pruned before its TID-list is kept.
+"""
+
+import heapq
+
+from apriori_tid import create_C1
+from itemset_io import collect_levels
+from tidlist import adapt, check_backend, make_tidlist
+
+
+def topk_mine(transactions, k, min_length=1, backend="auto", stats=None):
+    """
+    Mine the k most frequent itemsets with at least min_length items.
+
+    Ties at the k-th support are broken by length, then by sorted items,
+    so exactly min(k, #itemsets) itemsets are returned.
+
+    Input:
+        transactions: list of lists/sets of items
+        k: number of itemsets to return
+        min_length: shortest itemset that counts towards the k
+        backend: TID-list encoding (see tidlist.BACKENDS)
+        stats: optional dict, receives "min_support" (support of the k-th
+            itemset) and "expanded" (itemsets taken from the frontier)
+
+    Output:
+        L: list of lists of tuples (top-k itemsets by level; the levels
+            below min_length are empty)
+        support_data: dict {tuple: support_count}
+    """
+    check_backend(backend)
+    if k < 1:
+        raise ValueError("k must be at least 1")
+
+    transactions = [set(t) for t in transactions]
+    num_trans = len(transactions)
+
+    # Step 1: items by decreasing support, so tails are ordered and the
+    # first too-rare extension ends the scan
+    C1 = create_C1(transactions)
+    order = sorted(C1, key=lambda itemset: (-len(C1[itemset]), itemset))
+    items = [item for (item,) in order]
+    tidlists = [make_tidlist(C1[itemset], num_trans, backend) for itemset in order]
+    del C1
+
+    # supports of the k best itemsets known so far (min-heap)
+    bound = []
+
+    def threshold():
+        return bound[0] if len(bound) == k else 1
+
+    def promise(support, length):
+        # an itemset long enough to be reported will be, once expanded
+        if length >= min_length:
+            if len(bound) < k:
+                heapq.heappush(bound, support)
+            elif support > bound[0]:
+                heapq.heapreplace(bound, support)
+
+    # Step 2: best-first expansion. Entries are (-support, positions,
+    # tids, tail); tail lists the items whose extension of the parent
+    # passed the threshold, the only ones that can extend this itemset
+    frontier = []
+    for tids in tidlists:
+        if len(tids) < threshold():
+            break
+        promise(len(tids), 1)
+    roots = tuple(pos for pos, tids in enumerate(tidlists) if len(tids) >= threshold())
+    for pos in roots:
+        frontier.append((-len(tidlists[pos]), (pos,), tidlists[pos], roots[pos + 1 :]))
+    heapq.heapify(frontier)
+
+    found = []
+    expanded = 0
+    while frontier:
+        neg_support, positions, tids, tail = heapq.heappop(frontier)
+        support = -neg_support
+        if support < threshold():
+            break  # everything left in the frontier is rarer
+        expanded += 1
+
+        if len(positions) >= min_length:
+            found.append((support, positions))
+
+        children = []
+        for pos in tail:
+            if len(tidlists[pos]) < threshold():
+                break
+            common = tids.intersect(tidlists[pos])
+            if len(common) >= threshold():
+                children.append((pos, adapt(common, num_trans, backend)))
+                promise(len(common), len(positions) + 1)
+
+        extensions = tuple(pos for pos, _ in children)
+        for i, (pos, common) in enumerate(children):
+            heapq.heappush(
+                frontier,
+                (-len(common), positions + (pos,), common, extensions[i + 1 :]),
+            )
+
+    # Step 3: cut ties deterministically and group by level
+    ranked = sorted(
+        (-support, len(positions), tuple(sorted(items[pos] for pos in positions)))
+        for support, positions in found
+    )[:k]
+
+    L, support_data = collect_levels(
+        (itemset, -neg_support) for neg_support, _, itemset in ranked
+    )
+
+    if stats is not None:
+        stats["min_support"] = -ranked[-1][0] if ranked else 0
+        stats["expanded"] = expanded
+
+    return L, support_data